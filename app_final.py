@@ -9,25 +9,71 @@ import sys
 import io
 import subprocess
 import threading
-import traceback
 import requests
 import tempfile
 import threading
 import random
 import string
+import hashlib
+import logging
+import contextvars
 from datetime import datetime
 from werkzeug.utils import secure_filename
 from concurrent.futures import ThreadPoolExecutor
 
 # Import citation grouping functionality
-from citation_grouping import group_citations
+from citation_grouping import group_citations, build_cluster_index
+from citation_normalization import citation_key
+
+# Import the shared citation verification cache
+from citation_cache import get_citation_cache
+
+# Import the local index of CourtListener bulk data
+from citation_index import get_citation_index
+
+# Import pooled HTTP sessions for upstream APIs
+from http_client import get_session
+
+# Import batched CourtListener citation lookup
+from courtlistener_integration import lookup_citations_batch
+
+# Import concurrent verification helpers
+from verification_pool import ProviderLimiter, verify_concurrently
+
+# Import the analysis job store
+from job_store import create_job_store
+
+# Import the bounded analysis queue
+from job_queue import JobQueue, QueueFullError
 
 # Import eyecite for better citation extraction
 from eyecite import get_citations
-from eyecite.tokenizers import HyperscanTokenizer, AhocorasickTokenizer
+from eyecite_tokenizer import get_tokenizer, warm_up_tokenizer
+
+# Import the process pool that runs our robust PDF and DOCX handlers
+from extraction_pool import configure_extraction_pool, ExtractionError
+from paged_text import PagedText
+
+# Import the extracted text cache so repeat uploads skip parsing
+from document_cache import get_document_cache, hash_file
+
+# Import the analysis result cache so repeat runs of a document return straight away
+from result_cache import get_result_cache, citations_to_revalidate
 
-# Import our robust PDF handler
-from pdf_handler import extract_text_from_pdf
+# Import incremental citation extraction for streamed documents
+from incremental_citations import IncrementalCitationExtractor
+
+# Import streaming upload handling so uploads are hashed and size-checked as they arrive
+from upload_handler import create_upload_request_class
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+# Import queued logging with per-analysis context
+from logging_config import configure_logging, analysis_context, write_debug_artifact
+
+# Log with the environment settings until config.json has been read
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
@@ -63,37 +109,147 @@ app.wsgi_app = PrefixMiddleware(app.wsgi_app, prefix='/casestrainer')
 # Configuration
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx', 'doc'}
-COURTLISTENER_API_URL = 'https://www.courtlistener.com/api/rest/v3/citation-lookup/'
 
 # Create upload folder if it doesn't exist
 try:
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    print(f"Upload folder created/verified at: {UPLOAD_FOLDER}")
+    logger.debug("Upload folder created/verified at: %s", UPLOAD_FOLDER)
     # Test write permissions
     test_file = os.path.join(UPLOAD_FOLDER, 'test_write.txt')
     with open(test_file, 'w') as f:
         f.write('Test write')
     os.remove(test_file)
-    print("Upload folder is writable")
+    logger.debug("Upload folder is writable")
 except Exception as e:
-    print(f"ERROR creating upload folder: {e}")
-    traceback.print_exc()
+    logger.exception("Error creating upload folder: %s", e)
 
 # Load API keys from config.json if available
 DEFAULT_API_KEY = None
 LANGSEARCH_API_KEY = None
+
+# Verification concurrency settings (can be overridden in config.json)
+VERIFICATION_WORKERS = 8           # Worker threads per analysis for fallback verification
+PROVIDER_CONCURRENCY = {}          # Per-provider in-flight request limits, e.g. {"langsearch": 4}
+ANALYSIS_DEADLINE_SECONDS = 300    # Citations still unverified after this are reported as unconfirmed
+VERIFICATION_BATCHES = 2           # Batches of newly found citations verified at the same time per analysis
+LANGSEARCH_TIMEOUT = 30            # Timeout for each LangSearch request in seconds
+CITATION_GROUPING_METHOD = 'cluster'  # How verified citations are grouped into cases: 'cluster' (CourtListener case IDs), 'url_then_name', 'tfidf' (url_then_name with n-gram name matching), 'url' or 'name'
+
+# Result cache settings (can be overridden in config.json)
+RESULT_REVALIDATE_AFTER_SECONDS = 24 * 60 * 60  # Cached results older than this have unconfirmed citations re-checked
+
+# Job store settings (can be overridden in config.json)
+JOB_STORE_BACKEND = 'memory'       # 'memory', or 'sqlite' to share jobs between server processes
+JOB_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db')  # Used by the 'sqlite' backend
+JOB_TTL_SECONDS = 60 * 60          # How long finished analyses can still be fetched from /status
+MAX_JOBS = 1000                    # Maximum number of analyses kept by the 'memory' backend
+
+# Analysis queue settings (can be overridden in config.json)
+ANALYSIS_WORKERS = 4               # Analyses that run at the same time
+MAX_QUEUED_ANALYSES = 50           # Analyses that can wait for a worker before /analyze returns 503
+MAX_QUEUED_PER_USER = 10           # Analyses one user can have waiting before /analyze returns 429
+TRUSTED_PROXIES = 0                # Reverse proxies in front of the app (1 behind nginx) whose X-Forwarded-For is trusted
+
+# Upload settings (can be overridden in config.json)
+MAX_UPLOAD_MB = 100                # Largest file /analyze accepts; checked while the upload streams in
+
+# Document extraction settings (can be overridden in config.json)
+EXTRACTION_WORKERS = 2             # Worker processes for PDF/DOCX text extraction
+EXTRACTION_TIMEOUT_SECONDS = 120   # Extractions running longer than this are killed
+EXTRACTION_DOCUMENT_TIMEOUT_SECONDS = 600  # Cap on a whole streamed PDF, however steadily its pages arrive
+EXTRACTION_MEMORY_LIMIT_MB = 1024  # Memory cap for each extraction worker (not enforced on Windows)
+
+# Event stream settings
+STREAM_KEEPALIVE_SECONDS = 15      # Idle time before /stream sends a keepalive comment
+STREAM_RETRY_MS = 2000             # How long browsers wait before reconnecting to /stream
+
+# Logging settings (can be overridden in config.json)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')       # DEBUG also logs request details and every lookup
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')     # 'text', or 'json' for one JSON object per line
+LOG_FILE = os.environ.get('LOG_FILE') or None         # Also write the log to this file
+DEBUG_ARTIFACTS_DIR = os.environ.get('DEBUG_ARTIFACTS_DIR') or None  # Save API responses etc. per analysis here
 try:
     with open('config.json', 'r') as f:
         config = json.load(f)
         DEFAULT_API_KEY = config.get('courtlistener_api_key')
         LANGSEARCH_API_KEY = config.get('langsearch_api_key')
-        print(f"Loaded CourtListener API key from config.json: {DEFAULT_API_KEY[:5]}..." if DEFAULT_API_KEY else "No CourtListener API key found in config.json")
-        print(f"Loaded LangSearch API key from config.json: {LANGSEARCH_API_KEY[:5]}..." if LANGSEARCH_API_KEY else "No LangSearch API key found in config.json")
+        VERIFICATION_WORKERS = int(config.get('verification_workers', VERIFICATION_WORKERS))
+        PROVIDER_CONCURRENCY = config.get('provider_concurrency', PROVIDER_CONCURRENCY)
+        ANALYSIS_DEADLINE_SECONDS = float(config.get('analysis_deadline_seconds', ANALYSIS_DEADLINE_SECONDS))
+        VERIFICATION_BATCHES = int(config.get('verification_batches', VERIFICATION_BATCHES))
+        LANGSEARCH_TIMEOUT = float(config.get('langsearch_timeout', LANGSEARCH_TIMEOUT))
+        CITATION_GROUPING_METHOD = config.get('citation_grouping_method', CITATION_GROUPING_METHOD)
+        RESULT_REVALIDATE_AFTER_SECONDS = float(config.get('result_revalidate_after_seconds', RESULT_REVALIDATE_AFTER_SECONDS))
+        JOB_STORE_BACKEND = config.get('job_store_backend', JOB_STORE_BACKEND)
+        JOB_STORE_PATH = config.get('job_store_path', JOB_STORE_PATH)
+        JOB_TTL_SECONDS = int(config.get('job_ttl_seconds', JOB_TTL_SECONDS))
+        MAX_JOBS = int(config.get('max_jobs', MAX_JOBS))
+        ANALYSIS_WORKERS = int(config.get('analysis_workers', ANALYSIS_WORKERS))
+        MAX_QUEUED_ANALYSES = int(config.get('max_queued_analyses', MAX_QUEUED_ANALYSES))
+        MAX_QUEUED_PER_USER = int(config.get('max_queued_per_user', MAX_QUEUED_PER_USER))
+        TRUSTED_PROXIES = int(config.get('trusted_proxies', TRUSTED_PROXIES))
+        EXTRACTION_WORKERS = int(config.get('extraction_workers', EXTRACTION_WORKERS))
+        EXTRACTION_TIMEOUT_SECONDS = float(config.get('extraction_timeout_seconds', EXTRACTION_TIMEOUT_SECONDS))
+        EXTRACTION_DOCUMENT_TIMEOUT_SECONDS = float(config.get('extraction_document_timeout_seconds', EXTRACTION_DOCUMENT_TIMEOUT_SECONDS))
+        EXTRACTION_MEMORY_LIMIT_MB = int(config.get('extraction_memory_limit_mb', EXTRACTION_MEMORY_LIMIT_MB))
+        MAX_UPLOAD_MB = int(config.get('max_upload_mb', MAX_UPLOAD_MB))
+        LOG_LEVEL = config.get('log_level', LOG_LEVEL)
+        LOG_FORMAT = config.get('log_format', LOG_FORMAT)
+        LOG_FILE = config.get('log_file', LOG_FILE)
+        DEBUG_ARTIFACTS_DIR = config.get('debug_artifacts_dir', DEBUG_ARTIFACTS_DIR)
+        logger.info("CourtListener API key %s in config.json", 'found' if DEFAULT_API_KEY else 'not found')
+        logger.info("LangSearch API key %s in config.json", 'found' if LANGSEARCH_API_KEY else 'not found')
 except Exception as e:
-    print(f"Error loading config.json: {e}")
+    logger.warning("Error loading config.json: %s", e)
+
+configure_logging(LOG_LEVEL, LOG_FORMAT, LOG_FILE, debug_artifacts_dir=DEBUG_ARTIFACTS_DIR or '')
+
+# Take the client address from X-Forwarded-For only when it was set by our own proxies;
+# otherwise any client could send the header and pick the address it is queued under
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
+
+# Concurrency limits shared by all analyses in this process
+provider_limiter = ProviderLimiter(PROVIDER_CONCURRENCY)
+
+# Build the eyecite tokenizer in the background so the first analysis doesn't pay for it
+warm_up_tokenizer()
 
-# Dictionary to store analysis results
-analysis_results = {}
+# Store for analysis progress and results (in memory, or SQLite to share between processes)
+job_store = create_job_store(
+    JOB_STORE_BACKEND,
+    db_path=JOB_STORE_PATH,
+    ttl=JOB_TTL_SECONDS,
+    max_jobs=MAX_JOBS
+)
+
+# Fixed pool of analysis workers fed by a bounded queue
+analysis_queue = JobQueue(
+    workers=ANALYSIS_WORKERS,
+    max_queued=MAX_QUEUED_ANALYSES,
+    max_queued_per_user=MAX_QUEUED_PER_USER
+)
+
+# PDF and DOCX parsing holds the GIL, so it runs in separate worker processes
+extraction_pool = configure_extraction_pool(
+    workers=EXTRACTION_WORKERS,
+    timeout=EXTRACTION_TIMEOUT_SECONDS,
+    memory_limit_mb=EXTRACTION_MEMORY_LIMIT_MB,
+    document_timeout=EXTRACTION_DOCUMENT_TIMEOUT_SECONDS
+)
+
+# Uploads are streamed into the upload folder in chunks and hashed as they are written
+app.request_class = create_upload_request_class(UPLOAD_FOLDER, MAX_UPLOAD_MB * 1024 * 1024)
+# The whole request may also carry the form fields (brief text, API key)
+app.config['MAX_CONTENT_LENGTH'] = (MAX_UPLOAD_MB + 1) * 1024 * 1024
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    logger.warning("Rejected upload: %s", e.description)
+    return jsonify({
+        'status': 'error',
+        'message': e.description if 'limited to' in (e.description or '') else f'File is too large: uploads are limited to {MAX_UPLOAD_MB} MB'
+    }), 413
 
 # Helper function to check if a file has an allowed extension
 def allowed_file(filename):
@@ -101,16 +257,23 @@ def allowed_file(filename):
 
 # Function to extract text from different file types
 def extract_text_from_file(file_path):
-    """Extract text from a file based on its extension."""
-    print(f"Extracting text from file: {file_path}")
+    """
+    Extract text from a file based on its extension.
+    
+    PDF and DOCX files are parsed in the extraction worker pool. PDFs come
+    back as a PagedText, so citations can be mapped to page numbers. Raises
+    ExtractionError if a worker had to be stopped (timeout, memory limit or
+    crash), so the caller can report why.
+    """
+    logger.debug("Extracting text from file: %s", file_path)
     
     if not os.path.exists(file_path):
-        print(f"File not found: {file_path}")
+        logger.warning("File not found: %s", file_path)
         return None
     
     # Get file extension
     file_extension = file_path.split('.')[-1].lower()
-    print(f"File extension: {file_extension}")
+    logger.debug("File extension: %s", file_extension)
     
     try:
         # Extract text based on file extension
@@ -119,94 +282,64 @@ def extract_text_from_file(file_path):
             try:
                 with open(file_path, 'r', encoding='utf-8') as file:
                     text = file.read()
-                    print(f"Successfully extracted {len(text)} characters from TXT")
+                    logger.debug("Successfully extracted %s characters from TXT", len(text))
                     return text
             except UnicodeDecodeError:
                 # Try with a different encoding if utf-8 fails
                 with open(file_path, 'r', encoding='latin-1') as file:
                     text = file.read()
-                    print(f"Successfully extracted {len(text)} characters from TXT (latin-1 encoding)")
+                    logger.debug("Successfully extracted %s characters from TXT (latin-1 encoding)", len(text))
                     return text
         
-        elif file_extension == 'pdf':
-            # Use our robust PDF handler for all PDF files
-            print(f"Using robust PDF handler for: {file_path}")
-            text = extract_text_from_pdf(file_path)
+        elif file_extension in ['pdf', 'docx', 'doc']:
+            # PDFs are extracted page by page (in parallel for long documents), DOCX with python-docx
+            kind = 'pdf' if file_extension == 'pdf' else 'docx'
+            logger.info("Extracting %s text in worker processes: %s", kind.upper(), file_path)
+            if kind == 'pdf':
+                text = extraction_pool.extract_pdf_pages(file_path)
+            else:
+                text = extraction_pool.extract(kind, file_path)
             
             # Check if extraction was successful
             if text and isinstance(text, str):
                 if text.startswith("Error:"):
-                    print(f"PDF extraction failed: {text}")
+                    logger.warning("%s extraction failed: %s", kind.upper(), text)
                     return None
                 else:
-                    print(f"Successfully extracted {len(text)} characters from PDF")
+                    logger.info("Successfully extracted %s characters from %s", len(text), kind.upper())
                     return text
             else:
-                print(f"PDF extraction returned invalid result: {type(text)}")
-                return None
-        
-        elif file_extension in ['docx', 'doc']:
-            # For .docx files, use python-docx
-            try:
-                # Check if file exists and is readable
-                if not os.path.isfile(file_path):
-                    error_msg = f"File not found: {file_path}"
-                    print(error_msg)
-                    return f"Error: {error_msg}"
-                
-                # Check file size
-                try:
-                    file_size = os.path.getsize(file_path)
-                    print(f"DOCX file size: {file_size} bytes")
-                    if file_size == 0:
-                        error_msg = f"File is empty: {file_path}"
-                        print(error_msg)
-                        return f"Error: {error_msg}"
-                    elif file_size > 50 * 1024 * 1024:  # 50MB limit
-                        error_msg = f"File is too large ({file_size} bytes): {file_path}"
-                        print(error_msg)
-                        return f"Error: {error_msg}"
-                except Exception as e:
-                    print(f"Error checking file size: {e}")
-                
-                # Open the document
-                doc = docx.Document(file_path)
-                text = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-                print(f"Successfully extracted {len(text)} characters from DOCX")
-                return text
-            except Exception as e:
-                print(f"Error extracting text from DOCX: {e}")
-                traceback.print_exc()
+                logger.warning("%s extraction returned invalid result: %s", kind.upper(), type(text))
                 return None
         
         else:
-            print(f"Unsupported file extension: {file_extension}")
+            logger.warning("Unsupported file extension: %s", file_extension)
             return None
     
+    except ExtractionError:
+        raise
     except Exception as e:
-        print(f"Error extracting text from file: {e}")
-        traceback.print_exc()
+        logger.exception("Error extracting text from file: %s", e)
         return None
 
 # Function to extract citations from text
-def extract_citations(text):
+def extract_citations(text, pages=None):
     """
     Extract legal citations from text using eyecite library.
     This provides more accurate and comprehensive citation extraction than regex patterns.
+    
+    If text is a PagedText and a pages dict is passed, it is filled with the
+    page numbers each citation appears on: {citation: [page, ...]}.
     """
-    print(f"Extracting citations from text of length: {len(text)}")
+    logger.debug("Extracting citations from text of length: %s", len(text))
     citations = []
+    page_for_offset = getattr(text, 'page_for_offset', None)
     
     # Try using eyecite first
     try:
-        print("Extracting citations using eyecite...")
-        # Try to use the faster HyperscanTokenizer first
-        try:
-            tokenizer = HyperscanTokenizer()
-        except Exception:
-            # Fall back to AhocorasickTokenizer if HyperscanTokenizer fails
-            print("Falling back to AhocorasickTokenizer...")
-            tokenizer = AhocorasickTokenizer()
+        logger.debug("Extracting citations using eyecite...")
+        # Reuse the shared tokenizer (Hyperscan if available, otherwise Aho-Corasick)
+        tokenizer = get_tokenizer()
             
         # Get citations using eyecite
         citation_objects = get_citations(text, tokenizer=tokenizer)
@@ -216,14 +349,20 @@ def extract_citations(text):
             citation_str = citation.corrected_citation() if hasattr(citation, 'corrected_citation') else str(citation)
             if citation_str not in citations:
                 citations.append(citation_str)
+            
+            # Record the page this occurrence is on
+            if pages is not None and page_for_offset:
+                page = page_for_offset(citation.span()[0])
+                citation_pages = pages.setdefault(citation_str, [])
+                if page and page not in citation_pages:
+                    citation_pages.append(page)
         
-        print(f"Found {len(citations)} citations using eyecite")
+        logger.info("Found %s citations using eyecite", len(citations))
     except Exception as e:
-        print(f"Error using eyecite: {e}")
-        traceback.print_exc()
+        logger.exception("Error using eyecite: %s", e)
         
         # Fall back to regex patterns if eyecite fails
-        print("Falling back to regex patterns...")
+        logger.info("Falling back to regex patterns...")
         # Normalize the text to make citation matching more reliable
         text = re.sub(r'\s+', ' ', text)
         
@@ -253,34 +392,47 @@ def extract_citations(text):
                     if citation not in citations:
                         citations.append(citation)
             except Exception as e:
-                print(f"Error searching for pattern {pattern}: {e}")
+                logger.warning("Error searching for pattern %s: %s", pattern, e)
     
-    print(f"Total citations extracted: {len(citations)}")
+    logger.info("Total citations extracted: %s", len(citations))
     if citations:
-        print(f"Extracted citations: {citations}")
+        logger.debug("Extracted citations: %s", citations)
         
-        # Save the extracted citations to a file for inspection
-        try:
-            with open('extracted_citations.txt', 'w', encoding='utf-8') as f:
-                for i, citation in enumerate(citations):
-                    f.write(f"{i+1}. {citation}\n")
-            print(f"Extracted citations saved to extracted_citations.txt")
-        except Exception as e:
-            print(f"Error saving extracted citations to file: {e}")
+        # Save the extracted citations for inspection (only when debug artifacts are enabled)
+        write_debug_artifact('extracted_citations.json', citations)
     
     return citations
 
 # Function to check case using LangSearch API
 def check_case_with_langsearch(citation_text):
+    """Check if a case is real using LangSearch, reusing cached results where available."""
+    cache = get_citation_cache()
+    if cache is not None:
+        cached = cache.get('langsearch', citation_text)
+        if cached:
+            logger.debug("Using cached LangSearch result for: %s", citation_text)
+            return cached['value']
+    
+    with provider_limiter.slot('langsearch'):
+        result = query_langsearch_summaries(citation_text)
+    
+    # Only cache definitive answers, not API or network errors
+    if cache is not None and not result.get('error'):
+        cache.set('langsearch', citation_text, result, found=result['is_real'])
+    
+    return result
+
+def query_langsearch_summaries(citation_text):
     """Check if a case is real by asking LangSearch to summarize it twice and comparing the summaries."""
-    print(f"Checking case with LangSearch API: {citation_text}")
+    logger.debug("Checking case with LangSearch API: %s", citation_text)
     
     if not LANGSEARCH_API_KEY:
-        print("No LangSearch API key provided")
+        logger.warning("No LangSearch API key provided")
         return {
             'is_real': False,
             'confidence': 0.5,
-            'explanation': "No LangSearch API key provided, unable to verify citation"
+            'explanation': "No LangSearch API key provided, unable to verify citation",
+            'error': True
         }
     
     try:
@@ -298,22 +450,23 @@ def check_case_with_langsearch(citation_text):
         }
         
         # Make the first request
-        print(f"Requesting first summary for: {citation_text}")
-        first_response = requests.post('https://api.langsearch.ai/v1/generate', headers=headers, json=first_data)
+        logger.debug("Requesting first summary for: %s", citation_text)
+        first_response = get_session('langsearch').post('https://api.langsearch.ai/v1/generate', headers=headers, json=first_data, timeout=LANGSEARCH_TIMEOUT)
         
         # Check the response
         if first_response.status_code != 200:
-            print(f"First LangSearch API request failed with status code {first_response.status_code}")
-            print(f"Response: {first_response.text}")
+            logger.warning("First LangSearch API request failed with status code %s", first_response.status_code)
+            logger.warning("Response: %s", first_response.text)
             return {
                 'is_real': False,
                 'confidence': 0.6,
-                'explanation': f"Error checking citation: API request failed with status code {first_response.status_code}"
+                'explanation': f"Error checking citation: API request failed with status code {first_response.status_code}",
+                'error': True
             }
         
         first_result = first_response.json()
         first_summary = first_result.get('text', '')
-        print(f"First summary: {first_summary}")
+        logger.debug("First summary: %s", first_summary)
         
         # If the first summary indicates the case doesn't exist
         if 'unable to find' in first_summary.lower() or 'no information' in first_summary.lower() or 'not a valid' in first_summary.lower():
@@ -331,13 +484,13 @@ def check_case_with_langsearch(citation_text):
         }
         
         # Make the second request
-        print(f"Requesting second summary for: {citation_text}")
-        second_response = requests.post('https://api.langsearch.ai/v1/generate', headers=headers, json=second_data)
+        logger.debug("Requesting second summary for: %s", citation_text)
+        second_response = get_session('langsearch').post('https://api.langsearch.ai/v1/generate', headers=headers, json=second_data, timeout=LANGSEARCH_TIMEOUT)
         
         # Check the response
         if second_response.status_code != 200:
-            print(f"Second LangSearch API request failed with status code {second_response.status_code}")
-            print(f"Response: {second_response.text}")
+            logger.warning("Second LangSearch API request failed with status code %s", second_response.status_code)
+            logger.warning("Response: %s", second_response.text)
             # If first summary worked but second failed, use just the first
             if first_summary:
                 return {
@@ -348,12 +501,13 @@ def check_case_with_langsearch(citation_text):
             return {
                 'is_real': False,
                 'confidence': 0.6,
-                'explanation': f"Error checking citation: Second API request failed"
+                'explanation': f"Error checking citation: Second API request failed",
+                'error': True
             }
         
         second_result = second_response.json()
         second_summary = second_result.get('text', '')
-        print(f"Second summary: {second_summary}")
+        logger.debug("Second summary: %s", second_summary)
         
         # If the second summary indicates the case doesn't exist
         if 'unable to find' in second_summary.lower() or 'no information' in second_summary.lower() or 'not a valid' in second_summary.lower():
@@ -372,7 +526,7 @@ def check_case_with_langsearch(citation_text):
             common_words = first_words.intersection(second_words)
             similarity_score = len(common_words) / max(len(first_words), len(second_words))
             
-            print(f"Similarity score: {similarity_score}")
+            logger.debug("Similarity score: %s", similarity_score)
             
             if similarity_score > 0.3:  # Threshold for similarity
                 return {
@@ -406,583 +560,500 @@ def check_case_with_langsearch(citation_text):
             }
     
     except Exception as e:
-        print(f"Error checking case with LangSearch API: {e}")
-        traceback.print_exc()
+        logger.exception("Error checking case with LangSearch API: %s", e)
         return {
             'is_real': False,
             'confidence': 0.5,
-            'explanation': f"Error checking citation: {str(e)}"
+            'explanation': f"Error checking citation: {str(e)}",
+            'error': True
         }
 
 # Function to query the CourtListener API
-def query_courtlistener_api(text, api_key):
-    """Query the CourtListener API to verify citations in the text.
+def query_courtlistener_api(citations, api_key, deadline=None):
+    """Query the CourtListener API to verify a list of already-extracted citations.
     
-    Instead of sending the full text, we extract citations first and then
-    send only the citations to the API. This is more efficient and avoids
-    the 64,000 character limit of the API.
-    """
-    print(f"Processing text of length: {len(text)} for CourtListener API")
+    Only the citations are sent to the API rather than the full text, split
+    into chunks that respect the API's per-request citation and character
+    limits. Citations in the local citation index or already in the
+    verification cache are not sent at all.
     
+    Args:
+        citations: List of citation strings (a raw text string is also accepted
+                   and will be run through extract_citations first)
+        api_key: CourtListener API key
+        deadline: Absolute time.time() after which lookups still in flight are
+                  given up on; their citations are marked 'lookup_failed'
+    
+    Returns:
+        Dict with 'results' (one lookup result per citation, in order, with
+        'citation', 'found', 'case_name', 'court_listener_url' and 'cluster')
+        and 'api_response' (the merged raw API response), or a dict with an
+        'error' key if the lookup failed.
+    """
     if not api_key:
-        print("No API key provided")
+        logger.warning("No API key provided")
         return {'error': 'No API key provided'}
     
+    if isinstance(citations, str):
+        citations = extract_citations(citations)
+    
+    if not citations:
+        logger.debug("No citations to verify")
+        return {'error': 'No citations found in the text'}
+    
     try:
-        # Extract citations from the text using eyecite
-        citations = extract_citations(text)
+        logger.info("Verifying %s citations with CourtListener API", len(citations))
+        
+        # Serve what we can from the local citation index and the verification cache, and only send the rest
+        index = get_citation_index()
+        indexed_items = index.lookup_many(citations) if index is not None else {}
+        cache = get_citation_cache()
+        cached_items = list(indexed_items.values())
+        uncached_citations = []
+        for citation in citations:
+            if citation in indexed_items:
+                continue
+            cached = cache.get('courtlistener_lookup', citation) if cache is not None else None
+            if cached is None:
+                uncached_citations.append(citation)
+            elif cached['found']:
+                cached_items.append(cached['value'])
         
-        if not citations:
-            print("No citations found in the text")
-            return {'error': 'No citations found in the text'}
+        logger.info("%s citations served from the local index, %s from cache, %s to look up",
+                    len(indexed_items), len(citations) - len(indexed_items) - len(uncached_citations), len(uncached_citations))
+        failed_citations = set()
+        if not uncached_citations:
+            api_response = cached_items
+        else:
+            # Look up the rest in right-sized chunks, sent in parallel under a rate limit
+            lookup = lookup_citations_batch(uncached_citations, api_key, deadline=deadline)
+            
+            if lookup['failed'] and len(lookup['failed']) == len(uncached_citations) and not cached_items:
+                error = lookup['errors'][0] if lookup['errors'] else 'unknown error'
+                logger.warning("API request failed: %s", error)
+                return {'error': f"API request failed: {error}"}
+            
+            if lookup['failed']:
+                logger.warning("CourtListener lookup failed for %s citations, they will be checked with the fallback", len(lookup['failed']))
+                failed_citations = set(lookup['failed'])
+            
+            result = lookup['items']
+            
+            # Save the API response for inspection (only when debug artifacts are enabled)
+            write_debug_artifact('api_response.json', result)
+            
+            # Cache each looked-up citation; citations missing from the response are negative results
+            if cache is not None:
+                for item in result:
+                    if not isinstance(item, dict):
+                        continue
+                    found = bool(item.get('clusters'))
+                    item_citations = [item.get('citation')] + list(item.get('normalized_citations') or [])
+                    for item_citation in item_citations:
+                        if item_citation:
+                            cache.set('courtlistener_lookup', item_citation, item, found=found)
+                for citation in uncached_citations:
+                    if citation not in failed_citations and citation_key(citation) not in lookup['by_citation']:
+                        cache.set('courtlistener_lookup', citation, None, found=False)
+            
+            api_response = cached_items + result
         
-        print(f"Found {len(citations)} citations to verify with CourtListener API")
+        # Index the response by citation key so most citations resolve without scanning every item
+        response_index = {}
+        for item in api_response:
+            if isinstance(item, dict):
+                for item_citation in [item.get('citation')] + list(item.get('normalized_citations') or []):
+                    if item_citation:
+                        response_index.setdefault(citation_key(item_citation), item)
         
-        # Prepare the request
-        headers = {
-            'Authorization': f'Token {api_key}',
-            'Content-Type': 'application/json'
-        }
+        # Resolve each of our citations against the response
+        results = []
+        for citation in citations:
+            indexed_item = response_index.get(citation_key(citation))
+            lookup = match_citation_in_api_response(citation, [indexed_item] if indexed_item else api_response)
+            lookup['citation'] = citation
+            lookup['lookup_failed'] = citation in failed_citations
+            results.append(lookup)
         
-        # Join citations with newlines to create a compact text
-        # This is much more efficient than sending the full text
-        citations_text = "\n".join(citations)
-        print(f"Citations text length: {len(citations_text)} characters")
+        found_count = len([r for r in results if r['found']])
+        logger.info("CourtListener found %s of %s citations", found_count, len(citations))
         
-        data = {
-            'text': citations_text
+        return {
+            'results': results,
+            'api_response': api_response
         }
+    
+    except Exception as e:
+        logger.exception("Error querying CourtListener API: %s", e)
+        return {'error': f"Error querying CourtListener API: {str(e)}"}
+
+def _absolute_courtlistener_url(url):
+    """Make a CourtListener path such as /opinion/108713/roe-v-wade/ absolute."""
+    if url and not url.startswith('http'):
+        return f"https://www.courtlistener.com{url}"
+    return url
+
+def match_citation_in_api_response(citation, api_response):
+    """Find the CourtListener lookup result for a single citation.
+    
+    The citation-lookup API returns a list of items with 'citation',
+    'normalized_citations' and 'clusters'. A citation is matched by
+    citation_key() on its text, on one of the normalized citations, or on one
+    of the parallel citations listed in the item's cluster. Older responses with a
+    'citations' dictionary are also understood.
+    
+    Returns:
+        Dict with 'found', 'case_name', 'court_listener_url' and 'cluster'
+    """
+    lookup = {
+        'found': False,
+        'case_name': None,
+        'court_listener_url': None,
+        'cluster': None
+    }
+    
+    if isinstance(api_response, dict) and isinstance(api_response.get('citations'), dict):
+        # Traditional structure with citations dictionary
+        for response_citation, citation_data in api_response['citations'].items():
+            if citation.lower() in response_citation.lower():
+                lookup['found'] = True
+                lookup['case_name'] = citation_data.get('name', 'Unknown case')
+                lookup['court_listener_url'] = _absolute_courtlistener_url(citation_data.get('match_url'))
+                break
+        return lookup
+    
+    if not isinstance(api_response, list):
+        return lookup
+    
+    key = citation_key(citation)
+    
+    for api_item in api_response:
+        if not isinstance(api_item, dict):
+            continue
+        clusters = api_item.get('clusters') or []
         
-        # Make the request
-        print(f"Sending request to {COURTLISTENER_API_URL}")
-        response = requests.post(COURTLISTENER_API_URL, headers=headers, json=data)
+        # Match on the citation text or one of the normalized citations
+        item_citations = [api_item.get('citation') or ''] + list(api_item.get('normalized_citations') or [])
+        matched = any(key == citation_key(item_citation) for item_citation in item_citations if item_citation)
         
-        # Check the response
-        if response.status_code == 200:
-            print("API request successful")
-            result = response.json()
-            
-            # Save the API response to a file for inspection
-            try:
-                with open('api_response.json', 'w', encoding='utf-8') as f:
-                    json.dump(result, f, indent=2)
-                print("API response saved to api_response.json")
-            except Exception as e:
-                print(f"Error saving API response to file: {e}")
-            
-            return result
+        # Otherwise check the parallel citations listed for the case
+        if not matched and clusters:
+            for alt_citation in clusters[0].get('citations', []):
+                volume = alt_citation.get('volume', '')
+                reporter = alt_citation.get('reporter', '')
+                page = alt_citation.get('page', '')
+                if key == citation_key(f"{volume} {reporter} {page}"):
+                    matched = True
+                    break
+        
+        if matched:
+            # Items without clusters are citations CourtListener could not find
+            if clusters:
+                cluster = clusters[0]
+                lookup['found'] = True
+                lookup['cluster'] = cluster
+                lookup['case_name'] = cluster.get('case_name', 'Unknown case')
+                lookup['court_listener_url'] = _absolute_courtlistener_url(cluster.get('absolute_url'))
+            break
+    
+    return lookup
+
+def build_courtlistener_result(lookup):
+    """Build the result for a citation that CourtListener found."""
+    citation = lookup['citation']
+    case_name = lookup['case_name']
+    court_listener_url = lookup['court_listener_url']
+    
+    result_data = {
+        'citation_text': citation,
+        'is_hallucinated': False,
+        'confidence': 0.9,
+        'explanation': f"Citation confirmed: {case_name}{' - ' + court_listener_url if court_listener_url else ''}"
+    }
+    
+    # If case_name is 'Unknown case', change the explanation and mark as potential hallucination
+    if case_name == 'Unknown case':
+        result_data['explanation'] = f"Citation format recognized but case details unknown - potential hallucination"
+        result_data['is_hallucinated'] = True
+        result_data['hallucination_status'] = 'possible_hallucination'
+    
+    # Add CourtListener URL if available
+    if court_listener_url:
+        result_data['court_listener_url'] = court_listener_url
+        result_data['case_name'] = case_name or 'Unknown case'
+    
+    # The case's CourtListener ID, which all of its parallel citations share
+    cluster = lookup.get('cluster') or {}
+    if cluster.get('id') is not None:
+        result_data['cluster_id'] = cluster['id']
+    
+    return result_data
+
+def build_langsearch_result(citation):
+    """Build the result for a citation that CourtListener could not find by checking it with LangSearch."""
+    logger.debug("Citation not found in CourtListener database, checking with LangSearch: %s", citation)
+    langsearch_result = check_case_with_langsearch(citation)
+    
+    result_data = {
+        'citation_text': citation,
+        'is_hallucinated': not langsearch_result['is_real'],
+        'confidence': langsearch_result['confidence'],
+        'explanation': langsearch_result['explanation']
+    }
+    
+    # Westlaw citations are rarely in CourtListener, so LangSearch has the final say on them
+    if 'WL' in citation:
+        if langsearch_result['is_real']:
+            result_data['case_name'] = 'Westlaw Citation (Verified by LangSearch)'
+            result_data['hallucination_status'] = 'verified'
         else:
-            print(f"API request failed with status code {response.status_code}")
-            print(f"Response: {response.text}")
-            return {'error': f"API request failed with status code {response.status_code}: {response.text}"}
+            result_data['case_name'] = 'Unverified Westlaw Citation'
+            result_data['hallucination_status'] = 'unverified'
     
-    except Exception as e:
-        print(f"Error querying CourtListener API: {e}")
-        traceback.print_exc()
-        return {'error': f"Error querying CourtListener API: {str(e)}"}
+    # Add summaries if available
+    if 'summaries' in langsearch_result:
+        result_data['summaries'] = langsearch_result['summaries']
+    
+    return result_data
+
+def build_unverified_result(citation, reason):
+    """Build the result for a citation whose verification failed or ran out of time."""
+    return {
+        'citation_text': citation,
+        'is_hallucinated': False,
+        'hallucination_status': 'unconfirmed',
+        'confidence': 0.5,
+        'explanation': f"Citation could not be verified ({reason}) - unconfirmed citation"
+    }
 
 # Function to generate a unique analysis ID
 def generate_analysis_id():
     return str(uuid.uuid4())
 
+def queue_user(user_api_key=None):
+    """
+    Identify the client an analysis is queued for, so per-user queue limits apply per client.
+
+    Args:
+        user_api_key: The CourtListener API key the client supplied, if any. The server's
+            default key is shared by every anonymous client and must not be passed here.
+
+    Returns:
+        str: The client's own API key, else the client address
+    """
+    if user_api_key:
+        return f"key:{user_api_key}"
+    # With TRUSTED_PROXIES set, ProxyFix has already replaced remote_addr with the
+    # address our proxy saw; X-Forwarded-For itself is never read here
+    return f"ip:{request.remote_addr}"
+
 # Function to run the analysis with CourtListener API
-def run_analysis(analysis_id, brief_text=None, file_path=None, api_key=None):
-    print(f"\n==== STARTING ANALYSIS FOR ID: {analysis_id} ====\n")
-    print(f"API key: {api_key[:5]}..." if api_key else "No API key provided")
-    print(f"File path: {file_path}" if file_path else "No file path provided")
-    print(f"Brief text length: {len(brief_text)}" if brief_text else "No brief text provided")
-    print(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    # Log system info
-    print(f"Python version: {sys.version}")
-    print(f"Working directory: {os.getcwd()}")
-    print(f"UPLOAD_FOLDER path: {os.path.abspath(UPLOAD_FOLDER)}")
+def new_job_state(status, message):
+    """Initial state of an analysis in the job store."""
+    return {
+        'status': status,
+        'progress': 0,
+        'total_steps': 3,
+        'message': message,
+        'completed': False,
+        'results': None,
+        'error': None,
+        'extracted_citations': [],
+        'citation_results': []
+    }
+
+def run_analysis(analysis_id, brief_text=None, file_path=None, api_key=None, document_hash=None):
+    # Everything logged during the analysis, in any thread it uses, is tagged with its ID
+    with analysis_context(analysis_id):
+        _run_analysis(analysis_id, brief_text, file_path, api_key, document_hash)
+
+def _run_analysis(analysis_id, brief_text=None, file_path=None, api_key=None, document_hash=None):
+    logger.info("Starting analysis of %s (CourtListener API key %s)",
+                file_path or f"{len(brief_text or '')} characters of text", 'provided' if api_key else 'not provided')
+    logger.debug("Python version: %s", sys.version)
+    logger.debug("Working directory: %s", os.getcwd())
+    logger.debug("UPLOAD_FOLDER path: %s", os.path.abspath(UPLOAD_FOLDER))
     
     # Check if upload folder exists and is writable
     if not os.path.exists(UPLOAD_FOLDER):
-        print(f"WARNING: Upload folder does not exist: {UPLOAD_FOLDER}")
+        logger.warning("Upload folder does not exist: %s", UPLOAD_FOLDER)
         try:
             os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-            print(f"Created upload folder: {UPLOAD_FOLDER}")
+            logger.info("Created upload folder: %s", UPLOAD_FOLDER)
         except Exception as e:
-            print(f"ERROR: Could not create upload folder: {e}")
+            logger.error("Could not create upload folder: %s", e)
     else:
-        print(f"Upload folder exists: {UPLOAD_FOLDER}")
+        logger.debug("Upload folder exists: %s", UPLOAD_FOLDER)
         try:
             test_file = os.path.join(UPLOAD_FOLDER, f"test_{analysis_id}.txt")
             with open(test_file, 'w') as f:
                 f.write(f"Test write at {datetime.now()}")
             os.remove(test_file)
-            print(f"Upload folder is writable")
+            logger.debug("Upload folder is writable")
         except Exception as e:
-            print(f"WARNING: Upload folder may not be writable: {e}")
+            logger.warning("Upload folder may not be writable: %s", e)
     
-    try:
-        # Initialize the results for this analysis
-        analysis_results[analysis_id] = {
-            'status': 'running',
-            'progress': 0,
-            'total_steps': 3,
-            'message': 'Analysis started',
-            'completed': False,
-            'results': None,
-            'error': None,
-            'extracted_citations': [],
-            'citation_results': []
+    # Citations still unverified after this point are reported as unconfirmed
+    deadline = time.time() + ANALYSIS_DEADLINE_SECONDS
+    
+    # Page numbers of each citation, when the document has pages: {citation: [page, ...]}
+    citation_pages = {}
+    
+    # Finished results are cached by document content and the settings that change them
+    result_cache = get_result_cache()
+    verification_settings = {'courtlistener': bool(api_key), 'grouping': CITATION_GROUPING_METHOD}
+    page_count = None
+    
+    # CourtListener case (cluster) IDs by citation, from the lookups made during the analysis
+    cluster_index = {}
+    
+    # Cleared while re-checking cached results, which are already on show
+    publish_each_result = True
+    
+    def add_pages(result_data):
+        pages = citation_pages.get(result_data.get('citation_text'))
+        if pages:
+            result_data['pages'] = list(pages)
+        return result_data
+    
+    def publish_result(index, result_data):
+        add_pages(result_data)
+        if publish_each_result:
+            job_store.append_result(analysis_id, result_data)
+        return result_data
+    
+    # Check citations with LangSearch when there is no CourtListener API key
+    def check_without_courtlistener(citation):
+        logger.debug("No CourtListener API key, checking with LangSearch: %s", citation)
+        langsearch_result = check_case_with_langsearch(citation)
+        
+        result_data = {
+            'citation_text': citation,
+            'is_hallucinated': not langsearch_result['is_real'],
+            'confidence': langsearch_result['confidence'],
+            'explanation': langsearch_result['explanation']
         }
         
-        # Get text from file if provided
-        if file_path and not brief_text:
-            print(f"\n==== EXTRACTING TEXT FROM FILE: {file_path} ====\n")
-            print(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            
-            # Verify file exists and is readable
-            if not os.path.isfile(file_path):
-                error_msg = f"File not found: {file_path}"
-                print(f"ERROR: {error_msg}")
-                analysis_results[analysis_id]['status'] = 'error'
-                analysis_results[analysis_id]['error'] = error_msg
-                analysis_results[analysis_id]['completed'] = True
-                return
-                
-            print(f"File exists and is readable: {file_path}")
-            print(f"File absolute path: {os.path.abspath(file_path)}")
-            print(f"File extension: {os.path.splitext(file_path)[1]}")
-            print(f"File size: {os.path.getsize(file_path)} bytes")
-            print(f"File last modified: {datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"Attempting to extract text...")
-            
-            # Check file permissions
-            try:
-                with open(file_path, 'rb') as test_file:
-                    first_bytes = test_file.read(10)
-                    print(f"Successfully read first bytes of file: {first_bytes}")
-                
-                # Get file size
-                file_size = os.path.getsize(file_path)
-                print(f"Confirmed file size: {file_size} bytes")
-                
-                # Check if file is empty
-                if file_size == 0:
-                    error_msg = f"File is empty: {file_path}"
-                    print(error_msg)
-                    analysis_results[analysis_id]['status'] = 'error'
-                    analysis_results[analysis_id]['error'] = error_msg
-                    analysis_results[analysis_id]['completed'] = True
-                    return
-            except Exception as e:
-                error_msg = f"Error checking file: {str(e)}"
-                print(error_msg)
-                analysis_results[analysis_id]['status'] = 'error'
-                analysis_results[analysis_id]['error'] = error_msg
-                analysis_results[analysis_id]['completed'] = True
-                return
-            
-            # Update progress - Step 1: Extracting text
-            analysis_results[analysis_id]['progress'] = 1
-            analysis_results[analysis_id]['message'] = f'Extracting text from file: {os.path.basename(file_path)}'
-            
-            # Extract text from file
-            brief_text = extract_text_from_file(file_path)
-            
-            if not brief_text:
-                error_msg = f"Failed to extract text from file: {file_path}"
-                print(error_msg)
-                analysis_results[analysis_id]['status'] = 'error'
-                analysis_results[analysis_id]['error'] = error_msg
-                analysis_results[analysis_id]['completed'] = True
-                return
-                
-            # Update progress after extraction
-            analysis_results[analysis_id]['message'] = f'Successfully extracted {len(brief_text)} characters from {os.path.basename(file_path)}'
-            
-            # Save extracted text to a file for debugging
-            try:
-                debug_file = f'extracted_text_{analysis_id}.txt'
-                with open(debug_file, 'w', encoding='utf-8') as f:
-                    f.write(brief_text)
-                print(f"Saved extracted text to {debug_file}")
-            except Exception as e:
-                print(f"Error saving extracted text to file: {e}")
+        # Add summaries if available
+        if 'summaries' in langsearch_result:
+            result_data['summaries'] = langsearch_result['summaries']
         
-        # Use default text if none provided
-        if not brief_text:
-            brief_text = "2016 WL 165971"
-            citations = [brief_text]
-            # Update with default citation
-            analysis_results[analysis_id]['message'] = 'Using default citation for testing'
-        else:
-            # Update progress - Step 2: Extracting citations
-            analysis_results[analysis_id]['progress'] = 2
-            analysis_results[analysis_id]['message'] = 'Extracting citations from document text...'
-            
-            # Extract citations from the text
-            citations = extract_citations(brief_text)
-            
-            # Update with extracted citations
-            analysis_results[analysis_id]['extracted_citations'] = citations
+        return result_data
+    
+    def verify_citation_batch(batch):
+        """Verify a batch of citations, publishing each result as it finishes. Returns results in batch order."""
+        if not api_key:
+            return verify_concurrently(
+                batch,
+                check_without_courtlistener,
+                on_result=publish_result,
+                on_failure=build_unverified_result,
+                max_workers=VERIFICATION_WORKERS,
+                deadline=deadline
+            )
+        
+        # Query the API with the citations we already extracted
+        api_response = query_courtlistener_api(batch, api_key, deadline=deadline)
+        
+        # A failed lookup shouldn't end the analysis; the batch is checked with the fallback instead
+        if 'error' in api_response:
+            logger.warning("CourtListener lookup failed for %s citations, they will be checked with the fallback: %s",
+                           len(batch), api_response['error'])
+            api_response = {
+                'results': [{'citation': citation, 'found': False, 'lookup_failed': True} for citation in batch],
+                'api_response': []
+            }
+        
+        # Remember which case each parallel citation in the response belongs to, for grouping
+        cluster_index.update(build_cluster_index(api_response['api_response']))
+        
+        # Process the API response
+        lookups = api_response['results']
+        results_by_index = {}
+        
+        # Citations found in CourtListener are resolved straight away
+        for i, lookup in enumerate(lookups):
+            if lookup['found']:
+                results_by_index[i] = publish_result(i, build_courtlistener_result(lookup))
+        
+        # Check the rest with LangSearch concurrently, publishing each result as it finishes
+        unresolved = [i for i, lookup in enumerate(lookups) if not lookup['found']]
+        if unresolved:
+            job_store.update(analysis_id, message=f'Checking {len(unresolved)} citations not found in CourtListener...')
             
-            if citations:
-                analysis_results[analysis_id]['message'] = f'Successfully extracted {len(citations)} citations from document'
+            fallback_results = verify_concurrently(
+                [lookups[i]['citation'] for i in unresolved],
+                build_langsearch_result,
+                on_result=publish_result,
+                on_failure=build_unverified_result,
+                max_workers=VERIFICATION_WORKERS,
+                deadline=deadline
+            )
+            results_by_index.update(zip(unresolved, fallback_results))
+        
+        return [results_by_index[i] for i in range(len(lookups))]
+    
+    # Citations are verified in batches as they are found, while the document is still being read
+    verification_executor = ThreadPoolExecutor(max_workers=VERIFICATION_BATCHES)
+    verification_batches = []
+    submitted_citations = []
+    
+    def start_verification(batch):
+        submitted_citations.extend(batch)
+        # Run in a copy of this thread's context so the batch's log records keep the analysis ID
+        verification_batches.append(verification_executor.submit(contextvars.copy_context().run, verify_citation_batch, batch))
+    
+    def extract_page_citations(document_pages):
+        """
+        Run a document's pages through the incremental citation extractor,
+        starting verification of each page's new citations straight away.
+        
+        Args:
+            document_pages: (page number, page text) tuples in order, such as
+                            iter_pdf_pages() yields
+        
+        Returns:
+            (PagedText or None, list of citations)
+        """
+        extractor = IncrementalCitationExtractor()
+        pages = []
+        for page_number, page_text in document_pages:
+            if page_number is None:
+                # Whole-document fallback, without page boundaries
+                if not page_text or page_text.startswith('Error:'):
+                    logger.warning("PDF extraction failed: %s", page_text)
+                    return None, []
+                pages = [page_text]
             else:
-                # If no citations found, treat the entire text as one citation
-                citations = [brief_text[:100] + "..." if len(brief_text) > 100 else brief_text]
-                analysis_results[analysis_id]['message'] = 'No specific citations found, treating entire text as one citation'
-                analysis_results[analysis_id]['extracted_citations'] = citations
+                pages.append(page_text)
+            
+            new_citations = extractor.feed(page_text, page_number)
+            citation_pages.update(extractor.pages)
+            if new_citations:
+                start_verification(new_citations)
+                job_store.update(
+                    analysis_id,
+                    progress=2,
+                    extracted_citations=list(extractor.citations),
+                    message=f'Read {len(pages)} pages, found {len(extractor.citations)} citations so far...'
+                )
+        
+        new_citations = extractor.finish()
+        citation_pages.update(extractor.pages)
+        if new_citations:
+            start_verification(new_citations)
+        
+        logger.info("Found %s citations on %s pages", len(extractor.citations), len(pages))
+        return PagedText(pages), list(extractor.citations)
+    
+    def complete_analysis(citations, citation_results):
+        """Group the verified citations, publish the final results and cache them."""
+        # Results were published as soon as they were ready; add pages found on later pages since
+        for result in citation_results:
+            add_pages(result)
         
-        # Query the CourtListener API
         if api_key:
-            # Update progress - Step 3: Querying API
-            analysis_results[analysis_id]['progress'] = 3
-            analysis_results[analysis_id]['message'] = 'Querying CourtListener API...'
-            
-            # Query the API with the entire text
-            api_response = query_courtlistener_api(brief_text, api_key)
-            
-            # Update with API response
-            if 'error' in api_response:
-                analysis_results[analysis_id]['status'] = 'error'
-                analysis_results[analysis_id]['error'] = f"Error querying CourtListener API: {api_response['error']}"
-                analysis_results[analysis_id]['completed'] = True
-                return
-            
-            # Process the API response
-            hallucinated_count = 0
-            citation_results = []
-            
-            # Debug the API response structure
-            print(f"API response type: {type(api_response)}")
-            if isinstance(api_response, list):
-                print(f"API response is a list with {len(api_response)} items")
-                for i, item in enumerate(api_response):
-                    print(f"Item {i} keys: {item.keys() if isinstance(item, dict) else 'not a dict'}")
-            elif isinstance(api_response, dict):
-                print(f"API response is a dict with keys: {api_response.keys()}")
-            
-            # Process each citation from our extraction
-            for i, citation in enumerate(citations):
-                # Check if this citation is in the API response
-                found = False
-                court_listener_url = None
-                case_name = None
-                
-                # The API response can be a list of citation objects
-                if isinstance(api_response, list):
-                    for api_item in api_response:
-                        if isinstance(api_item, dict) and 'citation' in api_item:
-                            if citation.lower() in api_item['citation'].lower():
-                                found = True
-                                # Check if there are clusters with URLs
-                                if 'clusters' in api_item and api_item['clusters']:
-                                    cluster = api_item['clusters'][0]  # Get the first cluster
-                                    court_listener_url = cluster.get('absolute_url', None)
-                                    if court_listener_url and not court_listener_url.startswith('http'):
-                                        court_listener_url = f"https://www.courtlistener.com{court_listener_url}"
-                                    case_name = cluster.get('case_name', 'Unknown case')
-                                break
-                elif isinstance(api_response, dict) and 'citations' in api_response:
-                    # Traditional structure with citations dictionary
-                    api_citations = api_response['citations']
-                    print(f"API returned citations dictionary with keys: {api_citations.keys() if isinstance(api_citations, dict) else 'not a dict'}")
-                    
-                    # Check if citation is in the citations dictionary
-                    for citation_key, citation_data in api_citations.items():
-                        if citation.lower() in citation_key.lower():
-                            found = True
-                            case_name = citation_data.get('name', 'Unknown case')
-                            # Try to find URL in the citation data
-                            if 'match_url' in citation_data:
-                                court_listener_url = citation_data['match_url']
-                                if not court_listener_url.startswith('http'):
-                                    court_listener_url = f"https://www.courtlistener.com{court_listener_url}"
-                            break
-                    
-                    # Determine the hallucination status
-                    hallucination_status = "not_hallucination"
-                    
-                    # If the case name is 'Unknown case', it's not verified regardless of what the API says
-                    if case_name == 'Unknown case' or not case_name:
-                        found = False  # Not verified if case name is unknown
-                        hallucination_status = "unconfirmed"
-                        confidence = 0.7
-                        explanation = f"Citation format recognized but case name unknown - unconfirmed citation"
-                        
-                        # If we have a URL, it's unconfirmed rather than hallucinated
-                        if court_listener_url:
-                            hallucination_status = "unconfirmed"
-                        else:
-                            hallucination_status = "possible_hallucination"
-                            hallucinated_count += 1
-                    elif found:
-                        # Check if we have both a URL AND a proper case name that is not 'Unknown case'
-                        if court_listener_url and case_name and case_name != 'Unknown case':
-                            confidence = 0.9  # High confidence for exact match
-                            explanation = f"Citation confirmed: {case_name} - {court_listener_url}"
-                            hallucination_status = "not_hallucination"
-                        # If case name is 'Unknown case', mark as potential hallucination even with URL
-                        elif court_listener_url and (not case_name or case_name == 'Unknown case'):
-                            confidence = 0.6
-                            explanation = f"Citation format recognized but case details unknown - potential hallucination"
-                            hallucination_status = "possible_hallucination"
-                        # If we have a case name but no URL, also mark as unconfirmed
-                        elif (not court_listener_url) and case_name and case_name != 'Unknown case':
-                            confidence = 0.7
-                            explanation = f"Citation format recognized with case name '{case_name}' but no URL found - unconfirmed citation"
-                            hallucination_status = "unconfirmed"
-                            # Don't count as hallucinated, but don't count as fully verified either
-                            found = True  # Keep as found but with unconfirmed status
-                        else:
-                            # If we have neither URL nor case name, treat as potential hallucination
-                            found = False
-                            hallucinated_count += 1
-                            confidence = 0.5
-                            explanation = f"Citation format recognized but case details unknown - potential hallucination"
-                            hallucination_status = "possible_hallucination"
-                    
-                    # If not found or no URL, check with LangSearch API
-                    if not found or not court_listener_url:
-                        # Mark as not found if there's no URL - citations without URLs are potential hallucinations
-                        if not court_listener_url and found:
-                            print(f"Citation {citation} has no URL, marking as not found for LangSearch verification")
-                            found = False
-                            
-                        # For Westlaw citations, we don't automatically increment hallucinated_count
-                        # because we want to give LangSearch a chance to verify them
-                        if 'WL' not in citation:
-                            hallucinated_count += 1
-                        
-                        # Check with LangSearch API
-                        print(f"Citation not found in CourtListener database, checking with LangSearch: {citation}")
-                        langsearch_result = check_case_with_langsearch(citation)
-                        
-                        if langsearch_result['is_real']:
-                            # If LangSearch says it's real, reduce the hallucination count (if it was incremented)
-                            if 'WL' not in citation:
-                                hallucinated_count -= 1
-                            found = True
-                            confidence = langsearch_result['confidence']
-                            explanation = langsearch_result['explanation']
-                            
-                            # For Westlaw citations, update the case name if verified by LangSearch
-                            if 'WL' in citation:
-                                result_data['case_name'] = 'Westlaw Citation (Verified by LangSearch)'
-                                result_data['hallucination_status'] = 'verified'
-                            
-                            # Add summaries if available
-                            if 'summaries' in langsearch_result:
-                                summaries = langsearch_result['summaries']
-                        else:
-                            # If LangSearch also says it's hallucinated
-                            confidence = langsearch_result['confidence']
-                            explanation = langsearch_result['explanation']
-                            
-                            # For Westlaw citations that LangSearch couldn't verify, mark as unverified
-                            if 'WL' in citation:
-                                hallucinated_count += 1  # Now we count it as hallucinated
-                                result_data['case_name'] = 'Unverified Westlaw Citation'
-                                result_data['hallucination_status'] = 'unverified'
-                            
-                            # Add summaries if available
-                            if 'summaries' in langsearch_result:
-                                summaries = langsearch_result['summaries']
-                            else:
-                                summaries = []
-                    else:
-                        # Citation found in CourtListener
-                        summaries = []
-                    
-                    # Create the result data dictionary if it doesn't exist yet
-                    if 'citation_text' not in result_data:
-                        # CRITICAL: Citations without URLs should NEVER be marked as verified
-                        # Force hallucination_status to 'possible_hallucination' if there's no URL
-                        if not court_listener_url and hallucination_status != 'unverified':
-                            hallucination_status = 'possible_hallucination'
-                            explanation = "Citation format recognized but no verification URL found - potential hallucination"
-                            confidence = 0.5  # Medium confidence
-                            found = False  # Mark as not found
-                        
-                        # Add result with clearer hallucination marking
-                        result_data = {
-                            'citation_text': citation,
-                            'is_hallucinated': not found or (not court_listener_url and hallucination_status != 'unverified'),
-                            'hallucination_status': hallucination_status,
-                            'confidence': confidence,
-                            'explanation': explanation
-                        }
-                    
-                    # Special handling for Westlaw (WL) citations that haven't been processed yet
-                    if 'WL' in citation and 'case_name' not in result_data:
-                        # For Westlaw citations, we'll try CourtListener first
-                        # If found in CourtListener with a valid case name AND URL, keep that result
-                        if found and case_name and case_name != 'Unknown case' and court_listener_url:
-                            # This is a verified Westlaw citation found in CourtListener with URL
-                            result_data['is_hallucinated'] = False
-                            result_data['hallucination_status'] = 'verified'
-                            result_data['confidence'] = confidence
-                            result_data['case_name'] = case_name
-                            result_data['explanation'] = f"Westlaw citation verified: {case_name}"
-                        else:
-                            # Not found in CourtListener, has unknown case name, or no URL
-                            # Mark as not found and let LangSearch try to verify
-                            found = False
-                            # Explicitly mark as potential hallucination if no URL
-                            if not court_listener_url:
-                                result_data['is_hallucinated'] = True
-                                result_data['hallucination_status'] = 'possible_hallucination'
-                                result_data['explanation'] = "Westlaw citation format recognized but no verification URL found - potential hallucination"
-                                result_data['confidence'] = 0.5  # Medium confidence
-                            # Don't increment hallucinated_count yet - let LangSearch decide
-                            hallucinated_count -= 1  # Counteract the increment that will happen for !found
-                    
-                    # Add CourtListener URL if available
-                    if court_listener_url:
-                        result_data['court_listener_url'] = court_listener_url
-                        # Don't overwrite case name for Westlaw citations if we already set it
-                        if 'case_name' not in result_data:
-                            result_data['case_name'] = case_name or 'Unknown case'
-                        # If case_name is 'Unknown case' and not a Westlaw citation, mark as potential hallucination
-                        # (Westlaw citations are already handled above)
-                        if (case_name == 'Unknown case' or result_data['case_name'] == 'Unknown case') and 'WL' not in citation:
-                            result_data['is_hallucinated'] = True
-                            result_data['hallucination_status'] = 'possible_hallucination'
-                            result_data['explanation'] = "Citation format recognized but case details unknown - potential hallucination"
-                    
-                    # Add summaries if available
-                    if summaries:
-                        result_data['summaries'] = summaries
-                    
-                    citation_results.append(result_data)
-            # If we haven't processed any citations yet, it means the API response format wasn't recognized
-            if not citation_results:
-                print("API response format not recognized or no citations found")
-                print(f"API response: {api_response}")
-                
-                # Try one more approach - if the API response is a list of items with citation info
-                if isinstance(api_response, list):
-                    for i, citation in enumerate(citations):
-                        found = False
-                        court_listener_url = None
-                        case_name = None
-                        
-                        # Check each item in the response list
-                        for api_item in api_response:
-                            # Look for the citation in normalized_citations if available
-                            if isinstance(api_item, dict) and 'normalized_citations' in api_item:
-                                # First check exact match in normalized_citations
-                                for norm_citation in api_item['normalized_citations']:
-                                    if citation.lower() == norm_citation.lower():
-                                        found = True
-                                        # Get case info from clusters if available
-                                        if 'clusters' in api_item and api_item['clusters']:
-                                            cluster = api_item['clusters'][0]
-                                            court_listener_url = cluster.get('absolute_url', None)
-                                            if court_listener_url and not court_listener_url.startswith('http'):
-                                                court_listener_url = f"https://www.courtlistener.com{court_listener_url}"
-                                            case_name = cluster.get('case_name', 'Unknown case')
-                                        break
-                                
-                                # If not found, check if this is an alternative citation format
-                                if not found and 'clusters' in api_item and api_item['clusters']:
-                                    cluster = api_item['clusters'][0]
-                                    if 'citations' in cluster:
-                                        # Check all alternative citations for this case
-                                        for alt_citation in cluster['citations']:
-                                            # Construct the citation string in various formats
-                                            volume = str(alt_citation.get('volume', ''))
-                                            reporter = alt_citation.get('reporter', '')
-                                            page = alt_citation.get('page', '')
-                                            
-                                            # Format 1: "550 U.S. 544"
-                                            alt_format1 = f"{volume} {reporter} {page}"
-                                            # Format 2: "550 U. S. 544"
-                                            alt_format2 = alt_format1.replace('.', '. ')
-                                            # Format 3: "550U.S.544"
-                                            alt_format3 = f"{volume}{reporter}{page}"
-                                            
-                                            # Compare with our citation
-                                            citation_clean = citation.replace(' ', '').replace('.', '')
-                                            alt_format1_clean = alt_format1.replace(' ', '').replace('.', '')
-                                            alt_format2_clean = alt_format2.replace(' ', '').replace('.', '')
-                                            alt_format3_clean = alt_format3.replace(' ', '').replace('.', '')
-                                            
-                                            if (citation_clean == alt_format1_clean or 
-                                                citation_clean == alt_format2_clean or 
-                                                citation_clean == alt_format3_clean):
-                                                found = True
-                                                court_listener_url = cluster.get('absolute_url', None)
-                                                if court_listener_url and not court_listener_url.startswith('http'):
-                                                    court_listener_url = f"https://www.courtlistener.com{court_listener_url}"
-                                                case_name = cluster.get('case_name', 'Unknown case')
-                                                break
-                            if found:
-                                break
-                                
-                        # Add result for this citation
-                        if found:
-                            result_data = {
-                                'citation_text': citation,
-                                'is_hallucinated': False,
-                                'confidence': 0.9,
-                                'explanation': f"Citation confirmed: {case_name}{' - ' + court_listener_url if court_listener_url else ''}"
-                            }
-                            
-                            # If case_name is 'Unknown case', change the explanation and mark as potential hallucination
-                            if case_name == 'Unknown case':
-                                result_data['explanation'] = f"Citation format recognized but case details unknown - potential hallucination"
-                                result_data['is_hallucinated'] = True
-                                result_data['hallucination_status'] = 'possible_hallucination'
-                            
-                            # Add CourtListener URL if available
-                            if court_listener_url:
-                                result_data['court_listener_url'] = court_listener_url
-                                result_data['case_name'] = case_name or 'Unknown case'
-                                # If case_name is 'Unknown case', ensure it's marked as a potential hallucination
-                                if case_name == 'Unknown case':
-                                    result_data['is_hallucinated'] = True
-                                    result_data['hallucination_status'] = 'possible_hallucination'
-                            citation_results.append(result_data)
-                        else:
-                            # Check with LangSearch API
-                            print(f"Citation not found in CourtListener database, checking with LangSearch: {citation}")
-                            langsearch_result = check_case_with_langsearch(citation)
-                            
-                            if langsearch_result['is_real']:
-                                # LangSearch says it's real
-                                result_data = {
-                                    'citation_text': citation,
-                                    'is_hallucinated': False,
-                                    'confidence': langsearch_result['confidence'],
-                                    'explanation': langsearch_result['explanation']
-                                }
-                                
-                                # Add summaries if available
-                                if 'summaries' in langsearch_result:
-                                    result_data['summaries'] = langsearch_result['summaries']
-                            else:
-                                # LangSearch also says it's hallucinated
-                                hallucinated_count += 1
-                                result_data = {
-                                    'citation_text': citation,
-                                    'is_hallucinated': True,
-                                    'confidence': langsearch_result['confidence'],
-                                    'explanation': langsearch_result['explanation']
-                                }
-                                
-                                # Add summaries if available
-                                if 'summaries' in langsearch_result:
-                                    result_data['summaries'] = langsearch_result['summaries']
-                                    
-                            citation_results.append(result_data)
-                else:
-                    # Mark all citations as potentially hallucinated if we can't process the API response
-                    for i, citation in enumerate(citations):
-                        hallucinated_count += 1
-                        citation_results.append({
-                            'citation_text': citation,
-                            'is_hallucinated': True,
-                            'confidence': 0.7,
-                            'explanation': "Citation not verified by CourtListener API"
-                        })
+            hallucinated_count = len([r for r in citation_results if r['is_hallucinated']])
             
             # Prepare citations for grouping
             citations_for_grouping = []
@@ -993,6 +1064,7 @@ def run_analysis(analysis_id, brief_text=None, file_path=None, api_key=None):
                     'url': result.get('court_listener_url', ''),
                     'source': result.get('method', 'Unknown'),
                     'is_hallucinated': result['is_hallucinated'],
+                    'cluster_id': result.get('cluster_id'),
                     'details': {
                         'confidence': result['confidence'],
                         'explanation': result['explanation']
@@ -1006,7 +1078,8 @@ def run_analysis(analysis_id, brief_text=None, file_path=None, api_key=None):
                 citations_for_grouping.append(citation_dict)
             
             # Group citations using the citation_grouping module
-            grouped_citations_list = group_citations(citations_for_grouping, method='url_then_name')
+            grouped_citations_list = group_citations(citations_for_grouping, method=CITATION_GROUPING_METHOD,
+                                                     cluster_index=cluster_index)
             
             # Convert grouped citations to the format expected by the frontend
             grouped_citation_results = []
@@ -1026,24 +1099,28 @@ def run_analysis(analysis_id, brief_text=None, file_path=None, api_key=None):
                     for alt in group['alternate_citations']:
                         result_dict['parallel_citations'].append(alt['citation'])
                 
+                # Pages where any of the case's citations appear
+                group_pages = set()
+                for citation in [group['citation']] + result_dict['parallel_citations']:
+                    group_pages.update(citation_pages.get(citation, []))
+                if group_pages:
+                    result_dict['pages'] = sorted(group_pages)
+                
                 # Add summaries if available
                 if 'summaries' in group:
                     result_dict['summaries'] = group['summaries']
                     
                 grouped_citation_results.append(result_dict)
             
-            # Update with grouped citation results
-            analysis_results[analysis_id]['citation_results'] = grouped_citation_results
+            final_results = grouped_citation_results
             
             # Complete the analysis
-            analysis_results[analysis_id]['status'] = 'complete'
             unique_cases_count = len(grouped_citation_results)
             verified_unique_cases = len([c for c in grouped_citation_results if not c['is_hallucinated']])
             
             # Create a more informative message that explains the difference between citations and cases
-            analysis_results[analysis_id]['message'] = f"Analysis complete. Found {len(citations)} total citations grouped into {unique_cases_count} unique cases, {hallucinated_count} potentially hallucinated."
-            analysis_results[analysis_id]['completed'] = True
-            analysis_results[analysis_id]['results'] = {
+            message = f"Analysis complete. Found {len(citations)} total citations grouped into {unique_cases_count} unique cases, {hallucinated_count} potentially hallucinated."
+            summary = {
                 'total_individual_citations': len(citations),
                 'total_unique_cases': unique_cases_count,
                 'hallucinated_citations': hallucinated_count,
@@ -1051,54 +1128,217 @@ def run_analysis(analysis_id, brief_text=None, file_path=None, api_key=None):
                 'verified_unique_cases': verified_unique_cases
             }
         else:
-            # No API key provided, mark all citations as unverified
-            analysis_results[analysis_id]['message'] = 'No CourtListener API key provided, unable to verify citations'
+            final_results = citation_results
+            message = f"Analysis complete without API verification. Found {len(citations)} citations."
+            summary = {
+                'total_citations': len(citations),
+                'hallucinated_citations': len(citations),
+                'verified_citations': 0
+            }
+        
+        # Update with the final results and complete the analysis
+        job_store.set_results(analysis_id, final_results)
+        job_store.update(analysis_id, status='complete', message=message, completed=True, results=summary)
+        
+        if result_cache is not None and document_hash:
+            result_cache.set(document_hash, verification_settings, {
+                'citations': citations,
+                'citation_pages': citation_pages,
+                'page_count': page_count,
+                'citation_results': citation_results,
+                'results': final_results,
+                'summary': summary,
+                'message': message
+            })
+    
+    def find_cached_analysis():
+        if result_cache is None or not document_hash:
+            return None
+        return result_cache.get(document_hash, verification_settings)
+    
+    def resume_cached_analysis(entry):
+        """
+        Show the cached results of an earlier analysis of the same document straight away,
+        re-checking only the citations that may have changed since.
+        """
+        nonlocal publish_each_result, page_count
+        
+        citations = entry['citations']
+        citation_pages.update(entry['citation_pages'])
+        page_count = entry.get('page_count')
+        verified_on = datetime.fromtimestamp(entry['created_at']).strftime('%Y-%m-%d %H:%M')
+        logger.info("Using cached results from %s for document %s", verified_on, document_hash[:12])
+        
+        job_store.set_results(analysis_id, entry['results'])
+        job_store.update(analysis_id, progress=3, page_count=page_count,
+                         extracted_citations=citations, citation_pages=citation_pages)
+        
+        recheck = citations_to_revalidate(entry, RESULT_REVALIDATE_AFTER_SECONDS)
+        if not recheck:
+            job_store.update(analysis_id, status='complete', completed=True, results=entry['summary'],
+                             message=f"{entry['message']} (Results from {verified_on}.)")
+            return
+        
+        job_store.update(analysis_id,
+                         message=f'Showing results from {verified_on}; re-checking {len(recheck)} of {len(citations)} citations...')
+        publish_each_result = False
+        citation_results = list(entry['citation_results'])
+        rechecked = verify_citation_batch([citation_results[i]['citation_text'] for i in recheck])
+        for i, result in zip(recheck, rechecked):
+            citation_results[i] = result
+        complete_analysis(citations, citation_results)
+    
+    try:
+        # The job was created as 'queued' by /analyze; create it if run directly
+        if job_store.get(analysis_id) is None:
+            job_store.create(analysis_id, new_job_state('running', 'Analysis started'))
+        else:
+            job_store.update(analysis_id, status='running', message='Analysis started')
+        
+        # Set when citations were extracted while streaming the document
+        citations = None
+        
+        # Pasted text is identified by its own hash
+        if brief_text:
+            document_hash = hashlib.sha256(brief_text.encode('utf-8')).hexdigest()
+            job_store.update(analysis_id, document_hash=document_hash)
+            
+            cached_analysis = find_cached_analysis()
+            if cached_analysis:
+                resume_cached_analysis(cached_analysis)
+                return
+        
+        # Get text from file if provided
+        if file_path and not brief_text:
+            logger.info("Extracting text from file: %s", file_path)
             
-            # Check citations with LangSearch even if no CourtListener API key
-            citation_results = []
-            for i, citation in enumerate(citations):
-                # Check with LangSearch API
-                print(f"No CourtListener API key, checking with LangSearch: {citation}")
-                langsearch_result = check_case_with_langsearch(citation)
+            # Verify file exists and is readable
+            if not os.path.isfile(file_path):
+                error_msg = f"File not found: {file_path}"
+                logger.error(error_msg)
+                job_store.update(analysis_id, status='error', error=error_msg, completed=True)
+                return
+            
+            # Check the file size
+            try:
+                file_size = os.path.getsize(file_path)
+                logger.debug("Confirmed file size: %s bytes", file_size)
                 
-                result_data = {
-                    'citation_text': citation,
-                    'is_hallucinated': not langsearch_result['is_real'],
-                    'confidence': langsearch_result['confidence'],
-                    'explanation': langsearch_result['explanation']
-                }
+                # Check if file is empty
+                if file_size == 0:
+                    error_msg = f"File is empty: {file_path}"
+                    logger.error(error_msg)
+                    job_store.update(analysis_id, status='error', error=error_msg, completed=True)
+                    return
+            except Exception as e:
+                error_msg = f"Error checking file: {str(e)}"
+                logger.error(error_msg)
+                job_store.update(analysis_id, status='error', error=error_msg, completed=True)
+                return
+            
+            # Update progress - Step 1: Extracting text
+            job_store.update(analysis_id, progress=1, message=f'Extracting text from file: {os.path.basename(file_path)}')
+            
+            # Documents are cached by content, so a repeat upload skips extraction entirely
+            document_cache = get_document_cache()
+            if document_hash is None:
+                document_hash = hash_file(file_path)
+            job_store.update(analysis_id, document_hash=document_hash)
+            
+            cached_analysis = find_cached_analysis()
+            if cached_analysis:
+                resume_cached_analysis(cached_analysis)
+                return
+            
+            if document_cache is not None:
+                brief_text = document_cache.get(document_hash)
+                if brief_text:
+                    logger.info("Using cached text of document %s", document_hash[:12])
+                if isinstance(brief_text, PagedText):
+                    # Same extraction as a fresh run, so citations split across page breaks are still found
+                    brief_text, citations = extract_page_citations(enumerate(brief_text.pages, 1))
+            
+            # Extract text from file; PDF pages are streamed and their citations verified as they are found
+            if not brief_text:
+                try:
+                    if file_path.lower().endswith('.pdf'):
+                        brief_text, citations = extract_page_citations(extraction_pool.iter_pdf_pages(file_path))
+                    else:
+                        brief_text = extract_text_from_file(file_path)
+                except ExtractionError as e:
+                    error_msg = f"Failed to extract text from file {os.path.basename(file_path)}: {e}"
+                    logger.error(error_msg)
+                    job_store.update(analysis_id, status='error', error=error_msg, completed=True)
+                    return
                 
-                # Add summaries if available
-                if 'summaries' in langsearch_result:
-                    result_data['summaries'] = langsearch_result['summaries']
+                if document_cache is not None and brief_text and not brief_text.startswith('Error:'):
+                    document_cache.set(document_hash, brief_text)
+            
+            if not brief_text:
+                error_msg = f"Failed to extract text from file: {file_path}"
+                logger.error(error_msg)
+                job_store.update(analysis_id, status='error', error=error_msg, completed=True)
+                return
                 
-                citation_results.append(result_data)
+            # Update progress after extraction
+            page_count = getattr(brief_text, 'page_count', None)
+            job_store.update(
+                analysis_id,
+                page_count=page_count,
+                message=f'Successfully extracted {len(brief_text)} characters' +
+                        (f' from {page_count} pages' if page_count else '') +
+                        f' of {os.path.basename(file_path)}'
+            )
+        
+        # Use default text if none provided
+        if not brief_text:
+            brief_text = "2016 WL 165971"
+            citations = [brief_text]
+            # Update with default citation
+            job_store.update(analysis_id, message='Using default citation for testing')
+        else:
+            if citations is None:
+                # Update progress - Step 2: Extracting citations
+                job_store.update(analysis_id, progress=2, message='Extracting citations from document text...')
                 
-                # Update hallucinated count
-                if not langsearch_result['is_real']:
-                    hallucinated_count += 1
+                # Extract citations from the text, noting their page numbers for PDFs
+                citations = extract_citations(brief_text, pages=citation_pages)
             
-            # Update with citation results
-            analysis_results[analysis_id]['citation_results'] = citation_results
+            # Update with extracted citations
+            job_store.update(analysis_id, extracted_citations=citations, citation_pages=citation_pages)
             
-            # Complete the analysis
-            analysis_results[analysis_id]['status'] = 'complete'
-            analysis_results[analysis_id]['message'] = f"Analysis complete without API verification. Found {len(citations)} citations."
-            analysis_results[analysis_id]['completed'] = True
-            analysis_results[analysis_id]['results'] = {
-                'total_citations': len(citations),
-                'hallucinated_citations': len(citations),
-                'verified_citations': 0
-            }
+            if citations:
+                job_store.update(analysis_id, message=f'Successfully extracted {len(citations)} citations from document')
+            else:
+                # If no citations found, treat the entire text as one citation
+                citations = [brief_text[:100] + "..." if len(brief_text) > 100 else brief_text]
+                job_store.update(analysis_id, message='No specific citations found, treating entire text as one citation',
+                                 extracted_citations=citations)
+        
+        # Update progress - Step 3: Verifying the citations not already sent for verification
+        if api_key:
+            job_store.update(analysis_id, progress=3, message='Querying CourtListener API...')
+        else:
+            # No API key provided, mark all citations as unverified
+            job_store.update(analysis_id, progress=3, message='No CourtListener API key provided, unable to verify citations')
+        
+        if citations[len(submitted_citations):]:
+            start_verification(citations[len(submitted_citations):])
+        
+        # Collect the results in citation order
+        citation_results = [result for batch in verification_batches for result in batch.result()]
+        
+        complete_analysis(citations, citation_results)
     
     except Exception as e:
-        print(f"Error running analysis: {e}")
-        traceback.print_exc()
+        logger.exception("Error running analysis: %s", e)
         
         # Update with error
-        analysis_results[analysis_id]['status'] = 'error'
-        analysis_results[analysis_id]['error'] = f"Error running analysis: {str(e)}"
-        analysis_results[analysis_id]['completed'] = True
+        job_store.update(analysis_id, status='error', error=f"Error running analysis: {str(e)}", completed=True)
+    
+    finally:
+        # Drop verification batches that haven't started if the analysis stopped early
+        verification_executor.shutdown(wait=False, cancel_futures=True)
 
 # Routes
 @app.route('/')
@@ -1116,101 +1356,77 @@ def analyze():
         return response
         
     if request.method == 'POST':
-        print("\n\n==== ANALYZE ENDPOINT CALLED =====")
-        print(f"Request method: {request.method}")
-        print(f"Request headers: {request.headers}")
-        print(f"Content-Type: {request.content_type}")
-        print(f"Request form data: {request.form}")
-        print(f"Request files: {list(request.files.keys()) if request.files else 'No files'}")
-        
-        # Debug the raw request data
-        try:
-            raw_data = request.get_data()
-            print(f"Raw request data length: {len(raw_data)} bytes")
-            print(f"Raw request data (first 100 bytes): {raw_data[:100]}")
-        except Exception as e:
-            print(f"Error reading raw request data: {e}")
-            traceback.print_exc()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Analyze request: Content-Type %s, form fields %s, files %s, headers %s",
+                         request.content_type, list(request.form.keys()), list(request.files.keys()), dict(request.headers))
         
         try:
             # Generate a unique analysis ID
             analysis_id = generate_analysis_id()
-            print(f"Generated analysis ID: {analysis_id}")
+            logger.debug("Generated analysis ID: %s", analysis_id)
             
             # Initialize variables
             brief_text = None
             file_path = None
+            document_hash = None
         
             # Get the API key if provided, otherwise use the default from config.json
             api_key = DEFAULT_API_KEY  # Use the default API key loaded from config.json
+            user_api_key = None
             if 'api_key' in request.form and request.form['api_key'].strip():
-                api_key = request.form['api_key'].strip()
-                print(f"API key provided in form: {api_key[:5]}...")
+                api_key = user_api_key = request.form['api_key'].strip()
+                logger.debug("Using the API key provided in the form")
             else:
-                print(f"Using default API key from config.json: {api_key[:5]}..." if api_key else "No API key provided or found in config.json")
+                logger.debug("Using the default API key from config.json" if api_key else "No API key provided or found in config.json")
         
             # Check if a file was uploaded
             if 'file' in request.files:
                 file = request.files['file']
-                print(f"File object: {file}, filename: {file.filename if file else 'None'}")
+                logger.debug("File object: %s, filename: %s", file, file.filename if file else 'None')
                 if file and file.filename and allowed_file(file.filename):
-                    print(f"File uploaded: {file.filename}")
+                    logger.info("File uploaded: %s", file.filename)
                     filename = secure_filename(file.filename)
                     
                     # Ensure upload folder exists
                     try:
                         os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-                        print(f"Ensured upload folder exists: {UPLOAD_FOLDER}")
+                        logger.debug("Ensured upload folder exists: %s", UPLOAD_FOLDER)
                     except Exception as e:
-                        print(f"Error creating upload folder: {e}")
-                        traceback.print_exc()
+                        logger.exception("Error creating upload folder: %s", e)
                         return jsonify({
                             'status': 'error',
                             'message': f'Error creating upload folder: {str(e)}'
                         }), 500
                     
-                    # Save file
-                    file_path = os.path.join(UPLOAD_FOLDER, filename)
-                    print(f"Attempting to save file to: {file_path}")
+                    # The upload was streamed into the upload folder and hashed as it arrived;
+                    # name it by content so concurrent uploads with the same filename don't collide
+                    upload = file.stream
+                    document_hash = upload.sha256
+                    file_path = os.path.join(UPLOAD_FOLDER, f"{document_hash[:16]}_{filename}")
+                    logger.debug("Attempting to save file to: %s", file_path)
                     try:
-                        file.save(file_path)
-                        print(f"File successfully saved to: {file_path}")
-                        
-                        # Debug: Print file size and first few bytes
-                        try:
-                            file_size = os.path.getsize(file_path)
-                            print(f"File size: {file_size} bytes")
-                            with open(file_path, 'rb') as f:
-                                first_bytes = f.read(100)
-                                print(f"First few bytes: {first_bytes}")
-                        except Exception as e:
-                            print(f"Error reading file: {e}")
-                            traceback.print_exc()
-                            return jsonify({
-                                'status': 'error',
-                                'message': f'Error reading saved file: {str(e)}'
-                            }), 500
+                        upload.keep(file_path)
+                        logger.info("File successfully saved to: %s (%s bytes, sha256 %s)", file_path, upload.size, document_hash[:12])
                     except Exception as e:
-                        print(f"Error saving file: {e}")
-                        traceback.print_exc()
+                        logger.exception("Error saving file: %s", e)
                         return jsonify({
                             'status': 'error',
                             'message': f'Error saving file: {str(e)}'
                         }), 500
                 else:
                     error_msg = f"File validation failed: filename={file.filename if file else 'None'}, allowed={allowed_file(file.filename) if file and file.filename else False}"
-                    print(error_msg)
+                    logger.error(error_msg)
                     return jsonify({
                         'status': 'error',
                         'message': error_msg
                     }), 400
             else:
-                print("No file found in request.files")
+                logger.debug("No file found in request.files")
         
             # Check if a file path was provided
             if 'file_path' in request.form:
                 file_path = request.form['file_path'].strip()
-                print(f"File path provided: {file_path}")
+                logger.debug("File path provided: %s", file_path)
                 
                 # Handle file:/// URLs
                 if file_path.startswith('file:///'):
@@ -1218,7 +1434,7 @@ def analyze():
                 
                 # Check if the file exists
                 if not os.path.isfile(file_path):
-                    print(f"File not found: {file_path}")
+                    logger.warning("File not found: %s", file_path)
                     return jsonify({
                         'status': 'error',
                         'message': f'File not found: {file_path}'
@@ -1226,61 +1442,66 @@ def analyze():
                 
                 # Check if the file extension is allowed
                 if not allowed_file(file_path):
-                    print(f"File extension not allowed: {file_path}")
+                    logger.warning("File extension not allowed: %s", file_path)
                     return jsonify({
                         'status': 'error',
                         'message': f'File extension not allowed: {file_path}'
                     }), 400
                 
-                print(f"Using file from path: {file_path}")
+                logger.debug("Using file from path: %s", file_path)
                 
-                # Debug: Print file size and first few bytes
+                # Local files aren't hashed on upload; run_analysis hashes them
+                document_hash = None
                 try:
                     file_size = os.path.getsize(file_path)
-                    print(f"File size: {file_size} bytes")
-                    with open(file_path, 'rb') as f:
-                        first_bytes = f.read(100)
-                        print(f"First few bytes: {first_bytes}")
+                    logger.debug("File size: %s bytes", file_size)
                 except Exception as e:
-                    print(f"Error reading file: {e}")
+                    logger.warning("Error reading file: %s", e)
         
             # Get brief text from form if provided
             if 'brief_text' in request.form and request.form['brief_text'].strip():
                 brief_text = request.form['brief_text'].strip()
-                print(f"Brief text provided: {brief_text[:100]}...")
+                logger.debug("Brief text provided: %s...", brief_text[:100])
             elif 'briefText' in request.form:  # For backward compatibility
                 brief_text = request.form['briefText']
-                print(f"Brief text from form: {brief_text[:100]}...")
+                logger.debug("Brief text from form: %s...", brief_text[:100])
         
             # Check if we have either text or a file
             if not brief_text and not file_path:
-                print("No text or file provided")
+                logger.warning("No text or file provided")
                 return jsonify({
                     'status': 'error',
                     'message': 'No text or file provided'
                 }), 400
             
-            # Log before starting analysis
-            print(f"About to start analysis with ID: {analysis_id}")
-            print(f"Brief text: {'Present' if brief_text else 'None'}")
-            print(f"File path: {file_path}")
-            print(f"API key: {'Present' if api_key else 'None'}")
-            
-            # Start the analysis in a background thread
-            analysis_thread = threading.Thread(target=run_analysis, args=(analysis_id, brief_text, file_path, api_key))
-            analysis_thread.daemon = True  # Make thread a daemon so it doesn't block application shutdown
-            analysis_thread.start()
-            print(f"Analysis thread started with ID: {analysis_id}")
+            # Queue the analysis for the worker pool; the job exists before a worker can pick it up
+            job_store.create(analysis_id, new_job_state('queued', 'Waiting for a free worker'))
+            try:
+                queue_position = analysis_queue.submit(
+                    analysis_id, run_analysis, analysis_id, brief_text, file_path, api_key, document_hash,
+                    user=queue_user(user_api_key)
+                )
+            except QueueFullError as e:
+                logger.warning("Rejected analysis %s: %s", analysis_id, e)
+                job_store.delete(analysis_id)
+                response = jsonify({
+                    'status': 'error',
+                    'message': str(e),
+                    'retry_after': e.retry_after
+                })
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, e.status_code
+            logger.info("Analysis queued with ID: %s at position %s", analysis_id, queue_position)
             
             # Return the analysis ID
             return jsonify({
                 'status': 'success',
-                'message': 'Analysis started',
-                'analysis_id': analysis_id
+                'message': 'Analysis queued',
+                'analysis_id': analysis_id,
+                'queue_position': queue_position
             })
         except Exception as e:
-            print(f"Error in analyze endpoint: {e}")
-            traceback.print_exc()
+            logger.exception("Error in analyze endpoint: %s", e)
             return jsonify({
                 'status': 'error',
                 'message': f'Error: {str(e)}'
@@ -1291,20 +1512,49 @@ def analyze():
 
 @app.route('/status')
 def status():
-    """Get the status of an analysis."""
-    print("\n\n==== STATUS ENDPOINT CALLED =====")
+    """
+    Get the status of an analysis.
     
+    Without a cursor this returns the whole analysis, including its 'cursor'.
+    With ?since=<cursor> it returns only the status fields and the events
+    recorded after that cursor, so polling clients don't re-download every result.
+    """
     # Get the analysis ID from the query string
     analysis_id = request.args.get('id')
     if not analysis_id:
         return jsonify({'status': 'error', 'message': 'No analysis ID provided'}), 400
     
-    # Check if the analysis exists
-    if analysis_id not in analysis_results:
-        return jsonify({'status': 'error', 'message': 'Analysis not found'}), 404
-    
-    # Return the current status
-    response = jsonify(analysis_results[analysis_id])
+    since = request.args.get('since')
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Invalid since cursor'}), 400
+        
+        events = job_store.get_events(analysis_id, since)
+        if events is None:
+            return jsonify({'status': 'error', 'message': 'Analysis not found'}), 404
+        
+        # Status fields only; citation results arrive as 'result'/'results' events
+        job = {}
+        for event in events:
+            if event['event'] in ('progress', 'complete', 'error'):
+                job.update(event['data'])
+        job['events'] = events
+        job['cursor'] = events[-1]['id'] if events else since
+        job['queue_position'] = analysis_queue.position(analysis_id)
+        response = jsonify(job)
+    else:
+        # Check if the analysis exists (it may also have expired)
+        job = job_store.get(analysis_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Analysis not found'}), 404
+        
+        # Position in the analysis queue (None once a worker has started it)
+        job['queue_position'] = analysis_queue.position(analysis_id)
+        
+        # Return the current status
+        response = jsonify(job)
     
     # Add CORS headers to allow cross-origin requests
     response.headers.add('Access-Control-Allow-Origin', '*')
@@ -1312,6 +1562,55 @@ def status():
     
     return response
 
+@app.route('/stream')
+def stream():
+    """
+    Stream an analysis's events with Server-Sent Events.
+    
+    Each event has an id, so a reconnecting EventSource resumes from its
+    Last-Event-ID header (or ?last_event_id=) instead of starting over. The
+    stream ends after the 'complete' or 'error' event.
+    """
+    analysis_id = request.args.get('id')
+    if not analysis_id:
+        return jsonify({'status': 'error', 'message': 'No analysis ID provided'}), 400
+    
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or 0)
+    except ValueError:
+        last_event_id = 0
+    
+    if job_store.get_events(analysis_id, last_event_id) is None:
+        return jsonify({'status': 'error', 'message': 'Analysis not found'}), 404
+    
+    def generate():
+        cursor = last_event_id
+        # Tell the browser how long to wait before reconnecting
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+        
+        while True:
+            # Blocks until there are new events; a timeout sends a keepalive
+            events = job_store.wait_for_events(analysis_id, cursor, timeout=STREAM_KEEPALIVE_SECONDS)
+            if events is None:
+                yield f'event: error\ndata: {json.dumps({"status": "error", "error": "Analysis not found"})}\n\n'
+                return
+            if not events:
+                yield ': keepalive\n\n'
+                continue
+            
+            for event in events:
+                cursor = event['id']
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                if event['event'] in ('complete', 'error'):
+                    return
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    response.headers.add('Cache-Control', 'no-cache')
+    # Stop nginx from buffering the stream
+    response.headers.add('X-Accel-Buffering', 'no')
+    return response
+
 if __name__ == '__main__':
     # Check if we should run with Cheroot (production) or Flask's dev server
     use_cheroot = os.environ.get('USE_CHEROOT', 'True').lower() in ('true', '1', 't')
@@ -1319,7 +1618,7 @@ if __name__ == '__main__':
     if use_cheroot:
         try:
             from cheroot.wsgi import Server as WSGIServer
-            print("Starting with Cheroot WSGI server (production mode)")
+            logger.info("Starting with Cheroot WSGI server (production mode)")
             
             # Check if we should use a Unix socket (for Nginx)
             unix_socket = os.environ.get('UNIX_SOCKET')
@@ -1340,17 +1639,17 @@ if __name__ == '__main__':
                     if os.path.exists(unix_socket):
                         os.unlink(unix_socket)
                     
-                    print(f"Server starting on Unix socket: {unix_socket}")
+                    logger.info("Server starting on Unix socket: %s", unix_socket)
                     server.start()
                     
                     # Set socket permissions for Nginx
                     import stat
                     os.chmod(unix_socket, stat.S_IRWXU | stat.S_IRWXG | stat.S_IRWXO)
-                    print(f"Socket permissions set for Nginx access")
+                    logger.info("Socket permissions set for Nginx access")
                     
                 except KeyboardInterrupt:
                     server.stop()
-                    print("Server stopped.")
+                    logger.info("Server stopped.")
                     if os.path.exists(unix_socket):
                         os.unlink(unix_socket)
             else:
@@ -1360,21 +1659,21 @@ if __name__ == '__main__':
                 
                 server = WSGIServer((host, port), app)
                 try:
-                    print(f"Server started on http://{host}:{port}")
+                    logger.info("Server started on http://%s:%s", host, port)
                     server.start()
                 except KeyboardInterrupt:
                     server.stop()
-                    print("Server stopped.")
+                    logger.info("Server stopped.")
         except ImportError:
-            print("Cheroot not installed. Installing now...")
+            logger.warning("Cheroot not installed. Installing now...")
             try:
                 subprocess.check_call([sys.executable, "-m", "pip", "install", "cheroot"])
-                print("Cheroot installed. Please restart the application.")
+                logger.info("Cheroot installed. Please restart the application.")
                 sys.exit(0)
             except Exception as e:
-                print(f"Failed to install Cheroot: {e}")
-                print("Falling back to Flask development server")
+                logger.error("Failed to install Cheroot: %s", e)
+                logger.warning("Falling back to Flask development server")
                 app.run(debug=True, host='127.0.0.1', port=8000)
     else:
-        print("Starting with Flask development server (debug mode)")
+        logger.info("Starting with Flask development server (debug mode)")
         app.run(debug=True, host='127.0.0.1', port=8000)
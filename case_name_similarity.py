@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Bulk Case Name Similarity for CaseStrainer
+
+Finds similar case names across large sets of cases (for example the cases of
+many documents, to find duplicates) in one vectorized pass instead of
+comparing names pair by pair:
+
+1. Every name is normalized once (see citation_grouping.normalize_case_name())
+   and duplicates are collapsed.
+2. The names are turned into TF-IDF vectors of their character n-grams, which
+   tolerates abbreviations and typos ("Wash." / "Washington") better than
+   whole-word overlap.
+3. The sparse similarity matrix is computed block by block, keeping only the
+   pairs above the threshold, so memory stays bounded however many names there are.
+
+group_citations(method='tfidf') uses it to match the case names of citations.
+
+scikit-learn is optional. Without it, find_similar_case_names() falls back to
+the word-overlap index in citation_grouping, which scores names differently
+but finds the same kind of candidates.
+"""
+
+from typing import List, Tuple
+
+from citation_grouping import normalize_case_name, find_similar_names, DisjointSet
+
+# scikit-learn is optional; without it similar names are found by word overlap
+try:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+# Minimum cosine similarity of two names' n-gram vectors to be considered the same case
+TFIDF_SIMILARITY_THRESHOLD = 0.7
+
+# Character n-gram lengths, taken within words
+NGRAM_RANGE = (2, 4)
+
+# In sets of at least MIN_NAMES_TO_PRUNE names, n-grams found in more than this share of
+# them (" v ", "cou", ...) are left out: they say little about which case a name is, and
+# would make almost every pair of names similar enough to have to be scored
+MAX_NGRAM_SHARE = 0.02
+MIN_NAMES_TO_PRUNE = 1000
+
+# Most similarity matrix entries computed at once (bounds memory for large sets)
+MAX_BLOCK_ENTRIES = 10_000_000
+
+
+def find_similar_case_names(case_names: List[str], threshold: float = TFIDF_SIMILARITY_THRESHOLD,
+                            use_tfidf: bool = True) -> List[Tuple[int, int, float]]:
+    """
+    Find the pairs of case names that are at least threshold similar.
+
+    Args:
+        case_names: Case names as written (they are normalized here)
+        threshold: Minimum similarity between 0 and 1
+        use_tfidf: Use character n-gram TF-IDF if scikit-learn is installed;
+                   otherwise names are compared by word overlap
+
+    Returns:
+        List of (index, other index, similarity) tuples into case_names, with
+        index < other index. Names that normalize to the same text have
+        similarity 1.0; names that normalize to nothing are never matched.
+    """
+    # Normalize each name once and collapse duplicates
+    positions = {}
+    for i, case_name in enumerate(case_names):
+        normalized = normalize_case_name(case_name)
+        if normalized:
+            positions.setdefault(normalized, []).append(i)
+    unique_names = list(positions)
+
+    if use_tfidf and SKLEARN_AVAILABLE and len(unique_names) > 1:
+        similar = _tfidf_similar_names(unique_names, threshold)
+    else:
+        similar = find_similar_names(unique_names, threshold)
+
+    pairs = []
+    for indexes in positions.values():
+        pairs.extend((i, j, 1.0) for n, i in enumerate(indexes) for j in indexes[n + 1:])
+    for a, b, similarity in similar:
+        for i in positions[unique_names[a]]:
+            for j in positions[unique_names[b]]:
+                pairs.append((min(i, j), max(i, j), similarity))
+    pairs.sort()
+    return pairs
+
+
+def _tfidf_similar_names(names: List[str], threshold: float) -> List[Tuple[int, int, float]]:
+    """Pairs of distinct normalized names whose n-gram TF-IDF vectors are at least threshold similar."""
+    max_df = MAX_NGRAM_SHARE if len(names) >= MIN_NAMES_TO_PRUNE else 1.0
+    vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=NGRAM_RANGE, sublinear_tf=True,
+                                 max_df=max_df, dtype=np.float32)
+    # Rows are L2-normalized, so their dot products are cosine similarities
+    vectors = vectorizer.fit_transform(names).tocsr()
+    transposed = vectors.T.tocsc()
+
+    similar = []
+    block_rows = max(1, MAX_BLOCK_ENTRIES // len(names))
+    for start in range(0, len(names), block_rows):
+        block = (vectors[start:start + block_rows] @ transposed).tocoo()
+        rows = block.row + start
+        # Each pair once, and float32 rounding must not drop names at exactly the threshold
+        keep = (block.col > rows) & (block.data >= threshold - 1e-6)
+        similar.extend(
+            (int(i), int(j), min(1.0, float(score)))
+            for i, j, score in zip(rows[keep], block.col[keep], block.data[keep])
+        )
+    return similar
+
+
+def group_similar_case_names(case_names: List[str], threshold: float = TFIDF_SIMILARITY_THRESHOLD,
+                             use_tfidf: bool = True) -> List[List[int]]:
+    """
+    Group case names that are similar, directly or through other names.
+
+    Args:
+        case_names: Case names as written
+        threshold: Minimum similarity between 0 and 1 (see find_similar_case_names())
+        use_tfidf: Use character n-gram TF-IDF if scikit-learn is installed
+
+    Returns:
+        Lists of indexes into case_names, one per group of two or more names,
+        in order of their first name
+    """
+    groups = DisjointSet(len(case_names))
+    for i, j, _ in find_similar_case_names(case_names, threshold, use_tfidf):
+        groups.union(i, j)
+
+    members = {}
+    for i in range(len(case_names)):
+        members.setdefault(groups.find(i), []).append(i)
+    return [group for group in members.values() if len(group) > 1]
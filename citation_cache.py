@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Citation Verification Cache for CaseStrainer
+
+This module provides a persistent, SQLite-backed cache for citation verification
+results. Entries are keyed on a normalized citation and the source that produced
+them (CourtListener lookup, LangSearch, the CitationVerifier cascade, ...), so
+every analysis path can share the same store.
+
+Positive results are kept for CITATION_CACHE_TTL seconds, negative results for
+the shorter CITATION_CACHE_NEGATIVE_TTL, and the least recently used entries are
+evicted once the cache grows beyond CITATION_CACHE_MAX_ENTRIES.
+"""
+
+import os
+import json
+import logging
+import time
+import sqlite3
+import threading
+from typing import Optional, Dict, Any
+
+from citation_normalization import citation_key
+
+logger = logging.getLogger(__name__)
+
+# Configuration (can be overridden with environment variables)
+CITATION_CACHE_PATH = os.environ.get(
+    'CITATION_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'citation_cache.db')
+)
+CITATION_CACHE_TTL = int(os.environ.get('CITATION_CACHE_TTL', 30 * 24 * 60 * 60))  # 30 days
+CITATION_CACHE_NEGATIVE_TTL = int(os.environ.get('CITATION_CACHE_NEGATIVE_TTL', 24 * 60 * 60))  # 1 day
+CITATION_CACHE_MAX_ENTRIES = int(os.environ.get('CITATION_CACHE_MAX_ENTRIES', 50000))
+
+# Flag to allow disabling the cache entirely
+CITATION_CACHE_ENABLED = os.environ.get('CITATION_CACHE_ENABLED', 'True').lower() in ('true', '1', 't')
+
+# How many writes between LRU eviction passes
+EVICTION_INTERVAL = 100
+
+# How many cache hits between writes of their last-access times
+ACCESS_FLUSH_INTERVAL = 100
+
+
+def normalize_citation_key(citation: str) -> str:
+    """
+    Normalize a citation so that trivially different spellings share a cache entry.
+
+    Args:
+        citation: The citation text
+
+    Returns:
+        Normalized cache key (see citation_normalization.citation_key(); e.g. "410 U. S. 113" -> "410 u.s. 113")
+    """
+    return citation_key(citation)
+
+
+class CitationCache:
+    """Persistent verification cache with TTL, negative caching and LRU eviction."""
+
+    def __init__(self, db_path: str = CITATION_CACHE_PATH, ttl: int = CITATION_CACHE_TTL,
+                 negative_ttl: int = CITATION_CACHE_NEGATIVE_TTL,
+                 max_entries: int = CITATION_CACHE_MAX_ENTRIES):
+        """Open (and create if needed) the cache database."""
+        self.db_path = db_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        # Last-access times of recent hits, written back in batches so reads don't each commit
+        self._pending_access = {}
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self._lock:
+            # WAL lets several server processes read while one writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS citation_cache (
+                    source TEXT NOT NULL,
+                    citation_key TEXT NOT NULL,
+                    found INTEGER NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (source, citation_key)
+                )
+            ''')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_citation_cache_last_access ON citation_cache (last_access)'
+            )
+            self._conn.commit()
+
+    def get(self, source: str, citation: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached verification result.
+
+        Args:
+            source: The verification source (e.g. 'courtlistener_lookup', 'langsearch')
+            citation: The citation text
+
+        Returns:
+            Dict with 'found' and 'value' keys, or None on a miss or expired entry
+        """
+        key = normalize_citation_key(citation)
+        if not key:
+            return None
+
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT found, value, expires_at FROM citation_cache WHERE source = ? AND citation_key = ?',
+                    (source, key)
+                ).fetchone()
+
+                if row is None:
+                    return None
+
+                found, value, expires_at = row
+                if expires_at < now:
+                    self._conn.execute(
+                        'DELETE FROM citation_cache WHERE source = ? AND citation_key = ?',
+                        (source, key)
+                    )
+                    self._conn.commit()
+                    return None
+
+                self._pending_access[(source, key)] = now
+                if len(self._pending_access) >= ACCESS_FLUSH_INTERVAL:
+                    self._flush_access_locked()
+
+            return {'found': bool(found), 'value': json.loads(value)}
+        except Exception as e:
+            logger.warning("Error reading citation cache: %s", e)
+            return None
+
+    def set(self, source: str, citation: str, value: Any, found: bool) -> None:
+        """
+        Store a verification result.
+
+        Args:
+            source: The verification source
+            citation: The citation text
+            value: JSON-serializable result to cache
+            found: Whether the result is positive; negative results use the shorter TTL
+        """
+        key = normalize_citation_key(citation)
+        if not key:
+            return
+
+        now = time.time()
+        expires_at = now + (self.ttl if found else self.negative_ttl)
+        try:
+            serialized = json.dumps(value)
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO citation_cache '
+                    '(source, citation_key, found, value, created_at, expires_at, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (source, key, 1 if found else 0, serialized, now, expires_at, now)
+                )
+                self._conn.commit()
+
+                self._writes += 1
+                if self._writes % EVICTION_INTERVAL == 0:
+                    self._evict_locked()
+        except Exception as e:
+            logger.warning("Error writing citation cache: %s", e)
+
+    def evict(self) -> None:
+        """Remove expired entries and trim the cache to max_entries (least recently used first)."""
+        with self._lock:
+            self._evict_locked()
+
+    def _flush_access_locked(self) -> None:
+        """Write the pending last-access times of cache hits."""
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            'UPDATE citation_cache SET last_access = ? WHERE source = ? AND citation_key = ?',
+            [(accessed, source, key) for (source, key), accessed in self._pending_access.items()]
+        )
+        self._conn.commit()
+        self._pending_access.clear()
+
+    def _evict_locked(self) -> None:
+        try:
+            # Eviction must see which entries were used recently
+            self._flush_access_locked()
+            self._conn.execute('DELETE FROM citation_cache WHERE expires_at < ?', (time.time(),))
+            count = self._conn.execute('SELECT COUNT(*) FROM citation_cache').fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    'DELETE FROM citation_cache WHERE rowid IN '
+                    '(SELECT rowid FROM citation_cache ORDER BY last_access ASC LIMIT ?)',
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+        except Exception as e:
+            logger.warning("Error evicting citation cache entries: %s", e)
+
+    def clear(self, source: Optional[str] = None) -> None:
+        """Remove all entries, or only the entries for one source."""
+        with self._lock:
+            if source:
+                self._conn.execute('DELETE FROM citation_cache WHERE source = ?', (source,))
+                self._pending_access = {k: v for k, v in self._pending_access.items() if k[0] != source}
+            else:
+                self._conn.execute('DELETE FROM citation_cache')
+                self._pending_access.clear()
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM citation_cache').fetchone()[0]
+
+
+# Shared cache instance for this process
+_citation_cache = None
+_citation_cache_lock = threading.Lock()
+
+
+def get_citation_cache() -> Optional[CitationCache]:
+    """
+    Get the process-wide citation cache, creating it on first use.
+
+    Returns:
+        The shared CitationCache, or None if the cache is disabled or unavailable
+    """
+    global _citation_cache, CITATION_CACHE_ENABLED
+
+    if not CITATION_CACHE_ENABLED:
+        return None
+
+    if _citation_cache is None:
+        with _citation_cache_lock:
+            if _citation_cache is None:
+                try:
+                    _citation_cache = CitationCache()
+                except Exception as e:
+                    logger.exception("Error opening citation cache at %s: %s", CITATION_CACHE_PATH, e)
+                    CITATION_CACHE_ENABLED = False
+                    return None
+
+    return _citation_cache
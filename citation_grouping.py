@@ -3,40 +3,50 @@
 Citation Grouping Module for CaseStrainer
 
 This module provides functionality to group multiple citations that refer to the same case.
+Each case name is normalized once and similar names are found through an
+index of their words, so grouping thousands of citations stays fast. The
+'tfidf' method finds them by character n-grams instead (see case_name_similarity).
 """
 
-import re
-from typing import List, Dict, Any, Set, Tuple
+import math
+from collections import Counter, defaultdict
+from typing import Callable, List, Dict, Any, Set, Tuple, FrozenSet
 
+from citation_normalization import normalize_case_name, citation_key
 
-def normalize_case_name(case_name: str) -> str:
-    """
-    Normalize a case name for comparison purposes.
+# Names at least this similar are considered the same case
+NAME_SIMILARITY_THRESHOLD = 0.7
+
+# Similarity of a name to a longer name that contains it
+SUBSTRING_SIMILARITY = 0.8
+
+
+def _normalized_similarity(norm1: str, norm2: str, words1: FrozenSet[str] = None,
+                           words2: FrozenSet[str] = None) -> float:
+    """Similarity of two names already passed through normalize_case_name() (see calculate_similarity())."""
+    if not norm1 or not norm2:
+        return 0.0
     
-    Args:
-        case_name: The case name to normalize
-        
-    Returns:
-        Normalized case name
-    """
-    if not case_name:
-        return ""
+    # Check for exact match
+    if norm1 == norm2:
+        return 1.0
     
-    # Convert to lowercase
-    normalized = case_name.lower()
+    # Check for one name being a substring of the other
+    if norm1 in norm2 or norm2 in norm1:
+        return SUBSTRING_SIMILARITY
     
-    # Remove common prefixes
-    prefixes = ["in re ", "state v. ", "state of washington v. "]
-    for prefix in prefixes:
-        if normalized.startswith(prefix):
-            normalized = normalized[len(prefix):]
-            break
+    # Calculate word overlap
+    words1 = words1 if words1 is not None else frozenset(norm1.split())
+    words2 = words2 if words2 is not None else frozenset(norm2.split())
     
-    # Remove punctuation and extra spaces
-    normalized = re.sub(r'[^\w\s]', '', normalized)
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    if not words1 or not words2:
+        return 0.0
+    
+    # Calculate Jaccard similarity
+    intersection = len(words1 & words2)
+    union = len(words1 | words2)
     
-    return normalized
+    return intersection / union if union > 0 else 0.0
 
 
 def calculate_similarity(name1: str, name2: str) -> float:
@@ -53,99 +63,261 @@ def calculate_similarity(name1: str, name2: str) -> float:
     if not name1 or not name2:
         return 0.0
     
-    # Normalize names
-    norm1 = normalize_case_name(name1)
-    norm2 = normalize_case_name(name2)
+    return _normalized_similarity(normalize_case_name(name1), normalize_case_name(name2))
+
+
+def find_similar_names(names: List[str], threshold: float = NAME_SIMILARITY_THRESHOLD) -> List[Tuple[int, int, float]]:
+    """
+    Find the pairs of names that are at least threshold similar (see calculate_similarity()).
     
-    if not norm1 or not norm2:
-        return 0.0
+    Instead of comparing every pair, candidates are looked up in an inverted
+    index of the names' words:
     
-    # Check for exact match
-    if norm1 == norm2:
-        return 1.0
+    - Word overlap (Jaccard) can only reach the threshold if two names share
+      one of the first few of their words, taking the rarest words first
+      (prefix filtering), so only those words are indexed for it.
+    - A name can only be contained in a longer one if the longer name has
+      the shorter one's rarest word, so that word's names are checked. Names
+      contained only inside another word ("roe" in "monroe") aren't found,
+      which calculate_similarity() would have scored as a match.
     
-    # Check for one name being a substring of the other
-    if norm1 in norm2 or norm2 in norm1:
-        return 0.8
+    Args:
+        names: Normalized case names (see normalize_case_name()), without duplicates
+        threshold: Minimum similarity
+        
+    Returns:
+        List of (index, other index, similarity) tuples, with index < other index
+    """
+    words = [frozenset(name.split()) for name in names]
     
-    # Calculate word overlap
-    words1 = set(norm1.split())
-    words2 = set(norm2.split())
+    # Words in order of how many names they appear in, rarest first
+    name_counts = Counter(word for name_words in words for word in name_words)
+    ordered = [sorted(name_words, key=lambda word: (name_counts[word], word)) for name_words in words]
     
-    if not words1 or not words2:
-        return 0.0
+    candidates: Set[Tuple[int, int]] = set()
     
-    # Calculate Jaccard similarity
-    intersection = len(words1.intersection(words2))
-    union = len(words1.union(words2))
+    prefix_index: Dict[str, List[int]] = defaultdict(list)
+    for i, name_words in enumerate(ordered):
+        # Names sharing none of these words overlap by less than the threshold
+        prefix_length = len(name_words) - math.ceil(threshold * len(name_words) - 1e-9) + 1
+        for word in name_words[:prefix_length]:
+            for j in prefix_index[word]:
+                candidates.add((j, i))
+            prefix_index[word].append(i)
     
-    return intersection / union if union > 0 else 0.0
+    if threshold <= SUBSTRING_SIMILARITY:
+        word_index: Dict[str, List[int]] = defaultdict(list)
+        for i, name_words in enumerate(words):
+            for word in name_words:
+                word_index[word].append(i)
+        for i, name_words in enumerate(ordered):
+            if not name_words:
+                continue
+            for j in word_index[name_words[0]]:
+                if len(names[j]) > len(names[i]) and names[i] in names[j]:
+                    candidates.add((min(i, j), max(i, j)))
+    
+    similar = []
+    for i, j in sorted(candidates):
+        similarity = _normalized_similarity(names[i], names[j], words[i], words[j])
+        if similarity >= threshold:
+            similar.append((i, j, similarity))
+    return similar
 
 
-def group_citations_by_case(citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _is_unknown_case(case_name: str) -> bool:
+    return not case_name or case_name.lower() == 'unknown case'
+
+
+def build_cluster_index(lookup_items: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Group multiple citations that refer to the same case.
+    Map each citation of the CourtListener clusters in citation-lookup results to its cluster ID.
+    
+    A cluster lists all of a case's parallel citations, so every reporter the
+    case was published in maps to the same ID.
     
     Args:
-        citations: List of citation dictionaries, each with 'citation', 'case_name', etc.
+        lookup_items: Items from the citation-lookup API, as returned by
+                      lookup_citations_batch() or kept in the verification cache
         
     Returns:
-        List of grouped citation dictionaries with additional 'alternate_citations' field
+        Dict mapping citation_key() of each citation to its cluster ID
     """
-    if not citations:
-        return []
-    
-    # Group by case name similarity
-    grouped_citations = []
-    processed_indices = set()
-    
-    for i, citation in enumerate(citations):
-        if i in processed_indices:
+    cluster_index: Dict[str, Any] = {}
+    for item in lookup_items or []:
+        if not isinstance(item, dict):
             continue
+        clusters = [cluster for cluster in item.get('clusters') or [] if cluster.get('id') is not None]
+        for cluster in clusters:
+            for parallel in cluster.get('citations') or []:
+                if isinstance(parallel, dict):
+                    parallel = f"{parallel.get('volume', '')} {parallel.get('reporter', '')} {parallel.get('page', '')}"
+                cluster_index.setdefault(citation_key(parallel), cluster['id'])
         
-        case_name = citation.get('case_name', '')
+        # The looked-up citation itself is only unambiguous if it matched one case
+        if len(clusters) == 1:
+            for item_citation in [item.get('citation')] + list(item.get('normalized_citations') or []):
+                if item_citation:
+                    cluster_index.setdefault(citation_key(item_citation), clusters[0]['id'])
+    return cluster_index
+
+
+class DisjointSet:
+    """
+    Union-find over citation indexes; each set's root is its lowest index.
+    
+    Citations can be labelled (e.g. with their CourtListener cluster ID), in
+    which case sets with different labels are never merged.
+    """
+    
+    def __init__(self, size: int, labels: List[Any] = None):
+        self.parent = list(range(size))
+        self.labels = list(labels) if labels is not None else [None] * size
+    
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+    
+    def union(self, i: int, j: int) -> bool:
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return True
+        label_i, label_j = self.labels[root_i], self.labels[root_j]
+        if label_i is not None and label_j is not None and label_i != label_j:
+            return False
+        root, child = min(root_i, root_j), max(root_i, root_j)
+        self.parent[child] = root
+        self.labels[root] = label_i if label_i is not None else label_j
+        return True
+
+
+def _name_similarity(name1: str, name2: str, name_positions: Dict[str, int],
+                     similar: Dict[Tuple[int, int], float]) -> float:
+    """Similarity of two normalized names: the score grouping used for the pair, else their word overlap."""
+    if name1 and name1 == name2:
+        return 1.0
+    a, b = name_positions.get(name1), name_positions.get(name2)
+    if a is not None and b is not None and (min(a, b), max(a, b)) in similar:
+        return similar[(min(a, b), max(a, b))]
+    return _normalized_similarity(name1, name2)
+
+
+def _group(citations: List[Dict[str, Any]], by_url: bool, by_name: bool,
+           cluster_ids: List[Any] = None,
+           similar_names: Callable[[List[str]], List[Tuple[int, int, float]]] = find_similar_names) -> List[Dict[str, Any]]:
+    """
+    Group citations that share a cluster ID or URL and/or have similar case names.
+    
+    Similar names are found by similar_names(), which takes the distinct
+    normalized names and returns (index, other index, similarity) tuples in
+    the form find_similar_names() does.
+    
+    Cluster and URL groupings are transitive: if A is grouped with B and B
+    with C, all three end up in one group. A name only joins a group if it is
+    similar to every name already in it, so a chain of names that are each
+    similar to the next ("Smith", "Smith Jones", "Jones") doesn't become one
+    case. Each group's primary citation is its first citation,
+    and groups are returned in the order of their primary citations.
+    Citations without a known case name are never grouped by URL or name, and
+    citations of different clusters are never grouped.
+    """
+    groups = DisjointSet(len(citations), cluster_ids)
+    known = [i for i, citation in enumerate(citations) if not _is_unknown_case(citation.get('case_name', ''))]
+    
+    if cluster_ids is not None:
+        first_in_cluster: Dict[Any, int] = {}
+        for i, cluster_id in enumerate(cluster_ids):
+            if cluster_id is not None:
+                groups.union(first_in_cluster.setdefault(cluster_id, i), i)
         
-        # If no case name or unknown case, can't group, so add as is
-        if not case_name or case_name == 'Unknown case' or case_name.lower() == 'unknown case':
-            citation_copy = citation.copy()
-            citation_copy['alternate_citations'] = []
-            grouped_citations.append(citation_copy)
-            processed_indices.add(i)
-            continue
+        # Names are only needed to place citations CourtListener couldn't resolve
+        if all(cluster_ids[i] is not None for i in known):
+            by_name = False
+    
+    if by_url:
+        first_with_url: Dict[str, int] = {}
+        for i in known:
+            url = citations[i].get('url', '')
+            if url:
+                groups.union(first_with_url.setdefault(url, i), i)
+    
+    normalized: Dict[int, str] = {}
+    name_positions: Dict[str, int] = {}
+    similar: Dict[Tuple[int, int], float] = {}
+    if by_name:
+        # Normalize each name once; citations with the same normalized name always match
+        first_with_name: Dict[str, int] = {}
+        for i in known:
+            name = normalize_case_name(citations[i].get('case_name', ''))
+            if name:
+                normalized[i] = name
+                groups.union(first_with_name.setdefault(name, i), i)
         
-        # Create a new group with this citation as the primary
-        group = citation.copy()
-        group['alternate_citations'] = []
-        processed_indices.add(i)
+        names = list(first_with_name)
+        name_positions = {name: a for a, name in enumerate(names)}
+        similar = {(a, b): similarity for a, b, similarity in similar_names(names)}
         
-        # Find similar case names
-        for j, other in enumerate(citations):
-            if j in processed_indices:
+        # The distinct names in each group; the most similar pairs are merged first
+        group_names: Dict[int, List[int]] = defaultdict(list)
+        for a, name in enumerate(names):
+            group_names[groups.find(first_with_name[name])].append(a)
+        for a, b in sorted(similar, key=lambda pair: (-similar[pair], pair)):
+            root_a, root_b = groups.find(first_with_name[names[a]]), groups.find(first_with_name[names[b]])
+            if root_a == root_b:
                 continue
-            
-            other_case_name = other.get('case_name', '')
-            
-            # Skip citations with unknown case names - they should never be grouped
-            if not other_case_name or other_case_name == 'Unknown case' or other_case_name.lower() == 'unknown case':
+            if not all((min(x, y), max(x, y)) in similar for x in group_names[root_a] for y in group_names[root_b]):
                 continue
-            
-            similarity = calculate_similarity(case_name, other_case_name)
-            if similarity >= 0.7:  # Threshold for considering same case
-                # Add as alternate citation
-                group['alternate_citations'].append({
-                    'citation': other.get('citation', ''),
-                    'case_name': other.get('case_name', ''),
-                    'url': other.get('url', ''),
-                    'source': other.get('source', ''),
-                    'similarity': similarity
-                })
-                processed_indices.add(j)
+            if groups.union(root_a, root_b):
+                group_names[groups.find(root_a)] = group_names.pop(root_a) + group_names.pop(root_b)
+    
+    members: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(citations)):
+        members[groups.find(i)].append(i)
+    
+    grouped_citations = []
+    for i, citation in enumerate(citations):
+        if groups.find(i) != i:
+            continue
         
+        group = citation.copy()
+        group['alternate_citations'] = []
+        for j in members[i][1:]:
+            other = citations[j]
+            alternate = {
+                'citation': other.get('citation', ''),
+                'case_name': other.get('case_name', ''),
+                'url': other.get('url', ''),
+                'source': other.get('source', '')
+            }
+            same_cluster = cluster_ids is not None and cluster_ids[j] is not None and cluster_ids[j] == cluster_ids[i]
+            same_url = by_url and alternate['url'] and alternate['url'] == citation.get('url')
+            if by_name and not (same_cluster or same_url):
+                alternate['similarity'] = _name_similarity(normalized.get(i, ''), normalized.get(j, ''),
+                                                           name_positions, similar)
+            group['alternate_citations'].append(alternate)
         grouped_citations.append(group)
     
     return grouped_citations
 
 
+def group_citations_by_case(citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Group multiple citations that refer to the same case.
+    
+    Args:
+        citations: List of citation dictionaries, each with 'citation', 'case_name', etc.
+        
+    Returns:
+        List of grouped citation dictionaries with additional 'alternate_citations' field
+    """
+    if not citations:
+        return []
+    
+    return _group(citations, by_url=False, by_name=True)
+
+
 def group_citations_by_url(citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Group multiple citations that have the same URL.
@@ -159,73 +331,47 @@ def group_citations_by_url(citations: List[Dict[str, Any]]) -> List[Dict[str, An
     if not citations:
         return []
     
-    # Group by URL
-    url_groups: Dict[str, List[int]] = {}
-    
-    for i, citation in enumerate(citations):
-        url = citation.get('url', '')
-        case_name = citation.get('case_name', '')
-        
-        # Skip citations with unknown case names - they should never be grouped
-        if not case_name or case_name == 'Unknown case' or case_name.lower() == 'unknown case':
-            continue
-            
-        if url:
-            if url not in url_groups:
-                url_groups[url] = []
-            url_groups[url].append(i)
+    return _group(citations, by_url=True, by_name=False)
+
+
+def group_citations_by_cluster(citations: List[Dict[str, Any]],
+                               cluster_index: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """
+    Group citations by the CourtListener cluster (case) they belong to.
     
-    # Create grouped citations
-    grouped_citations = []
-    processed_indices = set()
+    Citations of the same cluster are grouped straight away. Citations
+    without a cluster are then matched by URL and case name, and can join a
+    cluster's group, but two different clusters are never merged.
     
-    # First process URL groups
-    for url, indices in url_groups.items():
-        if len(indices) <= 1:
-            # Skip groups with only one citation (will be handled later)
-            continue
-        
-        # Use the first citation as the primary
-        primary_idx = indices[0]
-        primary = citations[primary_idx].copy()
-        primary['alternate_citations'] = []
-        processed_indices.add(primary_idx)
-        
-        # Add the rest as alternates
-        for idx in indices[1:]:
-            other = citations[idx]
-            # Double-check that we're not grouping unknown case names
-            other_case_name = other.get('case_name', '')
-            if not other_case_name or other_case_name == 'Unknown case' or other_case_name.lower() == 'unknown case':
-                continue
-                
-            primary['alternate_citations'].append({
-                'citation': other.get('citation', ''),
-                'case_name': other.get('case_name', ''),
-                'url': other.get('url', ''),
-                'source': other.get('source', '')
-            })
-            processed_indices.add(idx)
+    Args:
+        citations: List of citation dictionaries, with 'cluster_id' where known
+        cluster_index: Cluster IDs by citation_key() (see build_cluster_index()),
+                       for citations without a 'cluster_id'
         
-        grouped_citations.append(primary)
-    
-    # Add any remaining citations that weren't grouped by URL
-    for i, citation in enumerate(citations):
-        if i not in processed_indices:
-            citation_copy = citation.copy()
-            citation_copy['alternate_citations'] = []
-            grouped_citations.append(citation_copy)
+    Returns:
+        List of grouped citation dictionaries with additional 'alternate_citations' field
+    """
+    if not citations:
+        return []
     
-    return grouped_citations
+    cluster_index = cluster_index or {}
+    cluster_ids = [
+        citation.get('cluster_id') if citation.get('cluster_id') is not None
+        else cluster_index.get(citation_key(citation.get('citation', '')))
+        for citation in citations
+    ]
+    return _group(citations, by_url=True, by_name=True, cluster_ids=cluster_ids)
 
 
-def group_citations(citations: List[Dict[str, Any]], method: str = 'url_then_name') -> List[Dict[str, Any]]:
+def group_citations(citations: List[Dict[str, Any]], method: str = 'url_then_name',
+                    cluster_index: Dict[str, Any] = None) -> List[Dict[str, Any]]:
     """
     Group multiple citations that refer to the same case using the specified method.
     
     Args:
         citations: List of citation dictionaries
-        method: Grouping method ('url', 'name', or 'url_then_name')
+        method: Grouping method ('cluster', 'url', 'name', 'url_then_name', or 'tfidf')
+        cluster_index: Cluster IDs by citation, for the 'cluster' method (see build_cluster_index())
         
     Returns:
         List of grouped citation dictionaries
@@ -233,15 +379,20 @@ def group_citations(citations: List[Dict[str, Any]], method: str = 'url_then_nam
     if not citations:
         return []
     
-    if method == 'url':
+    if method == 'cluster':
+        return group_citations_by_cluster(citations, cluster_index)
+    elif method == 'url':
         return group_citations_by_url(citations)
     elif method == 'name':
         return group_citations_by_case(citations)
     elif method == 'url_then_name':
-        # First group by URL
-        url_grouped = group_citations_by_url(citations)
-        # Then group by case name
-        return group_citations_by_case(url_grouped)
+        # Citations with the same URL, or with similar case names, in one pass
+        return _group(citations, by_url=True, by_name=True)
+    elif method == 'tfidf':
+        # Like url_then_name, but names are compared by their character n-grams, which
+        # tolerates abbreviations and typos; case_name_similarity builds on this module
+        from case_name_similarity import find_similar_case_names
+        return _group(citations, by_url=True, by_name=True, similar_names=find_similar_case_names)
     else:
         # Default to URL grouping if invalid method
         return group_citations_by_url(citations)
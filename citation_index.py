@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Local Citation Index for CaseStrainer
+
+An on-disk index from reporter citations to CourtListener clusters, built from
+CourtListener's bulk data, so that most citations can be verified without a
+network call. It is checked before the API by search_citation(),
+CitationVerifier and query_courtlistener_api().
+
+The index is a SQLite database (CITATION_INDEX_PATH) filled by the importer:
+
+    python citation_index.py --citations citations-2024-12-31.csv.bz2 \\
+                             --clusters opinion-clusters-2024-12-31.csv.bz2
+
+- The citations dump maps (volume, reporter, page) to a cluster ID; the
+  clusters dump gives each cluster's case name, filing date and URL. Rows
+  are stored under CourtListener's IDs, so a corrected or moved citation
+  replaces its old row.
+- Search API result pages (such as washington_cases.json) can be imported
+  too with --search-results.
+- Imports are incremental: the latest date_modified of each dump is kept as a
+  watermark, and re-importing a newer dump only writes the rows changed since.
+  --full re-imports every row.
+
+Citations are keyed with citation_normalization.citation_key(), like the
+verification cache. A citation that isn't in the index isn't necessarily fake
+(the dumps are snapshots and may be older than the case), so a miss always
+falls through to the API.
+"""
+
+import os
+import bz2
+import csv
+import json
+import logging
+import sqlite3
+import threading
+from typing import Optional, Dict, Any, Iterable, Iterator
+
+from citation_normalization import citation_key, canonical_citation, parse_citation
+
+logger = logging.getLogger(__name__)
+
+# Configuration (can be overridden with environment variables)
+CITATION_INDEX_PATH = os.environ.get(
+    'CITATION_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'citation_index.db')
+)
+# Bytes of the index file read through a memory map instead of read() calls
+CITATION_INDEX_MMAP_SIZE = int(os.environ.get('CITATION_INDEX_MMAP_SIZE', 256 * 1024 * 1024))
+
+# Flag to allow disabling the index; it is only used once it has been imported
+CITATION_INDEX_ENABLED = os.environ.get('CITATION_INDEX_ENABLED', 'True').lower() in ('true', '1', 't')
+
+# Rows written per transaction while importing
+IMPORT_BATCH_SIZE = 10000
+
+# Citations looked up per query (SQLite limits the number of query parameters)
+LOOKUP_BATCH_SIZE = 500
+
+# CourtListener's bulk CSVs are PostgreSQL COPY output quoted with backticks
+BULK_CSV_QUOTECHAR = '`'
+
+# The case name fields of the clusters dump, most preferred first
+CASE_NAME_FIELDS = ('case_name', 'case_name_short', 'case_name_full')
+
+
+def _open_dump(path: str):
+    """Open a bulk data file, decompressing .bz2 files on the fly."""
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def _read_dump(path: str, quotechar: str) -> Iterator[Dict[str, str]]:
+    """Stream the rows of a bulk data CSV as dicts."""
+    # Some fields (full case names, headmatter) are far longer than csv's default limit
+    csv.field_size_limit(2 ** 31 - 1)
+    with _open_dump(path) as f:
+        yield from csv.DictReader(f, quotechar=quotechar)
+
+
+class CitationIndex:
+    """SQLite index from citation keys to CourtListener clusters."""
+
+    def __init__(self, db_path: str = CITATION_INDEX_PATH, mmap_size: int = CITATION_INDEX_MMAP_SIZE):
+        """Open (and create if needed) the index database."""
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self._lock:
+            # WAL lets the server keep reading while the importer writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(f'PRAGMA mmap_size={int(mmap_size)}')
+            self._drop_unkeyed_citations()
+            # id is CourtListener's citation ID, or negative for citations from search results
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS citations (
+                    id INTEGER PRIMARY KEY,
+                    citation_key TEXT NOT NULL,
+                    cluster_id INTEGER NOT NULL,
+                    volume TEXT NOT NULL,
+                    reporter TEXT NOT NULL,
+                    page TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_citations_key ON citations (citation_key)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_citations_cluster ON citations (cluster_id)')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS clusters (
+                    id INTEGER PRIMARY KEY,
+                    case_name TEXT NOT NULL,
+                    date_filed TEXT,
+                    absolute_url TEXT
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS import_state (
+                    dump TEXT PRIMARY KEY,
+                    watermark TEXT NOT NULL
+                )
+            ''')
+            self._conn.commit()
+
+    def _drop_unkeyed_citations(self) -> None:
+        """Drop a citations table from before rows were keyed by ID, so the next import rebuilds it."""
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(citations)')]
+        if columns and 'id' not in columns:
+            logger.warning("The citation index at %s predates citation IDs; re-import the citations dump", self.db_path)
+            self._conn.execute('DROP TABLE citations')
+            self._conn.execute("DELETE FROM import_state WHERE dump = 'citations'")
+
+    # Lookup
+
+    def lookup(self, citation: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a citation in the index.
+
+        Args:
+            citation: The citation text
+
+        Returns:
+            An item shaped like a CourtListener citation-lookup result ('citation',
+            'normalized_citations', 'status' and 'clusters', each cluster with its
+            parallel 'citations'), or None if the citation isn't indexed
+        """
+        return self.lookup_many([citation]).get(citation)
+
+    def lookup_many(self, citations: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up many citations with a few queries.
+
+        Args:
+            citations: The citation texts
+
+        Returns:
+            Dict mapping each indexed citation to its item (see lookup()); citations
+            that aren't indexed are left out
+        """
+        keys = {}
+        for citation in citations:
+            key = citation_key(citation)
+            if key:
+                keys.setdefault(key, []).append(citation)
+        if not keys:
+            return {}
+
+        try:
+            with self._lock:
+                # Clusters of each citation, then every citation of those clusters
+                cluster_ids = {}
+                clusters = {}
+                key_list = list(keys)
+                for start in range(0, len(key_list), LOOKUP_BATCH_SIZE):
+                    chunk = key_list[start:start + LOOKUP_BATCH_SIZE]
+                    rows = self._conn.execute(
+                        'SELECT DISTINCT c.citation_key, k.id, k.case_name, k.date_filed, k.absolute_url '
+                        'FROM citations c JOIN clusters k ON k.id = c.cluster_id '
+                        f'WHERE c.citation_key IN ({",".join("?" * len(chunk))}) '
+                        'ORDER BY c.citation_key, k.id',
+                        chunk
+                    ).fetchall()
+                    for key, cluster_id, case_name, date_filed, absolute_url in rows:
+                        cluster_ids.setdefault(key, []).append(cluster_id)
+                        clusters[cluster_id] = {
+                            'id': cluster_id,
+                            'case_name': case_name,
+                            'date_filed': date_filed,
+                            'absolute_url': absolute_url,
+                            'citations': []
+                        }
+
+                cluster_list = list(clusters)
+                for start in range(0, len(cluster_list), LOOKUP_BATCH_SIZE):
+                    chunk = cluster_list[start:start + LOOKUP_BATCH_SIZE]
+                    rows = self._conn.execute(
+                        'SELECT DISTINCT cluster_id, volume, reporter, page FROM citations '
+                        f'WHERE cluster_id IN ({",".join("?" * len(chunk))})',
+                        chunk
+                    ).fetchall()
+                    for cluster_id, volume, reporter, page in rows:
+                        clusters[cluster_id]['citations'].append(
+                            {'volume': volume, 'reporter': reporter, 'page': page}
+                        )
+        except Exception as e:
+            logger.warning("Error reading citation index: %s", e)
+            return {}
+
+        items = {}
+        for key, ids in cluster_ids.items():
+            for citation in keys[key]:
+                items[citation] = {
+                    'citation': citation,
+                    'normalized_citations': [canonical_citation(citation)],
+                    'status': 200,
+                    'clusters': [clusters[cluster_id] for cluster_id in ids]
+                }
+        return items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM citations').fetchone()[0]
+
+    # Import
+
+    def watermark(self, dump: str) -> Optional[str]:
+        """The latest date_modified imported from a dump ('citations' or 'clusters'), if any."""
+        with self._lock:
+            row = self._conn.execute('SELECT watermark FROM import_state WHERE dump = ?', (dump,)).fetchone()
+        return row[0] if row else None
+
+    def import_citations(self, path: str, full: bool = False, quotechar: str = BULK_CSV_QUOTECHAR) -> int:
+        """
+        Import a CourtListener citations bulk dump (citations-<date>.csv[.bz2]).
+
+        Args:
+            path: Path of the dump
+            full: Import every row, not only the rows modified since the last import
+            quotechar: The dump's CSV quote character
+
+        Returns:
+            Number of citations written
+        """
+        def rows():
+            for row in _read_dump(path, quotechar):
+                volume, reporter, page = row.get('volume'), row.get('reporter'), row.get('page')
+                if not (row.get('id') and volume and reporter and page and row.get('cluster_id')):
+                    continue
+                key = citation_key(f"{volume} {reporter} {page}")
+                yield row.get('date_modified'), (int(row['id']), key, int(row['cluster_id']), volume, reporter, page)
+
+        return self._import(
+            'citations', rows(), full,
+            'INSERT OR REPLACE INTO citations (id, citation_key, cluster_id, volume, reporter, page) '
+            'VALUES (?, ?, ?, ?, ?, ?)'
+        )
+
+    def import_clusters(self, path: str, full: bool = False, quotechar: str = BULK_CSV_QUOTECHAR) -> int:
+        """
+        Import a CourtListener opinion clusters bulk dump (opinion-clusters-<date>.csv[.bz2]).
+
+        Args:
+            path: Path of the dump
+            full: Import every row, not only the rows modified since the last import
+            quotechar: The dump's CSV quote character
+
+        Returns:
+            Number of clusters written
+        """
+        def rows():
+            for row in _read_dump(path, quotechar):
+                if not row.get('id'):
+                    continue
+                case_name = next((row[field] for field in CASE_NAME_FIELDS if row.get(field)), 'Unknown case')
+                slug = row.get('slug') or 'case'
+                absolute_url = f"/opinion/{row['id']}/{slug}/"
+                yield row.get('date_modified'), (int(row['id']), case_name, row.get('date_filed') or None, absolute_url)
+
+        return self._import(
+            'clusters', rows(), full,
+            'INSERT OR REPLACE INTO clusters (id, case_name, date_filed, absolute_url) VALUES (?, ?, ?, ?)'
+        )
+
+    def import_search_results(self, path: str) -> int:
+        """
+        Import CourtListener search API result pages (like washington_cases.json).
+
+        Search results don't carry citation IDs, so their citations are given
+        negative IDs and replace earlier search results for the same citation
+        and cluster.
+
+        Args:
+            path: JSON file with one search response ({'results': [...]}) or a list of them
+
+        Returns:
+            Number of citations written
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        pages = data if isinstance(data, list) else [data]
+
+        clusters = []
+        citations = []
+        for page in pages:
+            for result in page.get('results') or []:
+                cluster_id = result.get('cluster_id')
+                if not cluster_id or not result.get('citation'):
+                    continue
+                clusters.append((
+                    int(cluster_id), result.get('caseName') or 'Unknown case',
+                    (result.get('dateFiled') or '')[:10] or None, result.get('absolute_url')
+                ))
+                for text in result['citation']:
+                    parts = parse_citation(text)
+                    if parts:
+                        citations.append((citation_key(text), int(cluster_id)) + tuple(parts))
+        citations = list(dict.fromkeys(citations))
+
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO clusters (id, case_name, date_filed, absolute_url) VALUES (?, ?, ?, ?)',
+                clusters
+            )
+            self._conn.executemany(
+                'DELETE FROM citations WHERE id < 0 AND citation_key = ? AND cluster_id = ?',
+                [citation[:2] for citation in citations]
+            )
+            self._conn.executemany(
+                'INSERT INTO citations (id, citation_key, cluster_id, volume, reporter, page) '
+                'VALUES ((SELECT MIN(COALESCE(MIN(id), 0), 0) - 1 FROM citations), ?, ?, ?, ?, ?)',
+                citations
+            )
+            self._conn.commit()
+        return len(citations)
+
+    def _import(self, dump: str, rows: Iterable, full: bool, statement: str) -> int:
+        """Write (date_modified, values) rows newer than the dump's watermark, then advance it."""
+        since = None if full else self.watermark(dump)
+        latest = since
+        written = 0
+        batch = []
+
+        def flush():
+            with self._lock:
+                self._conn.executemany(statement, batch)
+                self._conn.commit()
+            batch.clear()
+
+        for modified, values in rows:
+            # Timestamps in a dump all have the same format, so they compare as strings
+            if since and modified and modified <= since:
+                continue
+            if modified and (latest is None or modified > latest):
+                latest = modified
+            batch.append(values)
+            written += 1
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+
+        if latest and latest != since:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO import_state (dump, watermark) VALUES (?, ?)', (dump, latest)
+                )
+                self._conn.commit()
+        logger.info("Imported %s rows from the %s dump", written, dump)
+        return written
+
+
+# Shared index instance for this process
+_citation_index = None
+_citation_index_lock = threading.Lock()
+
+
+def get_citation_index() -> Optional[CitationIndex]:
+    """
+    Get the process-wide citation index, opening it on first use.
+
+    Returns:
+        The shared CitationIndex, or None if the index is disabled, hasn't been
+        imported yet or can't be opened
+    """
+    global _citation_index, CITATION_INDEX_ENABLED
+
+    if not CITATION_INDEX_ENABLED:
+        return None
+
+    if _citation_index is None:
+        # Nothing to look up until the importer has created the index
+        if not os.path.exists(CITATION_INDEX_PATH):
+            return None
+        with _citation_index_lock:
+            if _citation_index is None:
+                try:
+                    _citation_index = CitationIndex()
+                except Exception as e:
+                    logger.exception("Error opening citation index at %s: %s", CITATION_INDEX_PATH, e)
+                    CITATION_INDEX_ENABLED = False
+                    return None
+
+    return _citation_index
+
+
+if __name__ == "__main__":
+    import argparse
+    from logging_config import configure_logging
+    configure_logging(use_queue=False)
+    parser = argparse.ArgumentParser(description='Import CourtListener bulk data into the local citation index')
+    parser.add_argument('--citations', help='Citations dump (citations-<date>.csv.bz2)')
+    parser.add_argument('--clusters', help='Opinion clusters dump (opinion-clusters-<date>.csv.bz2)')
+    parser.add_argument('--search-results', action='append', default=[],
+                        help='Search API result pages (JSON); may be given more than once')
+    parser.add_argument('--full', action='store_true', help='Import every row, ignoring the last import')
+    parser.add_argument('--db', default=CITATION_INDEX_PATH, help='Index database path')
+    args = parser.parse_args()
+
+    index = CitationIndex(args.db)
+    if args.clusters:
+        index.import_clusters(args.clusters, full=args.full)
+    if args.citations:
+        index.import_citations(args.citations, full=args.full)
+    for path in args.search_results:
+        logger.info("Imported %s citations from %s", index.import_search_results(path), path)
+    logger.info("The index at %s has %s citations", args.db, len(index))
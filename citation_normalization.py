@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Citation Normalization for CaseStrainer
+
+One place that turns citations and case names into the canonical forms the
+caches, indexes and grouping compare:
+
+- parse_citation() splits a citation into (volume, reporter, page), with the
+  reporter written the standard way according to the reporter table eyecite
+  uses (reporters_db), so "196 Wn.2d 725", "196 Wash.2d 725" and
+  "196 Wash. 2d 725" all have the reporter "Wash. 2d".
+- citation_key() is the lookup key built from that, shared by the
+  verification cache, the CourtListener response index and grouping.
+- normalize_case_name() and normalize_westlaw_citation() are the case name
+  and Westlaw forms.
+
+The patterns are compiled once and every function is memoized, since the same
+citations and names are normalized many times during an analysis.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+# Normalized citations and names remembered by each function
+NORMALIZATION_CACHE_SIZE = 65536
+
+# volume, reporter, page (e.g. "196 Wash. 2d 725"); the reporter is the shortest
+# text between two numbers, so "2d" stays part of it
+CITATION_PATTERN = re.compile(r"(\d+)\s+([A-Za-z][\w.&'\s]*?)\s+(\d+)\b")
+WESTLAW_PATTERN = re.compile(r'(\d{4})\s*W\.?\s*L\.?\s*(\d+)', re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# Abbreviation fragments such as "u. s." or "s. ct.", joined into "u.s." / "s.ct." in keys
+ABBREVIATION_GAP_PATTERN = re.compile(r'\.\s+(?=[a-z0-9]+\.)')
+REPORTER_SQUASH_PATTERN = re.compile(r'[\s.]')
+CASE_NAME_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+# Case name prefixes that don't help tell cases apart
+CASE_NAME_PREFIXES = ("in re ", "state v. ", "state of washington v. ")
+
+
+class CitationParts(NamedTuple):
+    volume: str
+    reporter: str
+    page: str
+
+
+@lru_cache(maxsize=1)
+def _reporter_table() -> Dict[str, str]:
+    """Standard reporter abbreviation by squashed spelling ("wn2d" -> "Wash. 2d")."""
+    try:
+        from reporters_db import REPORTERS
+    except ImportError:
+        return {}
+
+    table = {}
+    # Edition names first, so that they win over other reporters' variations
+    for reporters in REPORTERS.values():
+        for reporter in reporters:
+            for edition in reporter.get('editions', {}):
+                table.setdefault(_squash_reporter(edition), edition)
+    for reporters in REPORTERS.values():
+        for reporter in reporters:
+            for variation, edition in reporter.get('variations', {}).items():
+                table.setdefault(_squash_reporter(variation), edition)
+    return table
+
+
+def _squash_reporter(reporter: str) -> str:
+    return REPORTER_SQUASH_PATTERN.sub('', reporter).lower()
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def canonical_reporter(reporter: str) -> Optional[str]:
+    """
+    Standard abbreviation of a reporter.
+
+    Args:
+        reporter: The reporter as written (e.g. "Wn.2d")
+
+    Returns:
+        The standard abbreviation (e.g. "Wash. 2d"), or None if the reporter isn't known
+    """
+    return _reporter_table().get(_squash_reporter(reporter))
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def parse_citation(citation: str) -> Optional[CitationParts]:
+    """
+    Split a citation into volume, reporter and page.
+
+    Args:
+        citation: The citation (e.g. "196 Wn.2d 725")
+
+    Returns:
+        CitationParts with the standard reporter abbreviation, or with the
+        reporter as written (spaces tidied) if it isn't a known reporter; None
+        if the text doesn't look like a volume-reporter-page citation
+    """
+    if not citation:
+        return None
+    match = CITATION_PATTERN.search(citation)
+    if not match:
+        return None
+    volume, reporter, page = match.groups()
+    reporter = WHITESPACE_PATTERN.sub(' ', reporter).strip()
+    return CitationParts(volume, canonical_reporter(reporter) or reporter, page)
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def normalize_westlaw_citation(citation: str) -> str:
+    """
+    Normalize a WestLaw citation for better search results.
+
+    Args:
+        citation: The WestLaw citation to normalize.
+
+    Returns:
+        str: The normalized citation (e.g. "2018 WL 3037217"), or the citation unchanged if it isn't one.
+    """
+    match = WESTLAW_PATTERN.search(citation)
+    if match:
+        year, number = match.groups()
+        return f"{year} WL {number}"
+    return citation
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def canonical_citation(citation: str) -> str:
+    """
+    Write a citation the standard way (e.g. "196 Wn.2d 725" -> "196 Wash. 2d 725").
+
+    Args:
+        citation: The citation text
+
+    Returns:
+        The standard form, or the citation with its spaces tidied if it can't be parsed
+    """
+    if not citation:
+        return ""
+    if WESTLAW_PATTERN.search(citation):
+        return normalize_westlaw_citation(citation)
+    parts = parse_citation(citation)
+    if parts is None:
+        return WHITESPACE_PATTERN.sub(' ', citation).strip()
+    return f"{parts.volume} {parts.reporter} {parts.page}"
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def citation_key(citation: str) -> str:
+    """
+    Lookup key for a citation, the same for every spelling of it.
+
+    Args:
+        citation: The citation text
+
+    Returns:
+        Key such as "196 wash. 2d 725" or "93 s.ct. 705", or "" for empty input
+    """
+    if not citation:
+        return ""
+    key = canonical_citation(citation).lower()
+    return ABBREVIATION_GAP_PATTERN.sub('.', key)
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def normalize_case_name(case_name: str) -> str:
+    """
+    Normalize a case name for comparison purposes.
+
+    Args:
+        case_name: The case name to normalize
+
+    Returns:
+        Normalized case name
+    """
+    if not case_name:
+        return ""
+
+    normalized = case_name.lower()
+
+    # Remove common prefixes
+    for prefix in CASE_NAME_PREFIXES:
+        if normalized.startswith(prefix):
+            normalized = normalized[len(prefix):]
+            break
+
+    # Remove punctuation and extra spaces
+    normalized = CASE_NAME_PUNCTUATION_PATTERN.sub('', normalized)
+    return WHITESPACE_PATTERN.sub(' ', normalized).strip()
@@ -9,20 +9,43 @@ This module provides comprehensive citation verification using multiple methods:
 4. LangSearch API (backup)
 5. Google Scholar (backup)
 
-It implements a fallback mechanism to try different methods if one fails.
+When the local citation index has been imported (see citation_index), it is
+checked before all of them and most citations are verified without a network call.
+
+How the methods are combined is set by VERIFICATION_MODE:
+- sequential (default): each method starts only after the previous one missed
+- race: all CourtListener methods start at once
+- hedged: the next method starts after HEDGE_DELAY seconds (or at once if the
+  running method is predicted to be slow), so a slow miss doesn't hold up the rest
+race and hedged send more requests to CourtListener than sequential, spending
+the API key's shared rate limit, so they are opt-in.
+In every mode the highest-priority method that finds the citation wins, slower
+in-flight calls are cancelled, and the backups only run if CourtListener missed.
+
+Everything is async underneath (averify_citation / averify_many) so that hundreds
+of citations can be verified on one event loop; verify_citation is a synchronous wrapper.
 """
 
 import os
 import re
 import json
+import logging
 import time
+import asyncio
+import threading
 import requests
 import urllib.parse
 from typing import Optional, Dict, Any, List, Tuple, Union
-import traceback
 
 # Import existing modules (copy them from old files if needed)
 # These imports will be handled by moving the files later
+from citation_cache import get_citation_cache
+from citation_index import get_citation_index
+from citation_normalization import canonical_citation, parse_citation, CITATION_PATTERN, WESTLAW_PATTERN
+from http_client import async_request, run_sync
+from rate_limiter import get_scheduler, PRIORITY_INTERACTIVE
+
+logger = logging.getLogger(__name__)
 
 # API endpoints
 COURTLISTENER_CITATION_API = 'https://www.courtlistener.com/api/rest/v3/citation-lookup/'
@@ -39,14 +62,50 @@ GOOGLE_SCHOLAR_AVAILABLE = True
 # Configuration
 MAX_RETRIES = 5
 TIMEOUT_SECONDS = 30
+MAX_CONCURRENT_VERIFICATIONS = 50  # Citations verified at once by averify_many
+
+# How verification methods are combined: 'sequential', 'race' or 'hedged'
+VERIFICATION_MODES = ('sequential', 'race', 'hedged')
+VERIFICATION_MODE = os.environ.get('VERIFICATION_MODE', 'sequential').lower()
+HEDGE_DELAY = float(os.environ.get('HEDGE_DELAY', 1.0))  # Seconds before starting the next method
+HEDGE_SLOW_THRESHOLD = float(os.environ.get('HEDGE_SLOW_THRESHOLD', 5.0))  # Predicted latency that triggers an immediate hedge
+
+# Recent latency of each verification method (exponential moving average, seconds)
+_method_latency: Dict[str, float] = {}
+_method_latency_lock = threading.Lock()
+LATENCY_SMOOTHING = 0.2
+
+def record_method_latency(method_name: str, seconds: float) -> None:
+    """Update a method's moving-average latency."""
+    with _method_latency_lock:
+        previous = _method_latency.get(method_name)
+        if previous is None:
+            _method_latency[method_name] = seconds
+        else:
+            _method_latency[method_name] = previous + LATENCY_SMOOTHING * (seconds - previous)
+
+def predicted_method_latency(method_name: str) -> Optional[float]:
+    """Get a method's moving-average latency, or None if it hasn't run yet."""
+    with _method_latency_lock:
+        return _method_latency.get(method_name)
 
 class CitationVerifier:
     """Class for verifying legal citations using multiple methods."""
     
-    def __init__(self, api_key=None, langsearch_api_key=None):
-        """Initialize the CitationVerifier with API keys."""
+    def __init__(self, api_key=None, langsearch_api_key=None, use_cache=True, mode=None, hedge_delay=None,
+                 use_local_index=True):
+        """Initialize the CitationVerifier with API keys and the verification mode."""
+        self.mode = (mode or VERIFICATION_MODE).lower()
+        if self.mode not in VERIFICATION_MODES:
+            logger.warning("Unknown verification mode '%s', using 'sequential'", self.mode)
+            self.mode = 'sequential'
+        self.hedge_delay = HEDGE_DELAY if hedge_delay is None else hedge_delay
         self.api_key = api_key or os.environ.get('COURTLISTENER_API_KEY')
         self.langsearch_api_key = langsearch_api_key or os.environ.get('LANGSEARCH_API_KEY')
+        self.cache = get_citation_cache() if use_cache else None
+        self.citation_index = get_citation_index() if use_local_index else None
+        # Shared with every other CourtListener caller using the same key
+        self.scheduler = get_scheduler(self.api_key)
         self.headers = {
             'Authorization': f'Token {self.api_key}' if self.api_key else '',
             'Content-Type': 'application/json'
@@ -66,57 +125,246 @@ class CitationVerifier:
             - case_name: Name of the case if found
             - details: Additional details about the case
             - url: Direct link to the case (if available)
+            - won_by: Which verification method produced the result
+            - verification_mode: The mode used to combine the methods
+            - transient, error: Set when no method found the citation and some
+              couldn't be reached; such results aren't cached
         """
+        return run_sync(self.averify_citation(citation))
+    
+    def verify_many(self, citations: List[str]) -> List[Dict[str, Any]]:
+        """Verify many citations concurrently; results are in the same order as citations."""
+        return run_sync(self.averify_many(citations))
+    
+    async def averify_citation(self, citation: str) -> Dict[str, Any]:
+        """Async version of verify_citation."""
+        if self.cache is not None:
+            cached = self.cache.get('citation_verifier', citation)
+            if cached:
+                logger.debug("Using cached verification result for: %s", citation)
+                return cached['value']
+        
+        result = await self._averify_citation_uncached(citation)
+        
+        if self.cache is not None and not result.get('error'):
+            self.cache.set('citation_verifier', citation, result, found=result['found'])
+        
+        return result
+    
+    async def averify_many(self, citations: List[str],
+                           max_concurrency: int = MAX_CONCURRENT_VERIFICATIONS) -> List[Dict[str, Any]]:
+        """
+        Verify many citations concurrently on the running event loop.
+        
+        Args:
+            citations: The legal citations to verify
+            max_concurrency: Maximum number of citations being verified at once
+            
+        Returns:
+            List of verification results in the same order as citations
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def verify_one(citation):
+            async with semaphore:
+                return await self.averify_citation(citation)
+        
+        return await asyncio.gather(*(verify_one(citation) for citation in citations))
+    
+    async def _averify_citation_uncached(self, citation: str) -> Dict[str, Any]:
+        """Run the CourtListener methods, then the backups, until one of them finds the citation."""
         result = {
             'citation': citation,
             'found': False,
             'source': None,
             'case_name': None,
             'url': None,
-            'details': {}
+            'details': {},
+            'won_by': None,
+            'verification_mode': self.mode
         }
         
-        # Try all methods in sequence until one succeeds
         try:
-            # Method 1: CourtListener Citation Lookup API
-            cl_result = self.verify_with_courtlistener_citation_api(citation)
-            if cl_result.get('found'):
-                result.update(cl_result)
-                return result
-                
-            # Method 2: CourtListener Opinion Search API
-            search_result = self.verify_with_courtlistener_search_api(citation)
-            if search_result.get('found'):
-                result.update(search_result)
-                return result
-                
-            # Method 3: CourtListener Cluster/Docket APIs
-            cluster_result = self.verify_with_courtlistener_cluster_api(citation)
-            if cluster_result.get('found'):
-                result.update(cluster_result)
-                return result
-                
-            # Method 4: LangSearch API (backup)
-            if LANGSEARCH_AVAILABLE and self.langsearch_api_key:
-                lang_result = self.verify_with_langsearch_api(citation)
-                if lang_result.get('found'):
-                    result.update(lang_result)
-                    return result
-                    
-            # Method 5: Google Scholar (backup)
-            if GOOGLE_SCHOLAR_AVAILABLE:
-                scholar_result = self.verify_with_google_scholar(citation)
-                if scholar_result.get('found'):
-                    result.update(scholar_result)
-                    return result
+            # Methods 1-3: CourtListener Citation Lookup, Opinion Search and Cluster APIs,
+            # after the local citation index when there is one
+            methods = [self.averify_with_local_index] if self.citation_index is not None else []
+            failed = []
+            winner = await self._run_methods(citation, methods + [
+                self.averify_with_courtlistener_citation_api,
+                self.averify_with_courtlistener_search_api,
+                self.averify_with_courtlistener_cluster_api
+            ], failed=failed)
+            
+            # Methods 4-5: LangSearch API and Google Scholar (backups)
+            if not winner:
+                backups = []
+                if LANGSEARCH_AVAILABLE and self.langsearch_api_key:
+                    backups.append(self.averify_with_langsearch_api)
+                if GOOGLE_SCHOLAR_AVAILABLE:
+                    backups.append(self.averify_with_google_scholar)
+                winner = await self._run_methods(citation, backups, failed=failed)
+            
+            if winner:
+                result.update(winner)
+            elif failed:
+                # A method that couldn't be reached hasn't said the case doesn't exist
+                result['transient'] = True
+                result['error'] = f"Could not reach {', '.join(failed)}"
         
         except Exception as e:
-            print(f"Error verifying citation {citation}: {e}")
-            traceback.print_exc()
+            logger.exception("Error verifying citation %s: %s", citation, e)
+            result['error'] = str(e)
         
         return result
     
+    async def _run_methods(self, citation: str, methods: List, mode: Optional[str] = None,
+                           failed: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Run verification methods according to the verification mode and resolve them by priority.
+        
+        A method's positive result wins once every higher-priority method has
+        finished without finding the citation; methods still running are then cancelled.
+        
+        Args:
+            citation: The legal citation to verify
+            methods: Async verification methods, highest priority first
+            mode: 'sequential', 'race' or 'hedged' (defaults to the verifier's mode)
+            failed: If given, the names of methods that failed transiently (request
+                    errors, timeouts, non-2xx responses) are added to it when no method
+                    finds the citation
+            
+        Returns:
+            The winning method's result with 'won_by' set, or None if no method found the citation
+        """
+        mode = mode or self.mode
+        loop = asyncio.get_running_loop()
+        tasks = []
+        names = []
+        next_launch_at = None
+        
+        def launch_next():
+            nonlocal next_launch_at
+            method = methods[len(tasks)]
+            name = method.__name__.replace('averify_with_', '')
+            names.append(name)
+            tasks.append(asyncio.create_task(self._timed(name, method, citation)))
+            
+            if len(tasks) == len(methods) or mode == 'sequential':
+                next_launch_at = None
+            elif mode == 'race':
+                next_launch_at = loop.time()
+            else:
+                # Hedge straight away if this method is usually slow
+                predicted = predicted_method_latency(name)
+                slow = predicted is not None and predicted >= HEDGE_SLOW_THRESHOLD
+                next_launch_at = loop.time() + (0 if slow else self.hedge_delay)
+        
+        if not methods:
+            return None
+        
+        try:
+            launch_next()
+            while True:
+                for index, task in enumerate(tasks):
+                    if not task.done():
+                        break  # A higher-priority method may still find it
+                    if task.cancelled() or task.exception():
+                        continue
+                    if task.result().get('found'):
+                        winner = dict(task.result())
+                        winner['won_by'] = names[index]
+                        return winner
+                else:
+                    # Every launched method missed
+                    if len(tasks) == len(methods):
+                        if failed is not None:
+                            failed.extend(
+                                names[index] for index, task in enumerate(tasks)
+                                if task.cancelled() or task.exception() or task.result().get('transient')
+                            )
+                        return None
+                    launch_next()
+                    continue
+                
+                if next_launch_at is not None and loop.time() >= next_launch_at:
+                    launch_next()
+                    continue
+                
+                timeout = None if next_launch_at is None else max(0, next_launch_at - loop.time())
+                pending = [task for task in tasks if not task.done()]
+                await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    @staticmethod
+    async def _timed(name: str, method, citation: str) -> Dict[str, Any]:
+        """Run one verification method and record how long it took."""
+        start = time.time()
+        result = await method(citation)
+        record_method_latency(name, time.time() - start)
+        return result
+    
+    # Synchronous versions of the individual verification methods
+    
+    def verify_with_local_index(self, citation: str) -> Dict[str, Any]:
+        return run_sync(self.averify_with_local_index(citation))
+    
     def verify_with_courtlistener_citation_api(self, citation: str) -> Dict[str, Any]:
+        """Verify a citation using the CourtListener Citation Lookup API."""
+        return run_sync(self.averify_with_courtlistener_citation_api(citation))
+    
+    def verify_with_courtlistener_search_api(self, citation: str) -> Dict[str, Any]:
+        """Verify a citation using the CourtListener Search API."""
+        return run_sync(self.averify_with_courtlistener_search_api(citation))
+    
+    def verify_with_courtlistener_cluster_api(self, citation: str) -> Dict[str, Any]:
+        """Verify a citation using the CourtListener Cluster API."""
+        return run_sync(self.averify_with_courtlistener_cluster_api(citation))
+    
+    def verify_with_langsearch_api(self, citation: str) -> Dict[str, Any]:
+        """Verify a citation using the LangSearch API."""
+        return run_sync(self.averify_with_langsearch_api(citation))
+    
+    def verify_with_google_scholar(self, citation: str) -> Dict[str, Any]:
+        """Verify a citation using Google Scholar."""
+        return run_sync(self.averify_with_google_scholar(citation))
+    
+    async def averify_with_local_index(self, citation: str) -> Dict[str, Any]:
+        """
+        Verify a citation against the local index of CourtListener bulk data (see citation_index).
+        
+        Args:
+            citation: The legal citation to verify
+            
+        Returns:
+            Dict with verification results
+        """
+        result = {
+            'citation': citation,
+            'found': False,
+            'source': 'CourtListener Local Index',
+            'case_name': None,
+            'details': {}
+        }
+        
+        item = self.citation_index.lookup(citation) if self.citation_index is not None else None
+        if item:
+            cluster = item['clusters'][0]
+            result['found'] = True
+            result['case_name'] = cluster.get('case_name', 'Unknown Case')
+            result['url'] = f"https://www.courtlistener.com{cluster.get('absolute_url', '')}"
+            result['details'] = {
+                'date_filed': cluster.get('date_filed', 'Unknown Date'),
+                'citations': [
+                    f"{cite.get('volume')} {cite.get('reporter')} {cite.get('page')}"
+                    for cite in cluster.get('citations', [])
+                ]
+            }
+        return result
+    
+    async def averify_with_courtlistener_citation_api(self, citation: str) -> Dict[str, Any]:
         """
         Verify a citation using the CourtListener Citation Lookup API.
         
@@ -147,14 +395,23 @@ class CitationVerifier:
             # Make the request with retries
             for attempt in range(MAX_RETRIES):
                 try:
-                    print(f"Sending request to {COURTLISTENER_CITATION_API}")
-                    response = requests.post(
+                    logger.debug("Sending request to %s", COURTLISTENER_CITATION_API)
+                    await self.scheduler.acquire_async(PRIORITY_INTERACTIVE)
+                    response = await async_request(
+                        'courtlistener', 'POST',
                         COURTLISTENER_CITATION_API, 
                         headers=self.headers, 
                         json=data,
                         timeout=TIMEOUT_SECONDS
                     )
                     
+                    # On a 429 the scheduler pauses until Retry-After has passed; try again
+                    if self.scheduler.check_response(response) and attempt < MAX_RETRIES - 1:
+                        continue
+                    
+                    # A failed request isn't an answer, so the miss mustn't be cached as one
+                    if not 200 <= response.status_code < 300:
+                        result['transient'] = True
                     if response.status_code == 200:
                         api_result = response.json()
                         
@@ -196,21 +453,26 @@ class CitationVerifier:
                     break
                     
                 except requests.RequestException as e:
-                    print(f"Request error (attempt {attempt+1}/{MAX_RETRIES}): {e}")
+                    logger.warning("Request error (attempt %s/%s): %s", attempt+1, MAX_RETRIES, e)
                     if attempt < MAX_RETRIES - 1:
-                        time.sleep(2 ** attempt)  # Exponential backoff
+                        await asyncio.sleep(self.scheduler.retry_delay(attempt))
                     else:
                         raise
         
         except Exception as e:
-            print(f"Error in verify_with_courtlistener_citation_api: {e}")
-            traceback.print_exc()
+            logger.exception("Error in verify_with_courtlistener_citation_api: %s", e)
+            result['transient'] = True
         
         return result
     
     def _format_citation_for_courtlistener(self, citation: str) -> str:
         """
-        Format a citation for the CourtListener API, particularly for Washington state citations.
+        Format a citation for the CourtListener API, with its reporter written
+        the standard way ("196 Wn.2d 725" -> "196 Wash. 2d 725").
+        
+        Only the citation itself is rewritten; text around it, such as a pin
+        cite or the year, is kept ("196 Wn.2d 725, 730 (2020)" ->
+        "196 Wash. 2d 725, 730 (2020)").
         
         Args:
             citation: The original citation
@@ -218,21 +480,12 @@ class CitationVerifier:
         Returns:
             Properly formatted citation
         """
-        # Convert "Wash. 2d" format to "Wash. 2d" if needed
-        wash_2d_pattern = r'(\d+)\s+Wash\.?\s*2d\s+(\d+)'
-        wash_pattern = r'(\d+)\s+Wash\.?\s+(\d+)'
-        wash_app_pattern = r'(\d+)\s+Wash\.?\s*App\.?\s+(\d+)'
-        
-        if re.search(wash_2d_pattern, citation, re.IGNORECASE):
-            return re.sub(wash_2d_pattern, r'\1 Wash. 2d \2', citation, flags=re.IGNORECASE)
-        elif re.search(wash_pattern, citation, re.IGNORECASE):
-            return re.sub(wash_pattern, r'\1 Wash. \2', citation, flags=re.IGNORECASE)
-        elif re.search(wash_app_pattern, citation, re.IGNORECASE):
-            return re.sub(wash_app_pattern, r'\1 Wash. App. \2', citation, flags=re.IGNORECASE)
-        
-        return citation
+        match = WESTLAW_PATTERN.search(citation) or CITATION_PATTERN.search(citation)
+        if match is None:
+            return citation
+        return citation[:match.start()] + canonical_citation(match.group(0)) + citation[match.end():]
     
-    def verify_with_courtlistener_search_api(self, citation: str) -> Dict[str, Any]:
+    async def averify_with_courtlistener_search_api(self, citation: str) -> Dict[str, Any]:
         """
         Verify a citation using the CourtListener Search API.
         This is a fallback when the Citation Lookup API doesn't find the case.
@@ -276,14 +529,22 @@ class CitationVerifier:
             # Make the request with retries
             for attempt in range(MAX_RETRIES):
                 try:
-                    print(f"Searching CourtListener for citation: {formatted_citation}")
-                    response = requests.get(
+                    logger.debug("Searching CourtListener for citation: %s", formatted_citation)
+                    await self.scheduler.acquire_async(PRIORITY_INTERACTIVE)
+                    response = await async_request(
+                        'courtlistener', 'GET',
                         COURTLISTENER_SEARCH_API, 
                         headers=self.headers, 
                         params=search_params,
                         timeout=TIMEOUT_SECONDS
                     )
                     
+                    # On a 429 the scheduler pauses until Retry-After has passed; try again
+                    if self.scheduler.check_response(response) and attempt < MAX_RETRIES - 1:
+                        continue
+                    
+                    if not 200 <= response.status_code < 300:
+                        result['transient'] = True
                     if response.status_code == 200:
                         search_results = response.json()
                         
@@ -294,7 +555,7 @@ class CitationVerifier:
                             # Extract the opinion ID for further details
                             opinion_id = top_result.get('id')
                             if opinion_id:
-                                opinion_details = self._get_opinion_details(opinion_id)
+                                opinion_details = await self._aget_opinion_details(opinion_id)
                                 if opinion_details:
                                     result['found'] = True
                                     result['case_name'] = opinion_details.get('case_name', top_result.get('caseName', 'Unknown Case'))
@@ -310,15 +571,15 @@ class CitationVerifier:
                     break
                     
                 except requests.RequestException as e:
-                    print(f"Request error (attempt {attempt+1}/{MAX_RETRIES}): {e}")
+                    logger.warning("Request error (attempt %s/%s): %s", attempt+1, MAX_RETRIES, e)
                     if attempt < MAX_RETRIES - 1:
-                        time.sleep(2 ** attempt)  # Exponential backoff
+                        await asyncio.sleep(self.scheduler.retry_delay(attempt))
                     else:
                         raise
         
         except Exception as e:
-            print(f"Error in verify_with_courtlistener_search_api: {e}")
-            traceback.print_exc()
+            logger.exception("Error in verify_with_courtlistener_search_api: %s", e)
+            result['transient'] = True
         
         return result
     
@@ -332,27 +593,10 @@ class CitationVerifier:
         Returns:
             Dict with volume, reporter, and page
         """
-        # Common patterns for citations
-        patterns = [
-            # Standard pattern: 123 U.S. 456
-            r'(\d+)\s+([A-Za-z\.\s]+)\s+(\d+)',
-            # Pattern with reporter in middle: 123 F. 2d 456
-            r'(\d+)\s+([A-Za-z\.\s]+\d+[a-z]*\s+)\s*(\d+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, citation)
-            if match:
-                return {
-                    'volume': match.group(1),
-                    'reporter': match.group(2).strip(),
-                    'page': match.group(3)
-                }
-        
-        # If no pattern matches, return empty dict
-        return {}
+        parts = parse_citation(citation)
+        return parts._asdict() if parts else {}
     
-    def _get_opinion_details(self, opinion_id: str) -> Optional[Dict[str, Any]]:
+    async def _aget_opinion_details(self, opinion_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about an opinion from the CourtListener API.
         
@@ -364,7 +608,9 @@ class CitationVerifier:
         """
         try:
             url = f"{COURTLISTENER_OPINION_API}{opinion_id}/"
-            response = requests.get(url, headers=self.headers, timeout=TIMEOUT_SECONDS)
+            await self.scheduler.acquire_async(PRIORITY_INTERACTIVE)
+            response = await async_request('courtlistener', 'GET', url, headers=self.headers, timeout=TIMEOUT_SECONDS)
+            self.scheduler.check_response(response)
             
             if response.status_code == 200:
                 opinion_data = response.json()
@@ -374,7 +620,7 @@ class CitationVerifier:
                 if isinstance(cluster_ref, str) and cluster_ref.startswith('http'):
                     # Extract cluster ID from URL
                     cluster_id = cluster_ref.rstrip('/').split('/')[-1]
-                    cluster_data = self._get_cluster_details(cluster_id)
+                    cluster_data = await self._aget_cluster_details(cluster_id)
                     if cluster_data:
                         # Combine opinion and cluster data
                         return {**opinion_data, **cluster_data}
@@ -382,11 +628,11 @@ class CitationVerifier:
                 return opinion_data
         
         except Exception as e:
-            print(f"Error getting opinion details: {e}")
+            logger.warning("Error getting opinion details: %s", e)
         
         return None
     
-    def _get_cluster_details(self, cluster_id: str) -> Optional[Dict[str, Any]]:
+    async def _aget_cluster_details(self, cluster_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a cluster from the CourtListener API.
         
@@ -398,17 +644,19 @@ class CitationVerifier:
         """
         try:
             url = f"{COURTLISTENER_CLUSTER_API}{cluster_id}/"
-            response = requests.get(url, headers=self.headers, timeout=TIMEOUT_SECONDS)
+            await self.scheduler.acquire_async(PRIORITY_INTERACTIVE)
+            response = await async_request('courtlistener', 'GET', url, headers=self.headers, timeout=TIMEOUT_SECONDS)
+            self.scheduler.check_response(response)
             
             if response.status_code == 200:
                 return response.json()
         
         except Exception as e:
-            print(f"Error getting cluster details: {e}")
+            logger.warning("Error getting cluster details: %s", e)
         
         return None
     
-    def verify_with_courtlistener_cluster_api(self, citation: str) -> Dict[str, Any]:
+    async def averify_with_courtlistener_cluster_api(self, citation: str) -> Dict[str, Any]:
         """
         Verify a citation using the CourtListener Cluster API directly.
         This is a fallback when other CourtListener methods don't find the case.
@@ -453,13 +701,18 @@ class CitationVerifier:
                 search_params['reporter'] = citation_parts.get('reporter')
             
             # Make the request
-            response = requests.get(
+            await self.scheduler.acquire_async(PRIORITY_INTERACTIVE)
+            response = await async_request(
+                'courtlistener', 'GET',
                 COURTLISTENER_SEARCH_API, 
                 headers=self.headers, 
                 params=search_params,
                 timeout=TIMEOUT_SECONDS
             )
+            self.scheduler.check_response(response)
             
+            if not 200 <= response.status_code < 300:
+                result['transient'] = True
             if response.status_code == 200:
                 search_results = response.json()
                 
@@ -476,7 +729,7 @@ class CitationVerifier:
                     
                     # If we found a cluster ID, get the details
                     if cluster_id:
-                        cluster_data = self._get_cluster_details(cluster_id)
+                        cluster_data = await self._aget_cluster_details(cluster_id)
                         if cluster_data:
                             result['found'] = True
                             result['case_name'] = cluster_data.get('case_name', 'Unknown Case')
@@ -499,12 +752,12 @@ class CitationVerifier:
                             return result
         
         except Exception as e:
-            print(f"Error in verify_with_courtlistener_cluster_api: {e}")
-            traceback.print_exc()
+            logger.exception("Error in verify_with_courtlistener_cluster_api: %s", e)
+            result['transient'] = True
         
         return result
     
-    def verify_with_langsearch_api(self, citation: str) -> Dict[str, Any]:
+    async def averify_with_langsearch_api(self, citation: str) -> Dict[str, Any]:
         """
         Verify a citation using the LangSearch API as a backup.
         
@@ -541,8 +794,10 @@ class CitationVerifier:
             }
             
             # Make the request
-            response = requests.post(api_url, headers=headers, json=data, timeout=TIMEOUT_SECONDS)
+            response = await async_request('langsearch', 'POST', api_url, headers=headers, json=data, timeout=TIMEOUT_SECONDS)
             
+            if not 200 <= response.status_code < 300:
+                result['transient'] = True
             if response.status_code == 200:
                 api_result = response.json()
                 
@@ -560,12 +815,12 @@ class CitationVerifier:
                     return result
         
         except Exception as e:
-            print(f"Error in verify_with_langsearch_api: {e}")
-            traceback.print_exc()
+            logger.exception("Error in verify_with_langsearch_api: %s", e)
+            result['transient'] = True
         
         return result
     
-    def verify_with_google_scholar(self, citation: str) -> Dict[str, Any]:
+    async def averify_with_google_scholar(self, citation: str) -> Dict[str, Any]:
         """
         Verify a citation using Google Scholar as a last resort.
         Note: This is a basic implementation and may be rate-limited by Google.
@@ -607,9 +862,11 @@ class CitationVerifier:
             }
             
             # Make the request
-            response = requests.get(GOOGLE_SCHOLAR_URL, headers=headers, params=params, timeout=TIMEOUT_SECONDS)
+            response = await async_request('scholar', 'GET', GOOGLE_SCHOLAR_URL, headers=headers, params=params, timeout=TIMEOUT_SECONDS)
             
             # Simple check if the citation appears in the results
+            if not 200 <= response.status_code < 300:
+                result['transient'] = True
             if response.status_code == 200 and formatted_citation in response.text:
                 # Extract the first result title as case name (basic implementation)
                 import re
@@ -626,7 +883,7 @@ class CitationVerifier:
                 return result
         
         except Exception as e:
-            print(f"Error in verify_with_google_scholar: {e}")
-            traceback.print_exc()
+            logger.exception("Error in verify_with_google_scholar: %s", e)
+            result['transient'] = True
         
         return result
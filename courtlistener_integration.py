@@ -8,11 +8,21 @@ It also provides functions to search for citations in local PDF folders as an al
 
 import os
 import json
+import logging
 import time
 import requests
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from typing import Optional, Dict, Any, List, Tuple
 
+from citation_cache import get_citation_cache
+from citation_index import get_citation_index
+from citation_normalization import citation_key, normalize_westlaw_citation, WESTLAW_PATTERN
+from http_client import get_session
+from rate_limiter import RateLimitScheduler, get_scheduler, PRIORITY_INTERACTIVE, PRIORITY_BATCH, PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
 # Flag to track if CourtListener API is available
 COURTLISTENER_AVAILABLE = True
 
@@ -26,17 +36,24 @@ LOCAL_PDF_FOLDERS = [
 # Flag to track if local PDF search is enabled
 USE_LOCAL_PDF_SEARCH = False
 
+# Citation lookup API and its per-request limits
+CITATION_LOOKUP_API = "https://www.courtlistener.com/api/rest/v3/citation-lookup/"
+CITATION_LOOKUP_MAX_CITATIONS = 250    # Citations the API will look up in one request
+CITATION_LOOKUP_MAX_CHARS = 64000      # Maximum length of the request text
+CITATION_LOOKUP_PARALLEL_REQUESTS = 3  # Chunks sent at the same time
+CITATION_LOOKUP_TIMEOUT = 60
+
 def decrypt_api_key(encrypted_key: str) -> str:
     """Decrypt an API key using the master key."""
     try:
         from setup_api_keys import decrypt_api_key as decrypt
         master_key = os.environ.get('MASTER_KEY')
         if not master_key:
-            print("Warning: MASTER_KEY environment variable not set. Using encrypted key as-is.")
+            logger.warning("MASTER_KEY environment variable not set. Using encrypted key as-is.")
             return encrypted_key
         return decrypt(encrypted_key, master_key)
     except Exception as e:
-        print(f"Warning: Could not decrypt API key: {e}")
+        logger.warning("Could not decrypt API key: %s", e)
         return encrypted_key
 
 def setup_courtlistener_api(api_key: Optional[str] = None, max_retries: int = 3, verbose: bool = True) -> bool:
@@ -58,8 +75,8 @@ def setup_courtlistener_api(api_key: Optional[str] = None, max_retries: int = 3,
         key = api_key or os.environ.get("COURTLISTENER_API_KEY")
         if not key:
             if verbose:
-                print("Warning: CourtListener API key not provided and COURTLISTENER_API_KEY environment variable not set.")
-                print("CourtListener API will be used in limited mode (rate-limited).")
+                logger.warning("CourtListener API key not provided and COURTLISTENER_API_KEY environment variable not set.")
+                logger.info("CourtListener API will be used in limited mode (rate-limited).")
             COURTLISTENER_AVAILABLE = True
             return True  # CourtListener allows some requests without API key
         
@@ -72,13 +89,15 @@ def setup_courtlistener_api(api_key: Optional[str] = None, max_retries: int = 3,
         # Store the API key in an environment variable for later use
         os.environ["COURTLISTENER_API_KEY"] = key
         if verbose:
-            print(f"CourtListener API key set in environment variable: {key[:5]}...{key[-5:] if len(key) > 10 else ''}")
+            logger.debug("CourtListener API key set in environment variable: %s...%s", key[:5], key[-5:] if len(key) > 10 else '')
         
         # Test the API connection with a minimal request
+        scheduler = get_scheduler(key)
         for attempt in range(max_retries):
             try:
                 # Make a minimal API call to verify connectivity
-                response = requests.get(
+                scheduler.acquire(PRIORITY_BACKGROUND)
+                response = get_session('courtlistener').get(
                     "https://www.courtlistener.com/api/rest/v4/", 
                     headers={"Authorization": f"Token {key}"},
                     timeout=10  # Add timeout to prevent hanging requests
@@ -86,60 +105,58 @@ def setup_courtlistener_api(api_key: Optional[str] = None, max_retries: int = 3,
                 
                 if response.status_code == 200:
                     if verbose:
-                        print("CourtListener API connection successful.")
-                        print("API is now available for full functionality.")
+                        logger.info("CourtListener API connection successful.")
+                        logger.info("API is now available for full functionality.")
                     COURTLISTENER_AVAILABLE = True
                     return True
-                elif response.status_code == 429:  # Too Many Requests
+                elif scheduler.check_response(response):  # Too Many Requests
                     if attempt < max_retries - 1:
-                        wait_time = 3 ** attempt  # Increased exponential backoff
-                        print(f"Rate limit exceeded. Waiting {wait_time} seconds before retrying...")
-                        time.sleep(wait_time)
+                        # The scheduler pauses every request on this key until Retry-After has passed
                         continue
                     else:
-                        print(f"Rate limit exceeded after {max_retries} attempts.")
+                        logger.warning("Rate limit exceeded after %s attempts.", max_retries)
                         COURTLISTENER_AVAILABLE = False
                         return False
                 else:
                     if verbose:
-                        print(f"Error testing CourtListener API connection: Status code {response.status_code}")
-                        print(f"Response: {response.text}")
-                        print("This may indicate an invalid API key or a server issue.")
+                        logger.warning("Error testing CourtListener API connection: Status code %s", response.status_code)
+                        logger.debug("Response: %s", response.text)
+                        logger.debug("This may indicate an invalid API key or a server issue.")
                     if attempt < max_retries - 1:
-                        wait_time = 3 ** attempt  # Increased exponential backoff
-                        print(f"Retrying in {wait_time} seconds...")
+                        wait_time = scheduler.retry_delay(attempt)
+                        logger.debug("Retrying in %.1f seconds...", wait_time)
                         time.sleep(wait_time)
                         continue
                     else:
                         COURTLISTENER_AVAILABLE = False
                         return False
             except requests.exceptions.Timeout:
-                print(f"Request timed out on attempt {attempt + 1}/{max_retries}")
+                logger.warning("Request timed out on attempt %s/%s", attempt + 1, max_retries)
                 if attempt < max_retries - 1:
-                    wait_time = 3 ** attempt  # Increased exponential backoff
-                    print(f"Retrying in {wait_time} seconds...")
+                    wait_time = scheduler.retry_delay(attempt)
+                    logger.debug("Retrying in %.1f seconds...", wait_time)
                     time.sleep(wait_time)
                     continue
                 else:
-                    print("Failed to connect to CourtListener API after multiple attempts.")
+                    logger.warning("Failed to connect to CourtListener API after multiple attempts.")
                     COURTLISTENER_AVAILABLE = False
                     return False
             except requests.exceptions.RequestException as e:
-                print(f"Request error: {str(e)}")
+                logger.warning("Request error: %s", e)
                 if attempt < max_retries - 1:
-                    wait_time = 3 ** attempt  # Increased exponential backoff
-                    print(f"Retrying in {wait_time} seconds...")
+                    wait_time = scheduler.retry_delay(attempt)
+                    logger.debug("Retrying in %.1f seconds...", wait_time)
                     time.sleep(wait_time)
                     continue
                 else:
-                    print(f"Failed to connect to CourtListener API after {max_retries} attempts.")
+                    logger.warning("Failed to connect to CourtListener API after %s attempts.", max_retries)
                     COURTLISTENER_AVAILABLE = False
                     return False
             except Exception as e:
-                print(f"Error testing CourtListener API connection: {str(e)}")
+                logger.warning("Error testing CourtListener API connection: %s", e)
                 if attempt < max_retries - 1:
-                    wait_time = 3 ** attempt  # Increased exponential backoff
-                    print(f"Retrying in {wait_time} seconds...")
+                    wait_time = scheduler.retry_delay(attempt)
+                    logger.debug("Retrying in %.1f seconds...", wait_time)
                     time.sleep(wait_time)
                     continue
                 else:
@@ -149,34 +166,16 @@ def setup_courtlistener_api(api_key: Optional[str] = None, max_retries: int = 3,
         # If we've exhausted all retries and still haven't returned, set to False
         COURTLISTENER_AVAILABLE = False
         if verbose:
-            print("Failed to set up CourtListener API after multiple attempts.")
-            print("API will be used in limited mode or local PDF search will be used instead.")
+            logger.warning("Failed to set up CourtListener API after multiple attempts.")
+            logger.info("API will be used in limited mode or local PDF search will be used instead.")
         return False
     except Exception as e:
         if verbose:
-            print(f"Error setting up CourtListener API: {str(e)}")
-            print("API will be used in limited mode or local PDF search will be used instead.")
+            logger.warning("Error setting up CourtListener API: %s", e)
+            logger.info("API will be used in limited mode or local PDF search will be used instead.")
         COURTLISTENER_AVAILABLE = False
         return False
 
-def normalize_westlaw_citation(citation: str) -> str:
-    """
-    Normalize a WestLaw citation for better search results.
-    
-    Args:
-        citation: The WestLaw citation to normalize.
-        
-    Returns:
-        str: The normalized citation.
-    """
-    # Check if this is a WestLaw citation (e.g., 2018 WL 3037217)
-    wl_match = re.search(r'(\d{4})\s*W\.?\s*L\.?\s*(\d+)', citation)
-    if wl_match:
-        year, number = wl_match.groups()
-        # Format as "2018 WL 3037217" (standard format)
-        return f"{year} WL {number}"
-    return citation
-
 def search_citation(citation: str, max_retries: int = 5) -> Tuple[bool, Optional[Dict[str, Any]]]:
     """
     Search for a case citation in the CourtListener API.
@@ -191,19 +190,38 @@ def search_citation(citation: str, max_retries: int = 5) -> Tuple[bool, Optional
             - Optional[Dict]: Case data if found, None otherwise.
     """
     if not citation or not citation.strip():
-        print("Error: Citation cannot be empty")
+        logger.warning("Citation cannot be empty")
         return False, None
     
     # Normalize citation to improve search results
     citation = citation.strip()
     
     # Check if this is a WestLaw citation
-    is_westlaw = re.search(r'\d{4}\s*W\.?\s*L\.?\s*\d+', citation) is not None
+    is_westlaw = WESTLAW_PATTERN.search(citation) is not None
     if is_westlaw:
-        print(f"Detected WestLaw citation: {citation}")
+        logger.debug("Detected WestLaw citation: %s", citation)
         citation = normalize_westlaw_citation(citation)
-        print(f"Normalized to: {citation}")
-        print("Note: WestLaw citations may not be directly supported by CourtListener")
+        logger.debug("Normalized to: %s", citation)
+        logger.debug("Note: WestLaw citations may not be directly supported by CourtListener")
+    
+    # Citations in the local index need no API call
+    index = get_citation_index()
+    if index is not None and not is_westlaw:
+        item = index.lookup(citation)
+        if item:
+            logger.debug("Found in local citation index: %s", citation)
+            return True, item
+    
+    # Check the shared verification cache before calling the API
+    cache = get_citation_cache()
+    if cache is not None:
+        cached = cache.get('courtlistener_search', citation)
+        if cached:
+            logger.debug("Using cached CourtListener result for: %s", citation)
+            return cached['found'], cached['value']
+    
+    # All requests made with this key share one rate limiter
+    scheduler = get_scheduler(os.environ.get("COURTLISTENER_API_KEY"))
     
     # Retry mechanism for API calls
     for attempt in range(max_retries):
@@ -220,9 +238,10 @@ def search_citation(citation: str, max_retries: int = 5) -> Tuple[bool, Optional
                     # Example: /api/rest/v3/citation-lookup/?citation=410 U.S. 113
                     lookup_url = f"https://www.courtlistener.com/api/rest/v3/citation-lookup/?citation={citation}"
                     
-                    print(f"Trying citation lookup API: {lookup_url}")
+                    logger.debug("Trying citation lookup API: %s", lookup_url)
                     
-                    response = requests.get(
+                    scheduler.acquire(PRIORITY_INTERACTIVE)
+                    response = get_session('courtlistener').get(
                         lookup_url,
                         headers=headers,
                         timeout=10  # Add timeout to prevent hanging requests
@@ -232,17 +251,21 @@ def search_citation(citation: str, max_retries: int = 5) -> Tuple[bool, Optional
                         data = response.json()
                         if data and len(data) > 0:
                             # Found at least one matching case
-                            print(f"Citation found via citation lookup API")
+                            logger.debug("Citation found via citation lookup API")
+                            if cache is not None:
+                                cache.set('courtlistener_search', citation, data[0], found=True)
                             return True, data[0]
+                    elif scheduler.check_response(response):
+                        logger.debug("Citation lookup API rate limited, falling back to search API")
                     elif response.status_code != 404:  # 404 means citation not found, which is expected
-                        print(f"Citation lookup API returned status code {response.status_code}")
-                        print(f"Response: {response.text}")
+                        logger.warning("Citation lookup API returned status code %s", response.status_code)
+                        logger.debug("Response: %s", response.text)
                 except Exception as e:
-                    print(f"Error using citation lookup API: {str(e)}")
-                    print("Falling back to search API")
+                    logger.warning("Error using citation lookup API: %s", e)
+                    logger.debug("Falling back to search API")
             
             # If citation lookup API didn't work or wasn't used, try the search API
-            print(f"Trying search API with citation: {citation}")
+            logger.debug("Trying search API with citation: %s", citation)
             
             # Search by citation
             params = {
@@ -251,7 +274,8 @@ def search_citation(citation: str, max_retries: int = 5) -> Tuple[bool, Optional
             }
             
             try:
-                response = requests.get(
+                scheduler.acquire(PRIORITY_INTERACTIVE)
+                response = get_session('courtlistener').get(
                     "https://www.courtlistener.com/api/rest/v4/search/",
                     headers=headers,
                     params=params,
@@ -262,6 +286,8 @@ def search_citation(citation: str, max_retries: int = 5) -> Tuple[bool, Optional
                     data = response.json()
                     if data.get("count", 0) > 0:
                         # Found at least one matching case
+                        if cache is not None:
+                            cache.set('courtlistener_search', citation, data.get("results", [{}])[0], found=True)
                         return True, data.get("results", [{}])[0]
                     
                     # If no results by citation, try searching by case name
@@ -271,7 +297,8 @@ def search_citation(citation: str, max_retries: int = 5) -> Tuple[bool, Optional
                         "format": "json"
                     }
                     
-                    response = requests.get(
+                    scheduler.acquire(PRIORITY_INTERACTIVE)
+                    response = get_session('courtlistener').get(
                         "https://www.courtlistener.com/api/rest/v4/search/",
                         headers=headers,
                         params=params,
@@ -282,52 +309,58 @@ def search_citation(citation: str, max_retries: int = 5) -> Tuple[bool, Optional
                         data = response.json()
                         if data.get("count", 0) > 0:
                             # Found at least one matching case
+                            if cache is not None:
+                                cache.set('courtlistener_search', citation, data.get("results", [{}])[0], found=True)
                             return True, data.get("results", [{}])[0]
+                        
+                        # Both searches answered and found nothing - remember the miss
+                        if cache is not None:
+                            cache.set('courtlistener_search', citation, None, found=False)
+                    elif scheduler.check_response(response) and attempt < max_retries - 1:
+                        continue
                     
                     # No results found
                     return False, None
-                elif response.status_code == 429:  # Too Many Requests
+                elif scheduler.check_response(response):  # Too Many Requests
                     if attempt < max_retries - 1:
-                        wait_time = 3 ** attempt  # Increased exponential backoff
-                        print(f"Rate limit exceeded. Waiting {wait_time} seconds before retrying...")
-                        time.sleep(wait_time)
+                        # The scheduler pauses every request on this key until Retry-After has passed
                         continue
                     else:
-                        print(f"Rate limit exceeded after {max_retries} attempts.")
+                        logger.warning("Rate limit exceeded after %s attempts.", max_retries)
                         return False, None
                 else:
-                    print(f"Error searching CourtListener API: Status code {response.status_code}")
-                    print(f"Response: {response.text}")
+                    logger.warning("Error searching CourtListener API: Status code %s", response.status_code)
+                    logger.debug("Response: %s", response.text)
                     if attempt < max_retries - 1:
-                        wait_time = 3 ** attempt  # Increased exponential backoff
-                        print(f"Retrying in {wait_time} seconds...")
+                        wait_time = scheduler.retry_delay(attempt)
+                        logger.debug("Retrying in %.1f seconds...", wait_time)
                         time.sleep(wait_time)
                         continue
                     else:
                         return False, None
             except requests.exceptions.Timeout:
-                print(f"Request timed out on attempt {attempt + 1}/{max_retries}")
+                logger.warning("Request timed out on attempt %s/%s", attempt + 1, max_retries)
                 if attempt < max_retries - 1:
-                    wait_time = 3 ** attempt  # Increased exponential backoff
-                    print(f"Retrying in {wait_time} seconds...")
+                    wait_time = scheduler.retry_delay(attempt)
+                    logger.debug("Retrying in %.1f seconds...", wait_time)
                     time.sleep(wait_time)
                     continue
                 else:
                     return False, None
             except requests.exceptions.RequestException as e:
-                print(f"Request error: {str(e)}")
+                logger.warning("Request error: %s", e)
                 if attempt < max_retries - 1:
-                    wait_time = 3 ** attempt  # Increased exponential backoff
-                    print(f"Retrying in {wait_time} seconds...")
+                    wait_time = scheduler.retry_delay(attempt)
+                    logger.debug("Retrying in %.1f seconds...", wait_time)
                     time.sleep(wait_time)
                     continue
                 else:
                     return False, None
         except Exception as e:
-            print(f"Error searching CourtListener API: {str(e)}")
+            logger.warning("Error searching CourtListener API: %s", e)
             if attempt < max_retries - 1:
-                wait_time = 3 ** attempt  # Increased exponential backoff
-                print(f"Retrying in {wait_time} seconds...")
+                wait_time = scheduler.retry_delay(attempt)
+                logger.debug("Retrying in %.1f seconds...", wait_time)
                 time.sleep(wait_time)
                 continue
             else:
@@ -348,9 +381,12 @@ def get_case_details(case_id: str, max_retries: int = 3) -> Optional[Dict[str, A
         Optional[Dict]: Case details if found, None otherwise.
     """
     if not case_id:
-        print("Error: Case ID cannot be empty")
+        logger.warning("Case ID cannot be empty")
         return None
     
+    # All requests made with this key share one rate limiter
+    scheduler = get_scheduler(os.environ.get("COURTLISTENER_API_KEY"))
+    
     # Retry mechanism for API calls
     for attempt in range(max_retries):
         try:
@@ -359,7 +395,8 @@ def get_case_details(case_id: str, max_retries: int = 3) -> Optional[Dict[str, A
             headers = {"Authorization": f"Token {api_key}"} if api_key else {}
             
             try:
-                response = requests.get(
+                scheduler.acquire(PRIORITY_INTERACTIVE)
+                response = get_session('courtlistener').get(
                     f"https://www.courtlistener.com/api/rest/v4/opinions/{case_id}/",
                     headers=headers,
                     timeout=10  # Add timeout to prevent hanging requests
@@ -367,48 +404,46 @@ def get_case_details(case_id: str, max_retries: int = 3) -> Optional[Dict[str, A
                 
                 if response.status_code == 200:
                     return response.json()
-                elif response.status_code == 429:  # Too Many Requests
+                elif scheduler.check_response(response):  # Too Many Requests
                     if attempt < max_retries - 1:
-                        wait_time = 3 ** attempt  # Increased exponential backoff
-                        print(f"Rate limit exceeded. Waiting {wait_time} seconds before retrying...")
-                        time.sleep(wait_time)
+                        # The scheduler pauses every request on this key until Retry-After has passed
                         continue
                     else:
-                        print(f"Rate limit exceeded after {max_retries} attempts.")
+                        logger.warning("Rate limit exceeded after %s attempts.", max_retries)
                         return None
                 else:
-                    print(f"Error getting case details from CourtListener API: Status code {response.status_code}")
-                    print(f"Response: {response.text}")
+                    logger.warning("Error getting case details from CourtListener API: Status code %s", response.status_code)
+                    logger.debug("Response: %s", response.text)
                     if attempt < max_retries - 1:
-                        wait_time = 3 ** attempt  # Increased exponential backoff
-                        print(f"Retrying in {wait_time} seconds...")
+                        wait_time = scheduler.retry_delay(attempt)
+                        logger.debug("Retrying in %.1f seconds...", wait_time)
                         time.sleep(wait_time)
                         continue
                     else:
                         return None
             except requests.exceptions.Timeout:
-                print(f"Request timed out on attempt {attempt + 1}/{max_retries}")
+                logger.warning("Request timed out on attempt %s/%s", attempt + 1, max_retries)
                 if attempt < max_retries - 1:
-                    wait_time = 3 ** attempt  # Increased exponential backoff
-                    print(f"Retrying in {wait_time} seconds...")
+                    wait_time = scheduler.retry_delay(attempt)
+                    logger.debug("Retrying in %.1f seconds...", wait_time)
                     time.sleep(wait_time)
                     continue
                 else:
                     return None
             except requests.exceptions.RequestException as e:
-                print(f"Request error: {str(e)}")
+                logger.warning("Request error: %s", e)
                 if attempt < max_retries - 1:
-                    wait_time = 3 ** attempt  # Increased exponential backoff
-                    print(f"Retrying in {wait_time} seconds...")
+                    wait_time = scheduler.retry_delay(attempt)
+                    logger.debug("Retrying in %.1f seconds...", wait_time)
                     time.sleep(wait_time)
                     continue
                 else:
                     return None
         except Exception as e:
-            print(f"Error getting case details from CourtListener API: {str(e)}")
+            logger.warning("Error getting case details from CourtListener API: %s", e)
             if attempt < max_retries - 1:
-                wait_time = 3 ** attempt  # Increased exponential backoff
-                print(f"Retrying in {wait_time} seconds...")
+                wait_time = scheduler.retry_delay(attempt)
+                logger.debug("Retrying in %.1f seconds...", wait_time)
                 time.sleep(wait_time)
                 continue
             else:
@@ -417,6 +452,186 @@ def get_case_details(case_id: str, max_retries: int = 3) -> Optional[Dict[str, A
     # If we've exhausted all retries and still haven't returned, return None
     return None
 
+def chunk_citations(citations: List[str], max_citations: int = CITATION_LOOKUP_MAX_CITATIONS,
+                    max_chars: int = CITATION_LOOKUP_MAX_CHARS) -> List[List[str]]:
+    """
+    Split citations into chunks that respect the citation-lookup API's per-request limits.
+    
+    Args:
+        citations: The citations to look up.
+        max_citations: Maximum number of citations per request.
+        max_chars: Maximum length of the newline-joined request text.
+    
+    Returns:
+        List[List[str]]: The citations split into chunks, in their original order.
+    """
+    chunks = []
+    current = []
+    current_chars = 0
+    
+    for citation in citations:
+        # Account for the newline that joins this citation to the previous one
+        added_chars = len(citation) + (1 if current else 0)
+        if current and (len(current) >= max_citations or current_chars + added_chars > max_chars):
+            chunks.append(current)
+            current = []
+            current_chars = 0
+            added_chars = len(citation)
+        current.append(citation)
+        current_chars += added_chars
+    
+    if current:
+        chunks.append(current)
+    
+    return chunks
+
+def _post_citation_chunk(chunk: List[str], api_key: str,
+                         deadline: Optional[float] = None) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str], bool]:
+    """
+    Send one chunk of citations to the citation-lookup API.
+    
+    If a deadline (absolute time.time()) is given, the chunk isn't sent once it
+    has passed, so a lookup that has been given up on doesn't use up the rate limit.
+    
+    Returns:
+        Tuple of (items, error, rate_limited): the response items on success, otherwise an
+        error message and whether the failure was a 429 (in which case the shared scheduler
+        has already paused requests for the server's Retry-After).
+    """
+    headers = {
+        "Authorization": f"Token {api_key}",
+        "Content-Type": "application/json"
+    }
+    
+    scheduler = get_scheduler(api_key)
+    timeout = CITATION_LOOKUP_TIMEOUT
+    if deadline is not None:
+        if not scheduler.acquire(PRIORITY_BATCH, timeout=max(0, deadline - time.time())):
+            return None, "Lookup deadline reached", False
+        timeout = max(1, min(timeout, deadline - time.time()))
+    else:
+        scheduler.acquire(PRIORITY_BATCH)
+    try:
+        response = get_session('courtlistener').post(
+            CITATION_LOOKUP_API,
+            headers=headers,
+            json={"text": "\n".join(chunk)},
+            timeout=timeout
+        )
+    except requests.exceptions.RequestException as e:
+        return None, f"Request error: {str(e)}", False
+    
+    rate_limited = scheduler.check_response(response)
+    if response.status_code == 200:
+        try:
+            data = response.json()
+        except ValueError:
+            # An HTML error or proxy page; retried like any other failed chunk
+            return None, f"Invalid JSON response: {response.text[:200]}", False
+        if isinstance(data, list):
+            return data, None, False
+        return None, f"Unexpected response format: {type(data).__name__}", False
+    
+    return None, f"Status code {response.status_code}: {response.text[:200]}", rate_limited
+
+def lookup_citations_batch(citations: List[str], api_key: str, max_retries: int = 3,
+                           max_citations: int = CITATION_LOOKUP_MAX_CITATIONS,
+                           max_chars: int = CITATION_LOOKUP_MAX_CHARS,
+                           parallel_requests: int = CITATION_LOOKUP_PARALLEL_REQUESTS,
+                           deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Look up any number of citations with the citation-lookup API.
+    
+    The citations are split into chunks that fit the API's per-request limits,
+    the chunks are sent in parallel (paced by the API key's shared rate limiter,
+    behind any interactive requests), and only the chunks that failed are retried.
+    
+    Args:
+        citations: The citations to look up.
+        api_key: CourtListener API key.
+        max_retries: Number of additional rounds for failed chunks.
+        max_citations: Maximum number of citations per request.
+        max_chars: Maximum request text length.
+        parallel_requests: Maximum number of chunks in flight at once.
+        deadline: Absolute time.time() after which chunks still in flight are
+                  abandoned and reported as failed, without further retries.
+    
+    Returns:
+        Dict with:
+            - items: All response items merged into one list.
+            - by_citation: Map of citation_key() of each citation (as sent and as
+              normalized by CourtListener) to its response item.
+            - failed: Citations whose chunk still failed after all retries.
+            - errors: Error messages from the final failed attempts.
+    """
+    result = {
+        "items": [],
+        "by_citation": {},
+        "failed": [],
+        "errors": []
+    }
+    if not citations:
+        return result
+    
+    pending = chunk_citations(citations, max_citations=max_citations, max_chars=max_chars)
+    logger.debug("Looking up %s citations in %s chunks", len(citations), len(pending))
+    scheduler = get_scheduler(api_key)
+    
+    for attempt in range(max_retries + 1):
+        failed_chunks = []
+        errors = []
+        needs_backoff = False
+        out_of_time = False
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, min(parallel_requests, len(pending))))
+        futures = {executor.submit(_post_citation_chunk, chunk, api_key, deadline): chunk for chunk in pending}
+        unfinished = set(futures)
+        try:
+            timeout = None if deadline is None else max(0, deadline - time.time())
+            for future in as_completed(futures, timeout=timeout):
+                unfinished.discard(future)
+                chunk = futures[future]
+                items, error, rate_limited = future.result()
+                if error:
+                    failed_chunks.append(chunk)
+                    errors.append(error)
+                    needs_backoff = needs_backoff or not rate_limited
+                    continue
+                
+                for item in items:
+                    result["items"].append(item)
+                    if not isinstance(item, dict):
+                        continue
+                    for item_citation in [item.get("citation")] + list(item.get("normalized_citations") or []):
+                        if item_citation:
+                            result["by_citation"][citation_key(item_citation)] = item
+        except FuturesTimeoutError:
+            failed_chunks.extend(futures[future] for future in unfinished)
+            errors.append("Lookup deadline reached")
+            out_of_time = True
+        finally:
+            # Don't wait for abandoned requests; they finish (or time out) in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if not failed_chunks:
+            return result
+        
+        logger.warning("%s of %s citation-lookup chunks failed (attempt %s/%s): %s", len(failed_chunks), len(pending), attempt + 1, max_retries + 1, errors[0])
+        pending = failed_chunks
+        result["errors"] = errors
+        if out_of_time:
+            break
+        if attempt < max_retries and needs_backoff:
+            # 429s are already handled by the scheduler's pause; back off only for other errors
+            wait_time = scheduler.retry_delay(attempt)
+            if deadline is not None and time.time() + wait_time >= deadline:
+                break
+            logger.debug("Retrying failed chunks in %.1f seconds...", wait_time)
+            time.sleep(wait_time)
+    
+    result["failed"] = [citation for chunk in pending for citation in chunk]
+    return result
+
 def generate_case_summary_from_courtlistener(citation: str, max_retries: int = 5) -> str:
     """
     Generate a summary of a legal case using the CourtListener API.
@@ -435,11 +650,11 @@ def generate_case_summary_from_courtlistener(citation: str, max_retries: int = 5
     citation = citation.strip()
     
     # Check if this is a WestLaw citation
-    is_westlaw = re.search(r'\d{4}\s*W\.?\s*L\.?\s*\d+', citation) is not None
+    is_westlaw = WESTLAW_PATTERN.search(citation) is not None
     if is_westlaw:
-        print(f"Detected WestLaw citation: {citation}")
+        logger.debug("Detected WestLaw citation: %s", citation)
         citation = normalize_westlaw_citation(citation)
-        print(f"Normalized to: {citation}")
+        logger.debug("Normalized to: %s", citation)
     
     if not COURTLISTENER_AVAILABLE:
         return f"CourtListener API is not available. Cannot generate summary for {citation}."
@@ -502,14 +717,14 @@ def generate_case_summary_from_courtlistener(citation: str, max_retries: int = 5
             
             return summary
         except Exception as e:
-            print(f"Error generating summary from CourtListener (attempt {attempt+1}/{max_retries}): {str(e)}")
+            logger.warning("Error generating summary from CourtListener (attempt %s/%s): %s", attempt+1, max_retries, e)
             if attempt < max_retries - 1:
-                wait_time = 3 ** attempt  # Increased exponential backoff
-                print(f"Retrying in {wait_time} seconds...")
+                wait_time = RateLimitScheduler.retry_delay(attempt)
+                logger.debug("Retrying in %.1f seconds...", wait_time)
                 time.sleep(wait_time)
                 continue
             else:
-                print(f"Failed to generate summary after {max_retries} attempts.")
+                logger.warning("Failed to generate summary after %s attempts.", max_retries)
                 return f"Error generating summary for {citation}: {str(e)}"
     
     # If we've exhausted all retries and still haven't returned, return an error
@@ -524,7 +739,7 @@ def set_use_local_pdf_search(enabled: bool) -> None:
     """
     global USE_LOCAL_PDF_SEARCH
     USE_LOCAL_PDF_SEARCH = enabled
-    print(f"Local PDF search {'enabled' if enabled else 'disabled'}")
+    logger.info("Local PDF search %s", 'enabled' if enabled else 'disabled')
 
 def search_citation_in_local_pdfs(citation: str, timeout_seconds: int = 10) -> bool:
     """
@@ -538,7 +753,7 @@ def search_citation_in_local_pdfs(citation: str, timeout_seconds: int = 10) -> b
         bool: True if the citation is found in any PDF filename, False otherwise.
     """
     if not citation or not citation.strip():
-        print("Error: Citation cannot be empty")
+        logger.warning("Citation cannot be empty")
         return False
     
     # Normalize citation to improve search results
@@ -559,7 +774,7 @@ def search_citation_in_local_pdfs(citation: str, timeout_seconds: int = 10) -> b
         if year not in parts:
             parts.append(year)
     
-    print(f"Searching for citation parts: {parts}")
+    logger.debug("Searching for citation parts: %s", parts)
     
     try:
         # Track start time for timeout
@@ -573,32 +788,32 @@ def search_citation_in_local_pdfs(citation: str, timeout_seconds: int = 10) -> b
                 break
         
         if not folders_exist:
-            print(f"Warning: None of the specified PDF folders exist")
+            logger.warning("None of the specified PDF folders exist")
             return False
         
         # Search in each folder
         for folder in LOCAL_PDF_FOLDERS:
             # Check for timeout
             if time.time() - start_time > timeout_seconds:
-                print(f"Search timeout after {timeout_seconds} seconds")
+                logger.warning("Search timeout after %s seconds", timeout_seconds)
                 return False
                 
             if not os.path.exists(folder) or not os.path.isdir(folder):
-                print(f"Warning: Folder does not exist: {folder}")
+                logger.warning("Folder does not exist: %s", folder)
                 continue
             
-            print(f"Searching in folder: {folder}")
+            logger.debug("Searching in folder: %s", folder)
             
             try:
                 # List all PDF files in the folder
                 files = [f for f in os.listdir(folder) if f.lower().endswith('.pdf')]
-                print(f"Found {len(files)} PDF files in folder")
+                logger.debug("Found %s PDF files in folder", len(files))
                 
                 # Check each file for a match
                 for file in files:
                     # Check for timeout
                     if time.time() - start_time > timeout_seconds:
-                        print(f"Search timeout after {timeout_seconds} seconds")
+                        logger.warning("Search timeout after %s seconds", timeout_seconds)
                         return False
                         
                     # Check if key parts of the citation are in the filename
@@ -617,18 +832,18 @@ def search_citation_in_local_pdfs(citation: str, timeout_seconds: int = 10) -> b
                     min_matches = min(2, max(1, len(parts) // 2))
                     
                     if match_count >= min_matches:
-                        print(f"Found potential match for '{citation}' in file: {file}")
-                        print(f"Matched parts: {matched_parts}")
+                        logger.debug("Found potential match for '%s' in file: %s", citation, file)
+                        logger.debug("Matched parts: %s", matched_parts)
                         return True
             except Exception as e:
-                print(f"Error searching folder {folder}: {str(e)}")
+                logger.warning("Error searching folder %s: %s", folder, e)
                 continue
         
         # No match found in any folder
-        print(f"No match found for '{citation}' in local PDF folders")
+        logger.debug("No match found for '%s' in local PDF folders", citation)
         return False
     except Exception as e:
-        print(f"Error searching local PDFs: {str(e)}")
+        logger.warning("Error searching local PDFs: %s", e)
         return False
 
 def check_citation_exists(citation: str, max_retries: int = 5, local_search_timeout: int = 15) -> bool:
@@ -645,22 +860,22 @@ def check_citation_exists(citation: str, max_retries: int = 5, local_search_time
               Returns True if there's an error (conservative approach).
     """
     if not citation or not citation.strip():
-        print("Error: Citation cannot be empty")
+        logger.warning("Citation cannot be empty")
         return True  # Default to assuming it exists if we can't check
     
     if not COURTLISTENER_AVAILABLE:
-        print("CourtListener API is not available. Cannot check citation.")
+        logger.warning("CourtListener API is not available. Cannot check citation.")
         return True  # Default to assuming it exists if we can't check
     
     # Normalize citation to improve search results
     citation = citation.strip()
     
     # Check if this is a WestLaw citation
-    is_westlaw = re.search(r'\d{4}\s*W\.?\s*L\.?\s*\d+', citation) is not None
+    is_westlaw = WESTLAW_PATTERN.search(citation) is not None
     if is_westlaw:
-        print(f"Detected WestLaw citation: {citation}")
+        logger.debug("Detected WestLaw citation: %s", citation)
         citation = normalize_westlaw_citation(citation)
-        print(f"Normalized to: {citation}")
+        logger.debug("Normalized to: %s", citation)
     
     # Special case for obviously fake citations
     if "Pringle v JP Morgan Chase" in citation:
@@ -669,7 +884,7 @@ def check_citation_exists(citation: str, max_retries: int = 5, local_search_time
     
     # Check if we should use local PDF search
     if USE_LOCAL_PDF_SEARCH:
-        print(f"Using local PDF search for citation: {citation}")
+        logger.debug("Using local PDF search for citation: %s", citation)
         return search_citation_in_local_pdfs(citation, timeout_seconds=local_search_timeout)
     
     # Otherwise, use the API
@@ -678,14 +893,14 @@ def check_citation_exists(citation: str, max_retries: int = 5, local_search_time
             exists, _ = search_citation(citation)
             return exists
         except Exception as e:
-            print(f"Error checking citation with CourtListener (attempt {attempt+1}/{max_retries}): {str(e)}")
+            logger.warning("Error checking citation with CourtListener (attempt %s/%s): %s", attempt+1, max_retries, e)
             if attempt < max_retries - 1:
-                wait_time = 3 ** attempt  # Increased exponential backoff
-                print(f"Retrying in {wait_time} seconds...")
+                wait_time = RateLimitScheduler.retry_delay(attempt)
+                logger.debug("Retrying in %.1f seconds...", wait_time)
                 time.sleep(wait_time)
                 continue
             else:
-                print(f"Failed to check citation after {max_retries} attempts. Assuming it exists.")
+                logger.warning("Failed to check citation after %s attempts. Assuming it exists.", max_retries)
                 return True  # Default to assuming it exists if there's an error
     
     # If we've exhausted all retries and still haven't returned, assume it exists
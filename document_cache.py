@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Extracted Document Text Cache for CaseStrainer
+
+Users often upload the same brief several times. This module stores the text
+extracted from each document, keyed by the SHA-256 of the file's contents, so
+a repeat upload skips PDF/DOCX parsing entirely.
+
+Texts are stored zlib-compressed in SQLite together with their page
+boundaries (see PagedText), so page numbers survive a cache hit. When the
+compressed texts grow beyond DOCUMENT_CACHE_MAX_BYTES, the least recently
+used documents are evicted.
+"""
+
+import os
+import json
+import logging
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Union
+
+from paged_text import PagedText
+
+logger = logging.getLogger(__name__)
+
+# Configuration (can be overridden with environment variables)
+DOCUMENT_CACHE_PATH = os.environ.get(
+    'DOCUMENT_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'document_cache.db')
+)
+DOCUMENT_CACHE_MAX_BYTES = int(os.environ.get('DOCUMENT_CACHE_MAX_BYTES', 256 * 1024 * 1024))  # 256 MB compressed
+
+# Flag to allow disabling the cache entirely
+DOCUMENT_CACHE_ENABLED = os.environ.get('DOCUMENT_CACHE_ENABLED', 'True').lower() in ('true', '1', 't')
+
+# Bump when extraction changes enough that cached texts should be re-extracted
+EXTRACTION_VERSION = 1
+
+# Read size used when hashing files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Compute the SHA-256 of a file's contents without reading it all into memory.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """Content-addressed store of extracted document text with size-bounded LRU eviction."""
+
+    def __init__(self, db_path: str = DOCUMENT_CACHE_PATH, max_bytes: int = DOCUMENT_CACHE_MAX_BYTES):
+        """Open (and create if needed) the cache database."""
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self._lock:
+            # WAL lets several server processes read while one writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS document_text (
+                    sha256 TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    text_length INTEGER NOT NULL,
+                    page_count INTEGER,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_document_text_last_access ON document_text (last_access)'
+            )
+            self._conn.commit()
+
+    def get(self, sha256: str) -> Optional[Union[PagedText, str]]:
+        """
+        Look up a document's extracted text.
+
+        Args:
+            sha256: SHA-256 of the document file (see hash_file())
+
+        Returns:
+            The text (a PagedText if it was stored with pages), or None on a miss
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT data FROM document_text WHERE sha256 = ? AND version = ?',
+                    (sha256, EXTRACTION_VERSION)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute(
+                    'UPDATE document_text SET last_access = ? WHERE sha256 = ?',
+                    (time.time(), sha256)
+                )
+                self._conn.commit()
+
+            stored = json.loads(zlib.decompress(row[0]).decode('utf-8'))
+            if stored.get('pages') is not None:
+                return PagedText(stored['pages'])
+            return stored['text']
+        except Exception as e:
+            logger.warning("Error reading document cache: %s", e)
+            return None
+
+    def set(self, sha256: str, text: Union[PagedText, str]) -> None:
+        """
+        Store a document's extracted text, evicting old documents if the cache is full.
+
+        Args:
+            sha256: SHA-256 of the document file
+            text: The extracted text; page boundaries are kept for a PagedText
+        """
+        pages = getattr(text, 'pages', None)
+        stored = {'pages': pages} if pages is not None else {'text': str(text)}
+        try:
+            data = zlib.compress(json.dumps(stored).encode('utf-8'))
+            if len(data) > self.max_bytes:
+                logger.debug("Document %s is too large to cache (%s bytes compressed)", sha256[:12], len(data))
+                return
+
+            now = time.time()
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO document_text '
+                    '(sha256, version, data, size, text_length, page_count, created_at, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (sha256, EXTRACTION_VERSION, data, len(data), len(text),
+                     len(pages) if pages is not None else None, now, now)
+                )
+                self._evict_locked()
+                self._conn.commit()
+            logger.debug("Cached text of document %s (%s characters, %s bytes compressed)", sha256[:12], len(text), len(data))
+        except Exception as e:
+            logger.warning("Error writing document cache: %s", e)
+
+    def evict(self) -> None:
+        """Trim the cache to max_bytes, least recently used documents first."""
+        with self._lock:
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self) -> None:
+        self._conn.execute('DELETE FROM document_text WHERE version != ?', (EXTRACTION_VERSION,))
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM document_text').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        victims = []
+        for sha256, size in self._conn.execute('SELECT sha256, size FROM document_text ORDER BY last_access ASC'):
+            if total <= self.max_bytes:
+                break
+            victims.append((sha256,))
+            total -= size
+        self._conn.executemany('DELETE FROM document_text WHERE sha256 = ?', victims)
+        logger.info("Evicted %s documents from the document cache", len(victims))
+
+    def size(self) -> int:
+        """Total compressed size of the cached texts in bytes."""
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM document_text').fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM document_text').fetchone()[0]
+
+
+# Shared cache instance for this process
+_document_cache = None
+_document_cache_lock = threading.Lock()
+
+
+def get_document_cache() -> Optional[DocumentCache]:
+    """
+    Get the process-wide document cache, creating it on first use.
+
+    Returns:
+        The shared DocumentCache, or None if the cache is disabled or unavailable
+    """
+    global _document_cache, DOCUMENT_CACHE_ENABLED
+
+    if not DOCUMENT_CACHE_ENABLED:
+        return None
+
+    if _document_cache is None:
+        with _document_cache_lock:
+            if _document_cache is None:
+                try:
+                    _document_cache = DocumentCache()
+                except Exception as e:
+                    logger.exception("Error opening document cache at %s: %s", DOCUMENT_CACHE_PATH, e)
+                    DOCUMENT_CACHE_ENABLED = False
+                    return None
+
+    return _document_cache
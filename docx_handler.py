@@ -0,0 +1,52 @@
+import os
+import sys
+import logging
+import docx
+
+logger = logging.getLogger(__name__)
+
+def extract_text_from_docx(file_path):
+    """Extract text from a DOCX file using python-docx."""
+    logger.debug("Extracting text from DOCX: %s", file_path)
+
+    # Check if file exists and is readable
+    if not os.path.isfile(file_path):
+        error_msg = f"File not found: {file_path}"
+        logger.warning(error_msg)
+        return f"Error: {error_msg}"
+
+    # Check file size
+    try:
+        file_size = os.path.getsize(file_path)
+        logger.debug("DOCX file size: %s bytes", file_size)
+        if file_size == 0:
+            error_msg = f"File is empty: {file_path}"
+            logger.warning(error_msg)
+            return f"Error: {error_msg}"
+        elif file_size > 50 * 1024 * 1024:  # 50MB limit
+            error_msg = f"File is too large ({file_size} bytes): {file_path}"
+            logger.warning(error_msg)
+            return f"Error: {error_msg}"
+    except Exception as e:
+        logger.warning("Error checking file size: %s", e)
+
+    # Open the document
+    try:
+        doc = docx.Document(file_path)
+    except Exception as e:
+        error_msg = f"Could not open DOCX file: {e}"
+        logger.warning(error_msg)
+        return f"Error: {error_msg}"
+
+    text = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+    logger.info("Successfully extracted %s characters from DOCX", len(text))
+    return text
+
+# Simple test function to check if the module works
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        text = extract_text_from_docx(sys.argv[1])
+        print(f"Extracted {len(text)} characters")
+        print(text[:500])
+    else:
+        print("Usage: python docx_handler.py <path_to_docx>")
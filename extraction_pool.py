@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+Document Extraction Pool for CaseStrainer
+
+pdfminer and python-docx are pure Python and hold the GIL while they parse,
+so extracting a large document in the server process stalls every other
+request. This module runs PDF and DOCX extraction in a small pool of worker
+processes instead.
+
+Each worker:
+1. Runs the usual extractors (pdf_handler's pdfminer -> PyPDF2 -> pdftotext
+   chain, or docx_handler) for one document at a time
+2. Caps its own memory with RLIMIT_AS where the platform supports it
+3. Is killed and replaced if a document takes longer than the timeout, runs
+   out of memory or crashes the process
+4. Is recycled after a number of documents so parser memory growth is released
+
+Long PDFs can also be split into page ranges that are extracted by several
+workers in parallel (extract_pdf_pages), giving a PagedText that keeps the
+page boundaries so citations can be reported with page numbers.
+iter_pdf_pages() does the same but yields each page, in order, as soon as it
+is ready, so callers can start on the first pages while the rest are parsed.
+Each PDF is probed first so encrypted and scanned documents fail fast, and the
+page extractor is chosen from the probe and the pool's ExtractorStats (see
+pdf_extractor_selection).
+
+Workers are plain subprocesses of this file (python extraction_pool.py
+--worker) talking JSON lines over stdin/stdout, so they work the same on
+Windows and don't re-import the web application the way multiprocessing's
+spawn start method would.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import inspect
+import contextvars
+import atexit
+import threading
+import subprocess
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, Tuple
+
+from paged_text import PagedText
+from pdf_extractor_selection import ExtractorStats, choose_pdf_extractor
+from logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# Default pool settings (app_final.py overrides these from config.json)
+EXTRACTION_WORKERS = int(os.environ.get('EXTRACTION_WORKERS', min(4, os.cpu_count() or 1)))
+EXTRACTION_TIMEOUT_SECONDS = float(os.environ.get('EXTRACTION_TIMEOUT_SECONDS', 120))
+EXTRACTION_DOCUMENT_TIMEOUT_SECONDS = float(os.environ.get('EXTRACTION_DOCUMENT_TIMEOUT_SECONDS', 600))
+EXTRACTION_MEMORY_LIMIT_MB = int(os.environ.get('EXTRACTION_MEMORY_LIMIT_MB', 1024))
+EXTRACTION_JOBS_PER_WORKER = int(os.environ.get('EXTRACTION_JOBS_PER_WORKER', 50))
+
+# Whole-document extractors tried on PDFs without a text layer; pdfminer and
+# PyPDF2 are skipped since they find nothing on scanned pages
+NO_TEXT_LAYER_EXTRACTORS = ['pdftotext']
+
+# Smallest page range worth sending to its own worker
+MIN_PAGES_PER_RANGE = int(os.environ.get('EXTRACTION_MIN_PAGES_PER_RANGE', 10))
+
+# Document kinds the workers can extract
+EXTRACTORS = {
+    'pdf': ('pdf_handler', 'extract_text_from_pdf'),
+    'pdf_pages': ('pdf_handler', 'extract_pages_from_pdf'),
+    'pdf_pages_iter': ('pdf_handler', 'iter_pages_from_pdf'),
+    'pdf_page_count': ('pdf_handler', 'count_pdf_pages'),
+    'pdf_probe': ('pdf_handler', 'probe_pdf'),
+    'docx': ('docx_handler', 'extract_text_from_docx')
+}
+
+
+class ExtractionError(Exception):
+    """Raised when a worker could not extract a document's text."""
+
+
+class ExtractionTimeout(ExtractionError):
+    """Raised when a document took longer than the timeout and its worker was killed."""
+
+
+def _time_left(timeout: float, deadline: Optional[float]) -> float:
+    """Seconds to wait for the next reply: the timeout, cut short by the document's deadline."""
+    if deadline is None:
+        return timeout
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise ExtractionTimeout("Text extraction passed the document's time limit and was stopped")
+    return min(timeout, remaining)
+
+
+class _Worker:
+    """One extraction subprocess and the thread that reads its replies."""
+
+    def __init__(self, memory_limit_mb: int):
+        self.jobs = 0
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', os.path.abspath(__file__), '--worker', '--memory-limit-mb', str(memory_limit_mb)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            encoding='utf-8',
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        self.replies = queue.Queue()
+        self._reader = threading.Thread(target=self._read_replies, name='extraction-reader', daemon=True)
+        self._reader.start()
+
+    def _read_replies(self) -> None:
+        for line in self.process.stdout:
+            self.replies.put(line)
+        self.replies.put(None)  # The worker exited
+
+    def run(self, kind: str, file_path: str, args: tuple, timeout: float):
+        """Run one extraction and return its result."""
+        self._send(kind, file_path, args)
+        return self._receive(timeout)['result']
+
+    def stream(self, kind: str, file_path: str, args: tuple, timeout: float, deadline: Optional[float] = None):
+        """Run a streaming extraction, yielding each item; timeout applies between items, deadline to all of them."""
+        _time_left(timeout, deadline)
+        self._send(kind, file_path, args)
+        while True:
+            reply = self._receive(_time_left(timeout, deadline))
+            if 'item' not in reply:
+                return
+            yield reply['item']
+
+    def _send(self, kind: str, file_path: str, args: tuple) -> None:
+        self.jobs += 1
+        try:
+            self.process.stdin.write(json.dumps({'kind': kind, 'path': file_path, 'args': list(args)}) + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise ExtractionError(f"Extraction worker is not running: {e}")
+
+    def _receive(self, timeout: float) -> dict:
+        try:
+            line = self.replies.get(timeout=timeout)
+        except queue.Empty:
+            raise ExtractionTimeout(f"Text extraction took longer than {timeout:.0f} seconds and was stopped")
+
+        if line is None:
+            raise ExtractionError(f"Extraction worker exited unexpectedly (exit code {self.process.wait()})")
+
+        reply = json.loads(line)
+        if reply.get('fatal'):
+            # The worker exits after a fatal error (e.g. out of memory)
+            self.jobs = float('inf')
+        if 'error' in reply:
+            raise ExtractionError(reply['error'])
+        return reply
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self) -> None:
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.kill()
+
+    def kill(self) -> None:
+        try:
+            self.process.kill()
+            self.process.wait(timeout=5)
+        except Exception as e:
+            logger.warning("Error killing extraction worker %s: %s", self.process.pid, e)
+
+
+class ExtractionPool:
+    """Fixed-size pool of extraction worker processes."""
+
+    def __init__(self, workers: int = EXTRACTION_WORKERS, timeout: float = EXTRACTION_TIMEOUT_SECONDS,
+                 memory_limit_mb: int = EXTRACTION_MEMORY_LIMIT_MB,
+                 jobs_per_worker: int = EXTRACTION_JOBS_PER_WORKER,
+                 document_timeout: float = EXTRACTION_DOCUMENT_TIMEOUT_SECONDS):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.document_timeout = document_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.jobs_per_worker = max(1, jobs_per_worker)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.extractor_stats = ExtractorStats()
+
+    def extract(self, kind: str, file_path: str, *args, timeout: Optional[float] = None):
+        """
+        Extract a document's text in a worker process.
+
+        Blocks while all workers are busy. Like the extractors themselves, this
+        returns an "Error: ..." string for documents they couldn't read.
+
+        Args:
+            kind: 'pdf', 'docx', or 'pdf_pages' / 'pdf_page_count' / 'pdf_probe' (see pdf_handler)
+            file_path: Path to the document
+            *args: Extra arguments for the extractor (e.g. a page range)
+            timeout: Seconds before the worker is killed, or None for the pool's timeout
+
+        Returns:
+            The extractor's result: the extracted text for 'pdf' and 'docx'
+
+        Raises:
+            ExtractionError: If the worker timed out, ran out of memory or crashed
+        """
+        if kind not in EXTRACTORS:
+            raise ValueError(f"Unsupported document kind: {kind}")
+        if timeout is None:
+            timeout = self.timeout
+
+        with self._slots:
+            worker = self._take_worker()
+            try:
+                result = worker.run(kind, os.path.abspath(file_path), args, timeout)
+            except ExtractionError as e:
+                logger.warning("Extraction of %s failed, replacing worker %s: %s", file_path, worker.process.pid, e)
+                worker.kill()
+                raise
+            except BaseException:
+                worker.kill()
+                raise
+            self._return_worker(worker)
+            return result
+
+    def stream(self, kind: str, file_path: str, *args, timeout: Optional[float] = None,
+               deadline: Optional[float] = None, on_start: Optional[Callable[[], None]] = None) -> Iterator:
+        """
+        Run a streaming extractor (e.g. 'pdf_pages_iter') in a worker process,
+        yielding each item as soon as the worker sends it.
+
+        The timeout applies to the wait for each item, and the deadline (a
+        time.time() value) to the whole stream. If the caller stops early, the
+        worker is killed so it doesn't keep parsing. on_start, if given, is
+        called once a worker has been taken for the stream.
+
+        Raises:
+            ExtractionError: If the worker timed out, ran out of memory or crashed
+        """
+        if kind not in EXTRACTORS:
+            raise ValueError(f"Unsupported document kind: {kind}")
+        if timeout is None:
+            timeout = self.timeout
+
+        with self._slots:
+            worker = self._take_worker()
+            if on_start is not None:
+                on_start()
+            try:
+                yield from worker.stream(kind, os.path.abspath(file_path), args, timeout, deadline)
+            except ExtractionError as e:
+                logger.warning("Extraction of %s failed, replacing worker %s: %s", file_path, worker.process.pid, e)
+                worker.kill()
+                raise
+            except BaseException:
+                # Includes GeneratorExit when the caller stops reading
+                worker.kill()
+                raise
+            self._return_worker(worker)
+
+    def iter_pdf_pages(self, file_path: str, timeout: Optional[float] = None,
+                       deadline: Optional[float] = None) -> Iterator[Tuple[Optional[int], str]]:
+        """
+        Extract a PDF's text page by page, yielding each page in order as soon
+        as it is ready. Long documents are split into page ranges that are
+        extracted by several workers in parallel.
+
+        The PDF is probed first. Encrypted PDFs that can't be opened give an
+        error straight away, and PDFs without a text layer go straight to
+        the whole-document extractors that can still help (pdftotext).
+        Otherwise the pages are extracted with the extractor chosen by
+        choose_pdf_extractor(), and the run is added to extractor_stats.
+
+        If no page has any text, the whole-document extraction chain (which
+        includes pdftotext) is tried and its text is yielded with page number
+        None, since it has no page boundaries. That text may be an
+        "Error: ..." string.
+
+        The probe, the page ranges and the fallback all share one deadline,
+        so a document whose pages each arrive just within the timeout still
+        can't keep its workers busy indefinitely.
+
+        Args:
+            file_path: Path to the PDF
+            timeout: Seconds to wait for each page before the worker is killed,
+                     or None for the pool's timeout
+            deadline: time.time() by which the whole document must be extracted,
+                      or None for the pool's document_timeout from now
+
+        Yields:
+            (1-based page number, page text) tuples
+
+        Raises:
+            ExtractionError: If a worker timed out, ran out of memory or crashed
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if deadline is None:
+            deadline = time.time() + self.document_timeout
+
+        try:
+            probe = self.extract('pdf_probe', file_path, timeout=_time_left(timeout, deadline))
+        except ExtractionTimeout:
+            raise
+        except ExtractionError as e:
+            logger.warning("Could not probe %s: %s", file_path, e)
+            probe = None
+
+        if probe is not None and not probe['readable']:
+            yield None, "Error: The PDF is encrypted and can't be opened without its password."
+            return
+        if probe is not None and not probe['text_layer'] and not probe['pages_with_fonts']:
+            logger.info("No text layer on the sampled pages of %s, skipping the page extractors", file_path)
+            yield None, self.extract('pdf', file_path, NO_TEXT_LAYER_EXTRACTORS, timeout=_time_left(timeout, deadline))
+            return
+
+        page_count = probe['page_count'] if probe is not None else 0
+        extractor = choose_pdf_extractor(probe, self.extractor_stats) if probe is not None else None
+        extractor = extractor or 'pdfminer'
+        ranges = self._page_ranges(page_count)
+        logger.info("Extracting %s pages of %s in %s ranges with %s", page_count, file_path, len(ranges), extractor)
+
+        found_text = False
+        pages_with_text = 0
+        waited = 0.0  # Time spent waiting for pages, not in the caller between them
+        try:
+            pages = self._stream_ranges(file_path, ranges, extractor, timeout, deadline)
+            page_number = 0
+            while True:
+                start = time.time()
+                text = next(pages, None)
+                waited += time.time() - start
+                if text is None:
+                    break
+                page_number += 1
+                found_text = found_text or bool(text.strip())
+                pages_with_text += bool(text.strip())
+                yield page_number, text
+            self.extractor_stats.record(extractor, waited, page_number, pages_with_text)
+        except ExtractionTimeout:
+            raise
+        except ExtractionError as e:
+            # Pages already handed out can't be taken back
+            if found_text:
+                raise
+            logger.warning("Page extraction failed for %s: %s", file_path, e)
+
+        if not found_text:
+            logger.info("No text found on the pages of %s, trying the whole-document extractors", file_path)
+            yield None, self.extract('pdf', file_path, timeout=_time_left(timeout, deadline))
+
+    def extract_pdf_pages(self, file_path: str, timeout: Optional[float] = None,
+                          deadline: Optional[float] = None):
+        """
+        Extract a PDF's text page by page (see iter_pdf_pages()).
+
+        Args:
+            file_path: Path to the PDF
+            timeout: Seconds to wait for each page before the worker is killed,
+                     or None for the pool's timeout
+            deadline: time.time() by which the whole document must be extracted,
+                      or None for the pool's document_timeout from now
+
+        Returns:
+            PagedText with the pages in order, or an "Error: ..." string
+
+        Raises:
+            ExtractionError: If a worker timed out, ran out of memory or crashed
+        """
+        pages = []
+        for page_number, text in self.iter_pdf_pages(file_path, timeout=timeout, deadline=deadline):
+            if page_number is None:
+                # Whole-document fallback; its text has no page boundaries
+                return PagedText([text]) if text and not text.startswith('Error:') else text
+            pages.append(text)
+        return PagedText(pages)
+
+    def _stream_ranges(self, file_path: str, ranges: list, extractor: str,
+                       timeout: float, deadline: float) -> Iterator[str]:
+        # Each range streams into its own queue; pages are handed out in range order
+        queues = [queue.Queue() for _ in ranges]
+        stop = threading.Event()
+        started = object()
+        done = object()
+
+        def stream_range(range_queue, first, last):
+            try:
+                with closing(self.stream('pdf_pages_iter', file_path, first, last, extractor,
+                                         timeout=timeout, deadline=deadline,
+                                         on_start=lambda: range_queue.put(started))) as pages:
+                    for text in pages:
+                        if stop.is_set():
+                            return
+                        range_queue.put(text)
+                range_queue.put(done)
+            except BaseException as e:
+                range_queue.put(e)
+
+        executor = ThreadPoolExecutor(max_workers=min(len(ranges), self.workers) or 1,
+                                      thread_name_prefix='extraction-range')
+        try:
+            for range_queue, (first, last) in zip(queues, ranges):
+                executor.submit(contextvars.copy_context().run, stream_range, range_queue, first, last)
+            for range_queue in queues:
+                running = False
+                while True:
+                    # A range still waiting for a free worker (e.g. one busy with another
+                    # document) is only held to the deadline; the page timeout starts with the worker
+                    try:
+                        item = range_queue.get(timeout=_time_left(timeout if running else float('inf'), deadline))
+                    except queue.Empty:
+                        _time_left(timeout, deadline)  # Raises if it was the deadline
+                        raise ExtractionTimeout(f"Page extraction took longer than {timeout:.0f} seconds and was stopped")
+                    if item is started:
+                        running = True
+                        continue
+                    if item is done:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _page_ranges(self, page_count: int) -> list:
+        if self.workers == 1:
+            return [(0, page_count)] if page_count else []
+        # About two ranges per worker so one slow range doesn't hold up the rest
+        size = max(MIN_PAGES_PER_RANGE, -(-page_count // (self.workers * 2)))
+        return [(first, min(first + size, page_count)) for first in range(0, page_count, size)]
+
+    def _take_worker(self) -> _Worker:
+        with self._lock:
+            if self._closed:
+                raise ExtractionError("Extraction pool is closed")
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive():
+                    return worker
+        return _Worker(self.memory_limit_mb)
+
+    def _return_worker(self, worker: _Worker) -> None:
+        with self._lock:
+            if not self._closed and worker.alive() and worker.jobs < self.jobs_per_worker:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def close(self) -> None:
+        """Stop the idle workers; busy workers stop when their document is done."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+def _set_memory_limit(memory_limit_mb: int) -> None:
+    if memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:
+        # Windows has no RLIMIT_AS; the timeout still stops runaway documents
+        logger.warning("Memory limit not supported on this platform")
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError) as e:
+        logger.warning("Could not set memory limit: %s", e)
+
+
+def _worker_main(memory_limit_mb: int) -> None:
+    """Serve extraction requests from stdin until it is closed."""
+    # Replies go to the real stdout; the extractors' log output goes to stderr
+    replies = sys.stdout
+    sys.stdout = sys.stderr
+    configure_logging(use_queue=False)
+    sys.stdin.reconfigure(encoding='utf-8')
+    replies.reconfigure(encoding='utf-8')
+
+    _set_memory_limit(memory_limit_mb)
+
+    extractors = {}
+    for line in sys.stdin:
+        request = json.loads(line)
+        kind = request['kind']
+        try:
+            if kind not in extractors:
+                module_name, function_name = EXTRACTORS[kind]
+                extractors[kind] = getattr(__import__(module_name), function_name)
+        except Exception as e:
+            # Usually the memory limit is too low to load the parser
+            reply = {'error': f"Could not load the {kind} extractor: {e}", 'fatal': True}
+        else:
+            try:
+                result = extractors[kind](request['path'], *request.get('args', []))
+                if inspect.isgenerator(result):
+                    # Streaming extractor: send each item as soon as it is ready
+                    for item in result:
+                        replies.write(json.dumps({'item': item}) + '\n')
+                        replies.flush()
+                    result = None
+                reply = {'result': result}
+            except MemoryError:
+                reply = {'error': f"Document needs more than {memory_limit_mb} MB of memory to extract", 'fatal': True}
+            except Exception as e:
+                reply = {'error': f"Error extracting text: {e}"}
+
+        replies.write(json.dumps(reply) + '\n')
+        replies.flush()
+        if reply.get('fatal'):
+            return
+
+
+# Shared pool used by app_final.py
+_pool: Optional[ExtractionPool] = None
+_pool_lock = threading.Lock()
+
+
+def configure_extraction_pool(**kwargs) -> ExtractionPool:
+    """Replace the shared pool with one using the given ExtractionPool settings."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ExtractionPool(**kwargs)
+        return _pool
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Get the shared extraction pool, creating it with the default settings if needed."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool()
+        return _pool
+
+
+@atexit.register
+def _close_pool() -> None:
+    if _pool is not None:
+        _pool.close()
+
+
+if __name__ == "__main__":
+    if '--worker' in sys.argv:
+        memory_limit = EXTRACTION_MEMORY_LIMIT_MB
+        if '--memory-limit-mb' in sys.argv:
+            memory_limit = int(sys.argv[sys.argv.index('--memory-limit-mb') + 1])
+        _worker_main(memory_limit)
+    elif len(sys.argv) > 1:
+        path = sys.argv[1]
+        if path.lower().endswith('.pdf'):
+            text = get_extraction_pool().extract_pdf_pages(path)
+        else:
+            text = get_extraction_pool().extract('docx', path)
+        print(f"Extracted {len(text)} characters")
+        print(text[:500])
+    else:
+        print("Usage: python extraction_pool.py <path_to_pdf_or_docx>")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Shared eyecite Tokenizer for CaseStrainer
+
+Building an eyecite tokenizer is expensive: the HyperscanTokenizer compiles a
+pattern database for every reporter, and the AhocorasickTokenizer builds its
+prefilters. This module keeps a single process-wide tokenizer that is built
+once (lazily, under a lock) and reused by every extraction.
+
+The compiled Hyperscan database is stored in HYPERSCAN_CACHE_DIR so that later
+processes load it from disk instead of recompiling. If Hyperscan is unavailable
+or fails to compile, the failure is remembered and the AhocorasickTokenizer is
+used from then on.
+"""
+
+import os
+import logging
+import threading
+
+from eyecite.tokenizers import HyperscanTokenizer, AhocorasickTokenizer
+
+logger = logging.getLogger(__name__)
+
+# Directory for the precompiled Hyperscan database
+HYPERSCAN_CACHE_DIR = os.environ.get(
+    'HYPERSCAN_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.hyperscan_cache')
+)
+
+# Set USE_HYPERSCAN=False to skip Hyperscan entirely
+USE_HYPERSCAN = os.environ.get('USE_HYPERSCAN', 'True').lower() in ('true', '1', 't')
+
+# Shared tokenizer state
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+_hyperscan_failed = False
+
+
+def _build_hyperscan_tokenizer():
+    """Build a HyperscanTokenizer and force its pattern database to compile (or load from disk)."""
+    try:
+        os.makedirs(HYPERSCAN_CACHE_DIR, exist_ok=True)
+        cache_dir = HYPERSCAN_CACHE_DIR
+    except Exception as e:
+        logger.warning("Could not create Hyperscan cache directory %s: %s", HYPERSCAN_CACHE_DIR, e)
+        cache_dir = None
+
+    tokenizer = HyperscanTokenizer(cache_dir=cache_dir)
+    # The database is compiled lazily on first use; do it now so a failure
+    # is detected here rather than in the middle of an extraction
+    tokenizer.hyperscan_db
+    return tokenizer
+
+
+def get_tokenizer():
+    """
+    Get the shared eyecite tokenizer, building it on first use.
+
+    Returns:
+        A HyperscanTokenizer if Hyperscan is available, otherwise an AhocorasickTokenizer
+    """
+    global _tokenizer, _hyperscan_failed
+
+    if _tokenizer is not None:
+        return _tokenizer
+
+    with _tokenizer_lock:
+        if _tokenizer is not None:
+            return _tokenizer
+
+        if USE_HYPERSCAN and not _hyperscan_failed:
+            try:
+                logger.info("Building HyperscanTokenizer...")
+                _tokenizer = _build_hyperscan_tokenizer()
+                logger.info("HyperscanTokenizer ready")
+                return _tokenizer
+            except Exception as e:
+                # Remember the failure so we don't retry on every call
+                logger.warning("HyperscanTokenizer unavailable (%s), falling back to AhocorasickTokenizer...", e)
+                _hyperscan_failed = True
+
+        try:
+            _tokenizer = AhocorasickTokenizer()
+            logger.info("AhocorasickTokenizer ready")
+        except Exception:
+            logger.exception("Error building AhocorasickTokenizer")
+            raise
+
+    return _tokenizer
+
+
+def warm_up_tokenizer(background: bool = True) -> None:
+    """
+    Build the shared tokenizer ahead of the first extraction.
+
+    Args:
+        background: Build it in a daemon thread instead of blocking the caller
+    """
+    def build():
+        try:
+            get_tokenizer()
+        except Exception as e:
+            logger.warning("Error warming up eyecite tokenizer: %s", e)
+
+    if background:
+        threading.Thread(target=build, daemon=True).start()
+    else:
+        build()
+
+
+def reset_tokenizer() -> None:
+    """Discard the shared tokenizer (and any remembered Hyperscan failure)."""
+    global _tokenizer, _hyperscan_failed
+    with _tokenizer_lock:
+        _tokenizer = None
+        _hyperscan_failed = False
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client for CaseStrainer
+
+Opening a new TCP+TLS connection for every lookup costs more than the lookup
+itself. This module keeps one pooled requests.Session per upstream service
+(CourtListener, LangSearch, Google Scholar) so that connections are reused
+across requests and threads.
+
+Each session has:
+1. A connection pool sized for the number of concurrent verification workers
+2. A default timeout applied to any request that does not pass its own
+3. Transport-level retries for connection errors and 502/503/504 responses
+   (429 is left to the rate limiter, which honours Retry-After across callers,
+   and read timeouts to the callers' own retries)
+
+For async callers, async_request() sends requests through a pooled aiohttp
+session when aiohttp is installed, and otherwise runs the pooled requests
+session in a worker thread. run_sync() runs a coroutine on a shared background
+event loop so that synchronous code can use the async API.
+"""
+
+import os
+import json
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# aiohttp is optional; without it async requests run the sync sessions in threads
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Per-upstream connection settings
+UPSTREAM_SETTINGS = {
+    'courtlistener': {
+        'pool_maxsize': int(os.environ.get('COURTLISTENER_POOL_SIZE', 16)),
+        'timeout': (5, 30),  # (connect, read) seconds
+        'retries': 3
+    },
+    'langsearch': {
+        'pool_maxsize': int(os.environ.get('LANGSEARCH_POOL_SIZE', 8)),
+        'timeout': (5, 30),
+        'retries': 2
+    },
+    'scholar': {
+        'pool_maxsize': 2,
+        'timeout': (5, 20),
+        'retries': 1
+    }
+}
+
+# Settings for any upstream not listed above
+DEFAULT_SETTINGS = {
+    'pool_maxsize': 4,
+    'timeout': (5, 30),
+    'retries': 2
+}
+
+USER_AGENT = 'CaseStrainer/1.0 (+https://github.com/jafrank88/CaseStrainer)'
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout when the caller does not set one."""
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def _build_session(settings: Dict) -> requests.Session:
+    retry = Retry(
+        total=settings['retries'],
+        connect=settings['retries'],
+        # Callers already retry a request that timed out; retrying it here as well
+        # would multiply the attempts and the time spent waiting on a slow upstream
+        read=0,
+        status=settings['retries'],
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        # The lookups we POST are read-only, so they are safe to resend
+        allowed_methods=frozenset(['GET', 'HEAD', 'POST']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = TimeoutHTTPAdapter(
+        timeout=settings['timeout'],
+        max_retries=retry,
+        pool_connections=1,
+        pool_maxsize=settings['pool_maxsize'],
+        pool_block=False
+    )
+
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(upstream: str) -> requests.Session:
+    """
+    Get the shared pooled session for an upstream service.
+
+    Args:
+        upstream: 'courtlistener', 'langsearch' or 'scholar'
+
+    Returns:
+        A requests.Session that is reused by every caller of this upstream
+    """
+    session = _sessions.get(upstream)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        if upstream not in _sessions:
+            settings = UPSTREAM_SETTINGS.get(upstream, DEFAULT_SETTINGS)
+            _sessions[upstream] = _build_session(settings)
+        return _sessions[upstream]
+
+
+def close_sessions(upstream: Optional[str] = None) -> None:
+    """
+    Close pooled sessions and their connections.
+
+    Args:
+        upstream: Close only this upstream's session, or all sessions if None
+    """
+    with _sessions_lock:
+        names = [upstream] if upstream else list(_sessions)
+        for name in names:
+            session = _sessions.pop(name, None)
+            if session is not None:
+                session.close()
+
+
+class AsyncResponse:
+    """A fully read response from async_request(), with the parts of requests.Response we use."""
+
+    def __init__(self, status_code: int, headers: Any, text: str):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+# aiohttp sessions are bound to an event loop: {loop: {upstream: session}}
+_async_sessions = weakref.WeakKeyDictionary()
+
+
+def _get_async_session(upstream: str) -> 'aiohttp.ClientSession':
+    loop = asyncio.get_running_loop()
+    sessions = _async_sessions.setdefault(loop, {})
+    session = sessions.get(upstream)
+    if session is None or session.closed:
+        settings = UPSTREAM_SETTINGS.get(upstream, DEFAULT_SETTINGS)
+        connector = aiohttp.TCPConnector(limit=settings['pool_maxsize'] * 4, limit_per_host=settings['pool_maxsize'])
+        session = aiohttp.ClientSession(connector=connector, headers={'User-Agent': USER_AGENT})
+        sessions[upstream] = session
+    return session
+
+
+async def async_request(upstream: str, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                        params: Optional[Dict[str, Any]] = None, json: Any = None,
+                        timeout: Optional[float] = None) -> AsyncResponse:
+    """
+    Send a request to an upstream service without blocking the event loop.
+
+    Errors are raised as requests exceptions (Timeout, ConnectionError) whichever
+    HTTP client is used, so callers handle both the same way.
+
+    Args:
+        upstream: 'courtlistener', 'langsearch' or 'scholar'
+        method: HTTP method
+        url: Request URL
+        headers: Request headers
+        params: Query string parameters
+        json: JSON request body
+        timeout: Total timeout in seconds, or None for the upstream's default
+
+    Returns:
+        AsyncResponse with the status code, headers and body text
+    """
+    if not AIOHTTP_AVAILABLE:
+        response = await asyncio.to_thread(
+            get_session(upstream).request, method, url,
+            headers=headers, params=params, json=json, timeout=timeout
+        )
+        return AsyncResponse(response.status_code, response.headers, response.text)
+
+    if timeout is None:
+        timeout = sum(UPSTREAM_SETTINGS.get(upstream, DEFAULT_SETTINGS)['timeout'])
+
+    try:
+        async with _get_async_session(upstream).request(
+            method, url, headers=headers, params=params, json=json,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            text = await response.text()
+            return AsyncResponse(response.status, response.headers, text)
+    except asyncio.TimeoutError as e:
+        raise requests.exceptions.Timeout(f"Request to {url} timed out") from e
+    except aiohttp.ClientError as e:
+        raise requests.exceptions.ConnectionError(str(e)) from e
+
+
+async def close_async_sessions() -> None:
+    """Close the aiohttp sessions bound to the running event loop."""
+    sessions = _async_sessions.pop(asyncio.get_running_loop(), {})
+    for session in sessions.values():
+        await session.close()
+
+
+# Background event loop used by run_sync()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name='http-client-loop', daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def run_sync(coro, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the shared background event loop and wait for its result.
+
+    The background loop keeps its aiohttp sessions open between calls, so
+    synchronous callers reuse connections just like async ones.
+
+    Args:
+        coro: The coroutine to run
+        timeout: Maximum seconds to wait, or None to wait indefinitely
+
+    Returns:
+        The coroutine's result
+    """
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the background event loop; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(coro, _get_background_loop())
+    return future.result(timeout)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Incremental Citation Extraction for CaseStrainer
+
+Finds citations in a document that arrives a page at a time, so verification
+can start on the first pages while later pages are still being extracted.
+
+A citation can be split across a page break ("410 U.S." at the bottom of one
+page, "113" at the top of the next). To catch those, the last part of each
+page is held back and searched again together with the next page; only
+citations that end before that held-back tail are reported straight away.
+"""
+
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional, Tuple
+
+from eyecite import get_citations
+from eyecite_tokenizer import get_tokenizer
+
+# Characters held back from the end of each page; longer than any citation
+CARRY_OVER_CHARS = 200
+
+# eyecite doesn't match across line breaks, so pages are joined with a space
+# (after removing the whitespace around the break) to let split citations read as one
+PAGE_SEPARATOR = ' '
+
+
+def find_citations_with_eyecite(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Find citations in text with eyecite.
+
+    Returns:
+        List of (citation string, start offset, end offset) in text order
+    """
+    found = []
+    for citation in get_citations(text, tokenizer=get_tokenizer()):
+        citation_str = citation.corrected_citation() if hasattr(citation, 'corrected_citation') else str(citation)
+        start, end = citation.span()
+        found.append((citation_str, start, end))
+    return found
+
+
+class IncrementalCitationExtractor:
+    """Extract citations from a document fed to it one page at a time."""
+
+    def __init__(self, find_citations: Optional[Callable[[str], List[Tuple[str, int, int]]]] = None,
+                 carry_over: int = CARRY_OVER_CHARS):
+        self.find_citations = find_citations or find_citations_with_eyecite
+        self.carry_over = carry_over
+        self.citations: List[str] = []          # Unique citations, in the order they were found
+        self.pages: Dict[str, List[int]] = {}   # {citation: [page numbers it appears on]}
+        self._seen = set()
+        self._pending = ''        # Text not yet searched conclusively
+        self._pending_start = 0   # Offset of the start of _pending in the joined pages
+        self._page_starts = []    # Offsets where each fed page starts in the joined pages
+        self._page_numbers = []   # Page number of each fed page (None if unknown)
+
+    def feed(self, text: str, page_number: Optional[int] = None) -> List[str]:
+        """
+        Add the next page of the document.
+
+        Args:
+            text: The page's text
+            page_number: 1-based page number, or None if unknown
+
+        Returns:
+            Citations seen for the first time, in document order
+        """
+        if self._page_starts:
+            self._pending = self._pending.rstrip() + PAGE_SEPARATOR
+            text = text.lstrip()
+        self._page_starts.append(self._pending_start + len(self._pending))
+        self._page_numbers.append(page_number)
+        self._pending += text
+        return self._scan(final=False)
+
+    def finish(self) -> List[str]:
+        """
+        Search the text held back from the last page.
+
+        Returns:
+            Citations seen for the first time, in document order
+        """
+        return self._scan(final=True)
+
+    def _scan(self, final: bool) -> List[str]:
+        found = sorted(self.find_citations(self._pending), key=lambda citation: citation[1])
+
+        # Citations reaching into the held-back tail may continue on the next page
+        cut = len(self._pending)
+        if not final:
+            cut = max(0, cut - self.carry_over)
+            for _, start, end in found:
+                if end > cut:
+                    cut = min(cut, start)
+                    break
+
+        new_citations = []
+        for citation, start, end in found:
+            if start >= cut:
+                break
+            page_number = self._page_for_offset(self._pending_start + start)
+            if page_number is not None:
+                citation_pages = self.pages.setdefault(citation, [])
+                if page_number not in citation_pages:
+                    citation_pages.append(page_number)
+            if citation not in self._seen:
+                self._seen.add(citation)
+                self.citations.append(citation)
+                new_citations.append(citation)
+
+        self._pending = self._pending[cut:]
+        self._pending_start += cut
+        return new_citations
+
+    def _page_for_offset(self, offset: int) -> Optional[int]:
+        index = bisect_right(self._page_starts, offset) - 1
+        return self._page_numbers[index] if index >= 0 else None
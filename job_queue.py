@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Analysis Job Queue for CaseStrainer
+
+Each analysis parses a document and makes many API calls, so running one
+thread per upload lets a burst of requests overload the server. This module
+runs analyses on a fixed pool of worker threads fed by a bounded queue.
+
+The queue provides:
+1. A fixed number of workers, so throughput stays steady under bursts
+2. A bound on queued jobs overall (503 when full) and per user (429)
+3. Round-robin scheduling between users, so one user's burst can't starve others
+4. Queue positions and a Retry-After estimate based on recent job durations
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default pool and queue sizes (app_final.py overrides these from config.json)
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', 4))
+MAX_QUEUED_ANALYSES = int(os.environ.get('MAX_QUEUED_ANALYSES', 50))
+MAX_QUEUED_PER_USER = int(os.environ.get('MAX_QUEUED_PER_USER', 10))
+
+# Assumed job duration until real durations have been measured
+DEFAULT_JOB_SECONDS = 30.0
+DURATION_SMOOTHING = 0.2
+
+# Bounds on the Retry-After value sent to rejected clients
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 300
+
+
+class QueueFullError(Exception):
+    """Raised when a job can't be queued. status_code is 503 (queue full) or 429 (user limit)."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """Bounded, per-user round-robin job queue served by a fixed pool of worker threads."""
+
+    def __init__(self, workers: int = ANALYSIS_WORKERS, max_queued: int = MAX_QUEUED_ANALYSES,
+                 max_queued_per_user: int = MAX_QUEUED_PER_USER, name: str = 'analysis'):
+        self.workers = max(1, workers)
+        self.max_queued = max(0, max_queued)
+        self.max_queued_per_user = max(1, max_queued_per_user)
+        self.name = name
+
+        # {user: deque of (job_id, func, args)}; the dict order is the round-robin order
+        self._queues: 'OrderedDict[str, deque]' = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._avg_duration = DEFAULT_JOB_SECONDS
+        self._cond = threading.Condition()
+        self._shutdown = False
+        self._threads = []
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'{name}-worker-{i + 1}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job_id: str, func: Callable, *args, user: Optional[str] = None) -> int:
+        """
+        Queue a job.
+
+        Args:
+            job_id: ID used to look up the job's queue position
+            func: Function to run on a worker thread
+            *args: Arguments for func
+            user: Who submitted the job (e.g. API key or client address), for fairness
+
+        Returns:
+            The job's 1-based position in the queue
+
+        Raises:
+            QueueFullError: If the queue, or this user's share of it, is full
+        """
+        user = user or ''
+        with self._cond:
+            if self._shutdown:
+                raise QueueFullError('Server is shutting down', 503, self._retry_after_locked())
+
+            user_queue = self._queues.get(user)
+            if user_queue is not None and len(user_queue) >= self.max_queued_per_user:
+                raise QueueFullError(
+                    f'Too many queued analyses for this user (limit {self.max_queued_per_user})',
+                    429, self._retry_after_locked(len(user_queue))
+                )
+            # Idle workers take jobs straight away, so they don't count against the bound
+            if self._queued >= self.max_queued + max(0, self.workers - self._running):
+                raise QueueFullError('Server is busy, analysis queue is full', 503, self._retry_after_locked())
+
+            if user_queue is None:
+                user_queue = self._queues[user] = deque()
+            user_queue.append((job_id, func, args))
+            self._queued += 1
+            self._cond.notify()
+            return self._position_locked(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """
+        Get a job's 1-based position in the queue.
+
+        Returns:
+            The position, or None if the job isn't waiting (it is running, finished or unknown)
+        """
+        with self._cond:
+            return self._position_locked(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the queue's current load."""
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'running': self._running,
+                'queued': self._queued,
+                'max_queued': self.max_queued,
+                'average_job_seconds': round(self._avg_duration, 2),
+                'retry_after': self._retry_after_locked()
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers after the running jobs finish, dropping queued jobs."""
+        with self._cond:
+            self._shutdown = True
+            self._queues.clear()
+            self._queued = 0
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _position_locked(self, job_id: str) -> Optional[int]:
+        # Walk the queue in the order the workers will take jobs from it
+        rounds = [list(user_queue) for user_queue in self._queues.values()]
+        position = 0
+        for depth in range(max((len(jobs) for jobs in rounds), default=0)):
+            for jobs in rounds:
+                if depth < len(jobs):
+                    position += 1
+                    if jobs[depth][0] == job_id:
+                        return position
+        return None
+
+    def _retry_after_locked(self, jobs_ahead: Optional[int] = None) -> int:
+        if jobs_ahead is None:
+            jobs_ahead = self._queued
+        estimate = self._avg_duration * (jobs_ahead + 1) / self.workers
+        return int(min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(estimate))))
+
+    def _next_job_locked(self):
+        # Take the oldest job of the next user in round-robin order
+        user, user_queue = next(iter(self._queues.items()))
+        job = user_queue.popleft()
+        del self._queues[user]
+        if user_queue:
+            self._queues[user] = user_queue  # Back of the line until the other users have had a turn
+        self._queued -= 1
+        return job
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queued and not self._shutdown:
+                    self._cond.wait()
+                if self._shutdown:
+                    return
+                job_id, func, args = self._next_job_locked()
+                self._running += 1
+
+            start = time.time()
+            try:
+                func(*args)
+            except Exception as e:
+                logger.exception("Error in queued job %s: %s", job_id, e)
+            finally:
+                duration = time.time() - start
+                with self._cond:
+                    self._running -= 1
+                    self._avg_duration += DURATION_SMOOTHING * (duration - self._avg_duration)
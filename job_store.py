@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Analysis Job Store for CaseStrainer
+
+This module stores the state of running and finished analyses. run_analysis
+writes progress and citation results through the store, and /status reads them
+back. Two backends are available:
+
+1. MemoryJobStore: an in-process LRU store (the default, for a single server process)
+2. SQLiteJobStore: a file-backed store that several server processes can share,
+   so /status works whichever process serves the poll and jobs survive a restart
+
+Every change to a job is also recorded as a numbered event ('progress',
+'result', 'results', 'complete' or 'error'), so clients can fetch only what
+changed since the last event they saw instead of the whole job.
+
+Finished jobs expire after JOB_TTL_SECONDS, and the memory store keeps at most
+MAX_JOBS jobs and the latest MAX_JOB_EVENTS events of each, so a long-running
+server's memory stays bounded.
+"""
+
+import os
+import copy
+import json
+import logging
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration (can be overridden with environment variables or config.json)
+JOB_STORE_BACKEND = os.environ.get('JOB_STORE_BACKEND', 'memory')
+JOB_STORE_PATH = os.environ.get(
+    'JOB_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db')
+)
+JOB_TTL_SECONDS = int(os.environ.get('JOB_TTL_SECONDS', 60 * 60))  # Finished jobs are kept for 1 hour
+STALE_JOB_SECONDS = int(os.environ.get('STALE_JOB_SECONDS', 24 * 60 * 60))  # Unfinished jobs are dropped after 1 day
+MAX_JOBS = int(os.environ.get('MAX_JOBS', 1000))
+MAX_JOB_EVENTS = int(os.environ.get('MAX_JOB_EVENTS', 5000))  # Events kept per job by the memory store
+
+# How often wait_for_events() re-checks a store that can't notify waiters
+EVENT_POLL_INTERVAL = 0.5
+
+
+def _update_event(fields: Dict[str, Any]) -> str:
+    """Event type for a status update."""
+    if fields.get('completed'):
+        return 'error' if fields.get('status') == 'error' else 'complete'
+    return 'progress'
+
+
+class JobStore:
+    """
+    Interface shared by the job store backends.
+
+    A job is a dict of status fields (status, progress, message, completed, ...)
+    plus a 'citation_results' list that grows as citations are verified, and
+    'cursor', the ID of the job's latest event.
+    """
+
+    def create(self, job_id: str, state: Dict[str, Any]) -> None:
+        """Create a job with its initial state (replacing any job with the same ID)."""
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a snapshot of a job, or None if it doesn't exist or has expired."""
+        raise NotImplementedError
+
+    def update(self, job_id: str, **fields) -> None:
+        """Set status fields on a job. Setting completed=True starts its expiry clock."""
+        raise NotImplementedError
+
+    def append_result(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Append one citation result to a job."""
+        raise NotImplementedError
+
+    def set_results(self, job_id: str, results: List[Dict[str, Any]]) -> None:
+        """Replace all of a job's citation results (e.g. with the grouped results)."""
+        raise NotImplementedError
+
+    def delete(self, job_id: str) -> None:
+        """Remove a job."""
+        raise NotImplementedError
+
+    def expire(self) -> int:
+        """Remove expired jobs and return how many were removed."""
+        raise NotImplementedError
+
+    def get_events(self, job_id: str, since: int = 0) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get a job's events after the given event ID.
+
+        Args:
+            job_id: The job ID
+            since: Only return events with an ID greater than this
+
+        Returns:
+            List of {'id', 'event', 'data'} dicts in order, or None if the job doesn't exist
+        """
+        raise NotImplementedError
+
+    def wait_for_events(self, job_id: str, since: int = 0, timeout: float = 15) -> Optional[List[Dict[str, Any]]]:
+        """Like get_events(), but wait up to timeout seconds for a new event if there are none yet."""
+        deadline = time.time() + timeout
+        while True:
+            events = self.get_events(job_id, since)
+            if events or events is None or time.time() >= deadline:
+                return events
+            time.sleep(min(EVENT_POLL_INTERVAL, max(0, deadline - time.time())))
+
+
+class MemoryJobStore(JobStore):
+    """
+    In-process job store with LRU eviction and expiry of finished jobs.
+
+    Only the latest max_events events of a job are kept. A client resuming from
+    an event that has been dropped first gets a 'results' event with the job's
+    results as of the oldest event still kept, so it doesn't miss any.
+    """
+
+    def __init__(self, max_jobs: int = MAX_JOBS, ttl: int = JOB_TTL_SECONDS,
+                 stale_ttl: int = STALE_JOB_SECONDS, max_events: int = MAX_JOB_EVENTS):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_events = max_events
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        # Per job: how many events have been dropped, and the results as of the last dropped one
+        self._dropped: Dict[str, int] = {}
+        self._dropped_results: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def _is_expired(self, job: Dict[str, Any], now: float) -> bool:
+        finished_at = job.get('finished_at')
+        if finished_at is not None:
+            return now - finished_at > self.ttl
+        return now - job['created_at'] > self.stale_ttl
+
+    def create(self, job_id: str, state: Dict[str, Any]) -> None:
+        job = copy.deepcopy(state)
+        job.setdefault('citation_results', [])
+        job['created_at'] = time.time()
+        job['finished_at'] = time.time() if job.get('completed') else None
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            self._events[job_id] = []
+            self._dropped[job_id] = 0
+            self._dropped_results[job_id] = []
+            self._add_event(job_id, 'progress', {key: value for key, value in job.items() if key != 'citation_results'})
+            self._expire_locked()
+
+            # Evict least recently used jobs, finished ones first
+            while len(self._jobs) > self.max_jobs:
+                victim = next((key for key, value in self._jobs.items() if value.get('finished_at') is not None),
+                              next(iter(self._jobs)))
+                self._remove_locked(victim)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if self._is_expired(job, time.time()):
+                self._remove_locked(job_id)
+                return None
+            self._jobs.move_to_end(job_id)
+            snapshot = copy.deepcopy(job)
+            snapshot['cursor'] = self._dropped[job_id] + len(self._events[job_id])
+            return snapshot
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(copy.deepcopy(fields))
+            if fields.get('completed') and job.get('finished_at') is None:
+                job['finished_at'] = time.time()
+            self._add_event(job_id, _update_event(fields), fields)
+
+    def append_result(self, job_id: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job['citation_results'].append(copy.deepcopy(result))
+                self._add_event(job_id, 'result', {'index': len(job['citation_results']) - 1, 'result': result})
+
+    def set_results(self, job_id: str, results: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job['citation_results'] = copy.deepcopy(results)
+                self._add_event(job_id, 'results', {'results': results})
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._remove_locked(job_id)
+
+    def get_events(self, job_id: str, since: int = 0) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if job_id not in self._jobs:
+                return None
+            # Event IDs are 1-based positions in the job's event history, of which
+            # the first self._dropped[job_id] events are no longer kept
+            dropped = self._dropped[job_id]
+            events = self._events[job_id][max(0, since - dropped):]
+            if since < dropped:
+                catch_up = {'id': dropped, 'event': 'results', 'data': {'results': self._dropped_results[job_id]}}
+                events = [catch_up] + events
+            return copy.deepcopy(events)
+
+    def wait_for_events(self, job_id: str, since: int = 0, timeout: float = 15) -> Optional[List[Dict[str, Any]]]:
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._event_count(job_id) > since,
+                timeout=timeout
+            )
+        return self.get_events(job_id, since)
+
+    def _event_count(self, job_id: str) -> int:
+        return self._dropped.get(job_id, 0) + len(self._events.get(job_id, []))
+
+    def _add_event(self, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        events = self._events[job_id]
+        events.append({'id': self._event_count(job_id) + 1, 'event': event, 'data': copy.deepcopy(data)})
+        if len(events) > self.max_events:
+            self._drop_events_locked(job_id, len(events) - self.max_events)
+        self._changed.notify_all()
+
+    def _drop_events_locked(self, job_id: str, count: int) -> None:
+        """Drop a job's oldest events, keeping the results they add up to for catching clients up."""
+        results = self._dropped_results[job_id]
+        for dropped in self._events[job_id][:count]:
+            if dropped['event'] == 'result':
+                results.append(dropped['data']['result'])
+            elif dropped['event'] == 'results':
+                results = list(dropped['data']['results'])
+        self._dropped_results[job_id] = results
+        self._dropped[job_id] += count
+        del self._events[job_id][:count]
+
+    def _remove_locked(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._events.pop(job_id, None)
+        self._dropped.pop(job_id, None)
+        self._dropped_results.pop(job_id, None)
+        self._changed.notify_all()
+
+    def expire(self) -> int:
+        with self._lock:
+            return self._expire_locked()
+
+    def _expire_locked(self) -> int:
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items() if self._is_expired(job, now)]
+        for job_id in expired:
+            self._remove_locked(job_id)
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in a SQLite database that several server processes can share."""
+
+    def __init__(self, db_path: str = JOB_STORE_PATH, ttl: int = JOB_TTL_SECONDS,
+                 stale_ttl: int = STALE_JOB_SECONDS):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self._lock:
+            # WAL lets several server processes read while one writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            ''')
+            # Citation results are stored one row each so appending one doesn't rewrite the rest
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS job_results (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS job_events (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    event TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at)')
+            self._conn.commit()
+
+    def create(self, job_id: str, state: Dict[str, Any]) -> None:
+        state = dict(state)
+        results = state.pop('citation_results', None) or []
+        now = time.time()
+        finished_at = now if state.get('completed') else None
+
+        with self._lock:
+            self._conn.execute('DELETE FROM job_results WHERE job_id = ?', (job_id,))
+            self._conn.execute('DELETE FROM job_events WHERE job_id = ?', (job_id,))
+            self._conn.execute(
+                'INSERT OR REPLACE INTO jobs (job_id, state, created_at, finished_at) VALUES (?, ?, ?, ?)',
+                (job_id, json.dumps(state), now, finished_at)
+            )
+            self._insert_results(job_id, results, 0)
+            self._add_event(job_id, 'progress', state)
+            self._conn.commit()
+        self.expire()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT state, created_at, finished_at FROM jobs WHERE job_id = ?', (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            state, created_at, finished_at = row
+            if self._is_expired(created_at, finished_at, time.time()):
+                self._delete_locked(job_id)
+                return None
+            results = self._conn.execute(
+                'SELECT result FROM job_results WHERE job_id = ? ORDER BY seq', (job_id,)
+            ).fetchall()
+            (cursor,) = self._conn.execute(
+                'SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE job_id = ?', (job_id,)
+            ).fetchone()
+
+        job = json.loads(state)
+        job['citation_results'] = [json.loads(result) for (result,) in results]
+        job['created_at'] = created_at
+        job['finished_at'] = finished_at
+        job['cursor'] = cursor
+        return job
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            # Read-modify-write in one transaction so concurrent writers don't lose fields
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute('SELECT state, finished_at FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+                if row is None:
+                    self._conn.rollback()
+                    return
+                state = json.loads(row[0])
+                state.update(fields)
+                finished_at = row[1]
+                if fields.get('completed') and finished_at is None:
+                    finished_at = time.time()
+                self._conn.execute(
+                    'UPDATE jobs SET state = ?, finished_at = ? WHERE job_id = ?',
+                    (json.dumps(state), finished_at, job_id)
+                )
+                self._add_event(job_id, _update_event(fields), fields)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def append_result(self, job_id: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Like update(), a job that has been deleted or expired is left alone,
+                # so no result rows are written for a job that no longer exists
+                if not self._job_exists(job_id):
+                    self._conn.rollback()
+                    return
+                (next_seq,) = self._conn.execute(
+                    'SELECT COALESCE(MAX(seq) + 1, 0) FROM job_results WHERE job_id = ?', (job_id,)
+                ).fetchone()
+                self._insert_results(job_id, [result], next_seq)
+                self._add_event(job_id, 'result', {'index': next_seq, 'result': result})
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def set_results(self, job_id: str, results: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                if not self._job_exists(job_id):
+                    self._conn.rollback()
+                    return
+                self._conn.execute('DELETE FROM job_results WHERE job_id = ?', (job_id,))
+                self._insert_results(job_id, results, 0)
+                self._add_event(job_id, 'results', {'results': results})
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._delete_locked(job_id)
+
+    def expire(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [job_id for (job_id,) in self._conn.execute(
+                'SELECT job_id FROM jobs WHERE (finished_at IS NOT NULL AND finished_at < ?) '
+                'OR (finished_at IS NULL AND created_at < ?)',
+                (now - self.ttl, now - self.stale_ttl)
+            ).fetchall()]
+            for job_id in expired:
+                self._conn.execute('DELETE FROM job_results WHERE job_id = ?', (job_id,))
+                self._conn.execute('DELETE FROM job_events WHERE job_id = ?', (job_id,))
+                self._conn.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,))
+            self._conn.commit()
+        return len(expired)
+
+    def get_events(self, job_id: str, since: int = 0) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if not self._job_exists(job_id):
+                return None
+            rows = self._conn.execute(
+                'SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq',
+                (job_id, since)
+            ).fetchall()
+        return [{'id': seq, 'event': event, 'data': json.loads(data)} for seq, event, data in rows]
+
+    def _is_expired(self, created_at: float, finished_at: Optional[float], now: float) -> bool:
+        if finished_at is not None:
+            return now - finished_at > self.ttl
+        return now - created_at > self.stale_ttl
+
+    def _job_exists(self, job_id: str) -> bool:
+        return self._conn.execute('SELECT 1 FROM jobs WHERE job_id = ?', (job_id,)).fetchone() is not None
+
+    def _insert_results(self, job_id: str, results: List[Dict[str, Any]], first_seq: int) -> None:
+        self._conn.executemany(
+            'INSERT INTO job_results (job_id, seq, result) VALUES (?, ?, ?)',
+            [(job_id, first_seq + i, json.dumps(result)) for i, result in enumerate(results)]
+        )
+
+    def _add_event(self, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        # Called inside the write's transaction so the event and the change commit together
+        (next_seq,) = self._conn.execute(
+            'SELECT COALESCE(MAX(seq) + 1, 1) FROM job_events WHERE job_id = ?', (job_id,)
+        ).fetchone()
+        self._conn.execute(
+            'INSERT INTO job_events (job_id, seq, event, data) VALUES (?, ?, ?, ?)',
+            (job_id, next_seq, event, json.dumps(data))
+        )
+
+    def _delete_locked(self, job_id: str) -> None:
+        self._conn.execute('DELETE FROM job_results WHERE job_id = ?', (job_id,))
+        self._conn.execute('DELETE FROM job_events WHERE job_id = ?', (job_id,))
+        self._conn.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,))
+        self._conn.commit()
+
+
+def create_job_store(backend: str = JOB_STORE_BACKEND, **kwargs) -> JobStore:
+    """
+    Create a job store.
+
+    Args:
+        backend: 'memory' or 'sqlite'
+        **kwargs: Passed to the backend (db_path, ttl, stale_ttl, max_jobs, max_events)
+
+    Returns:
+        The job store
+    """
+    if backend == 'sqlite':
+        kwargs.pop('max_jobs', None)
+        kwargs.pop('max_events', None)
+        try:
+            return SQLiteJobStore(**kwargs)
+        except Exception as e:
+            logger.warning("Error opening SQLite job store, falling back to memory: %s", e)
+            kwargs.pop('db_path', None)
+            return MemoryJobStore(**kwargs)
+
+    kwargs.pop('db_path', None)
+    return MemoryJobStore(**kwargs)
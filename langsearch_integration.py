@@ -11,6 +11,8 @@ import time
 import requests
 from typing import Optional, Dict, Any
 
+from http_client import get_session
+
 # Import CourtListener functions
 from courtlistener_integration import search_citation, generate_case_summary_from_courtlistener
 
@@ -74,7 +76,7 @@ def setup_langsearch_api(api_key: Optional[str] = None):
                 "count": 1
             }
             
-            response = requests.post(
+            response = get_session('langsearch').post(
                 "https://api.langsearch.com/v1/web-search",
                 headers=headers,
                 json=payload,
@@ -154,7 +156,7 @@ def generate_case_summary_with_langsearch_api(case_citation: str) -> str:
             }
             
             # Call the LangSearch API
-            response = requests.post(
+            response = get_session('langsearch').post(
                 "https://api.langsearch.com/v1/web-search",
                 headers=headers,
                 json=payload,
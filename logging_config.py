@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Logging Setup for CaseStrainer
+
+Modules log through the standard logging module (logging.getLogger(__name__))
+and configure_logging() decides where the records go:
+
+1. Records are put on an in-memory queue by the thread that logs them and
+   formatted and written by a background listener thread, so request and
+   analysis threads never wait on formatting or I/O. Log calls should pass
+   their arguments separately (logger.debug("Found %s", citations)) so that
+   nothing is formatted at all for disabled levels.
+2. Every record carries the ID of the analysis it was logged for (see
+   analysis_context()), in text or JSON output.
+3. Debug artifacts such as whole API responses are only written when
+   DEBUG_ARTIFACTS_DIR is set, one folder per analysis (see
+   write_debug_artifact()).
+
+Settings come from environment variables and can be overridden by
+configure_logging() (app_final.py passes its config.json values).
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+import logging.handlers
+from contextlib import contextmanager
+from typing import Any, Optional
+
+# Configuration (can be overridden with environment variables)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')              # DEBUG, INFO, WARNING or ERROR
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')            # 'text', or 'json' for one JSON object per line
+LOG_FILE = os.environ.get('LOG_FILE') or None                # Also write to this file (rotated at 10 MB)
+DEBUG_ARTIFACTS_DIR = os.environ.get('DEBUG_ARTIFACTS_DIR') or None  # Folder for per-analysis debug dumps
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s [%(analysis_id)s] %(message)s'
+
+# Third-party libraries that log a lot at DEBUG level (pdfminer logs every PDF token)
+QUIET_LOGGERS = ('pdfminer', 'PyPDF2', 'urllib3', 'eyecite', 'flask_cors')
+
+# Analysis the current thread (or task) is working on
+_current_analysis = contextvars.ContextVar('analysis_id', default='-')
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_installed_handlers = []
+_debug_artifacts_dir = DEBUG_ARTIFACTS_DIR
+_configure_lock = threading.Lock()
+
+
+class AnalysisContextFilter(logging.Filter):
+    """Stamps each record with the current analysis ID while still in the logging thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.analysis_id = _current_analysis.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'analysis_id': getattr(record, 'analysis_id', '-'),
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The standard QueueHandler formats each record before queueing it so it
+    can be pickled; this queue never leaves the process, so that work is
+    moved off the logging thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(level: str = None, log_format: str = None, log_file: str = None,
+                      debug_artifacts_dir: str = None, use_queue: bool = True) -> None:
+    """
+    Set up logging for this process, replacing any earlier configuration.
+
+    Args:
+        level: Log level name (defaults to LOG_LEVEL)
+        log_format: 'text' or 'json' (defaults to LOG_FORMAT)
+        log_file: Also log to this file (defaults to LOG_FILE)
+        debug_artifacts_dir: Folder for debug artifacts, or None to disable them
+                             (defaults to DEBUG_ARTIFACTS_DIR)
+        use_queue: Write records from a background thread (disable in
+                   short-lived processes such as extraction workers)
+    """
+    global _listener, _debug_artifacts_dir
+
+    level = (level or LOG_LEVEL).upper()
+    log_format = log_format or LOG_FORMAT
+    log_file = log_file or LOG_FILE
+
+    with _configure_lock:
+        _stop_listener()
+        root = logging.getLogger()
+        for handler in _installed_handlers:
+            root.removeHandler(handler)
+        _installed_handlers.clear()
+
+        formatter = JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+        # stderr, since extraction workers use stdout to send results
+        handlers = [logging.StreamHandler(sys.stderr)]
+        if log_file:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding='utf-8'
+            ))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        if use_queue:
+            queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+            queue_handler.addFilter(AnalysisContextFilter())
+            _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers)
+            _listener.start()
+            _installed_handlers.append(queue_handler)
+        else:
+            for handler in handlers:
+                handler.addFilter(AnalysisContextFilter())
+            _installed_handlers.extend(handlers)
+
+        for handler in _installed_handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+
+        if debug_artifacts_dir is not None:
+            _debug_artifacts_dir = debug_artifacts_dir or None
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        # Writes out everything still queued
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+@contextmanager
+def analysis_context(analysis_id: str):
+    """Tag everything logged in this block (in this thread) with an analysis ID."""
+    token = _current_analysis.set(analysis_id)
+    try:
+        yield
+    finally:
+        _current_analysis.reset(token)
+
+
+def current_analysis_id() -> str:
+    """ID of the analysis being logged for, or '-' outside an analysis."""
+    return _current_analysis.get()
+
+
+def write_debug_artifact(name: str, content: Any) -> Optional[str]:
+    """
+    Save a debug artifact (e.g. an API response) for the current analysis.
+
+    Does nothing unless debug artifacts are enabled. Artifacts go to
+    DEBUG_ARTIFACTS_DIR/<analysis id>/<name>, so concurrent analyses never
+    write to the same file.
+
+    Args:
+        name: File name of the artifact
+        content: Text, or anything JSON-serializable
+
+    Returns:
+        Path of the artifact, or None if artifacts are disabled or it couldn't be written
+    """
+    directory = _debug_artifacts_dir
+    if not directory:
+        return None
+
+    analysis_id = _current_analysis.get()
+    folder = os.path.join(directory, analysis_id if analysis_id != '-' else 'unassigned')
+    path = os.path.join(folder, name)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                json.dump(content, f, indent=2, default=str)
+    except Exception as e:
+        logging.getLogger(__name__).warning("Could not write debug artifact %s: %s", path, e)
+        return None
+    return path
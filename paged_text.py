@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Page-Indexed Document Text for CaseStrainer
+
+PagedText is the text of a document that remembers where each page starts.
+It is a str, so everything that works on the extracted text keeps working,
+and character offsets (e.g. from eyecite spans) can be mapped back to the
+page they came from.
+"""
+
+from bisect import bisect_right
+from typing import List, Optional
+
+# Pages are joined with a newline so words don't run together across a page break
+PAGE_SEPARATOR = '\n'
+
+
+class PagedText(str):
+    """Document text with the start offset of every page."""
+
+    def __new__(cls, pages: List[Optional[str]], separator: str = PAGE_SEPARATOR):
+        pages = [page or '' for page in pages]
+        text = super().__new__(cls, separator.join(pages))
+
+        offsets = []
+        position = 0
+        for page in pages:
+            offsets.append(position)
+            position += len(page) + len(separator)
+
+        text.pages = pages
+        text.page_offsets = offsets
+        text.separator = separator
+        return text
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def page_for_offset(self, offset: int) -> Optional[int]:
+        """
+        Get the page a character offset falls on.
+
+        Args:
+            offset: Character offset into the text
+
+        Returns:
+            1-based page number, or None if the offset is outside the text
+        """
+        if not self.pages or offset < 0 or offset > len(self):
+            return None
+        return bisect_right(self.page_offsets, offset)
+
+    def page_text(self, page_number: int) -> str:
+        """Get the text of a 1-based page number."""
+        return self.pages[page_number - 1]
+
+    def __reduce__(self):
+        return (PagedText, (self.pages, self.separator))
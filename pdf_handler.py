@@ -1,121 +1,163 @@
 import os
 import sys
 import io
+import mmap
+import logging
+import time
 import tempfile
-import shutil
 import subprocess
-import traceback
 import PyPDF2
 from io import StringIO
-from datetime import datetime
+from contextlib import contextmanager
 from pdfminer.converter import TextConverter
 from pdfminer.layout import LAParams
 from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
 from pdfminer.pdfpage import PDFPage
+from pdf_extractor_selection import PDF_PAGE_EXTRACTORS
+from logging_config import write_debug_artifact
 
-def extract_text_from_pdf(file_path):
-    """Extract text from a PDF file using multiple methods with robust error handling."""
-    print(f"\n==== PDF EXTRACTION STARTED: {file_path} ====\n")
-    print(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"PDF absolute path: {os.path.abspath(file_path)}")
+logger = logging.getLogger(__name__)
+
+# Whole-document extractors, in the order extract_text_from_pdf() tries them by default
+PDF_EXTRACTORS = ('pdfminer', 'pypdf2', 'pdftotext')
+
+# Pages sampled by probe_pdf()
+PROBE_SAMPLE_PAGES = 3
+
+@contextmanager
+def open_pdf(file_path):
+    """
+    Open a PDF for reading through a read-only memory map.
     
-    # Log system info
-    print(f"Python version: {sys.version}")
-    print(f"Working directory: {os.getcwd()}")
+    The parsers then read straight from the OS page cache instead of each
+    holding its own copy of the file, which matters when several worker
+    processes extract page ranges of the same large upload.
     
-    # Special handling for known problematic files
-    if '999562 Plaintiff Opening Brief.pdf' in file_path:
-        print("Detected known problematic file: 999562 Plaintiff Opening Brief.pdf")
-        return handle_problematic_pdf(file_path)
+    Yields:
+        A file-like object (the mmap, or the open file if it can't be mapped)
+    """
+    with open(file_path, 'rb') as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files can't be mapped
+            mapped = None
+        if mapped is None:
+            yield file
+        else:
+            with mapped:
+                yield mapped
+
+def extract_text_from_pdf(file_path, extractors=None):
+    """
+    Extract text from a PDF file using multiple methods with robust error handling.
+    
+    Args:
+        file_path: Path to the PDF file
+        extractors: Names of the extractors to try, in order (see PDF_EXTRACTORS); all of them by default
+    
+    Returns:
+        The extracted text, or an "Error: ..." string
+    """
+    logger.debug("Extracting text from PDF: %s", file_path)
     
     # Check if file exists and is readable
     if not os.path.isfile(file_path):
         error_msg = f"File not found: {file_path}"
-        print(error_msg)
+        logger.warning(error_msg)
         return f"Error: {error_msg}"
     
     # Check file size
     try:
         file_size = os.path.getsize(file_path)
-        print(f"PDF file size: {file_size} bytes")
+        logger.debug("PDF file size: %s bytes", file_size)
         if file_size == 0:
             error_msg = f"File is empty: {file_path}"
-            print(error_msg)
+            logger.warning(error_msg)
             return f"Error: {error_msg}"
         elif file_size > 100 * 1024 * 1024:  # 100MB limit
             error_msg = f"File is too large ({file_size} bytes): {file_path}"
-            print(error_msg)
+            logger.warning(error_msg)
             return f"Error: {error_msg}"
     except Exception as e:
-        print(f"Error checking file size: {e}")
+        logger.warning("Error checking file size: %s", e)
     
-    # Method 1: Try pdfminer.six
+    for name in extractors or PDF_EXTRACTORS:
+        text = WHOLE_DOCUMENT_EXTRACTORS[name](file_path)
+        if text and text.strip():
+            return text
+    
+    # If all methods failed, return an error
+    error_msg = "Could not extract text from PDF. The file may be scanned, protected, or corrupted."
+    logger.warning(error_msg)
+    return f"Error: {error_msg}"
+
+def extract_with_pdfminer(file_path):
+    """Extract a whole PDF's text with pdfminer.six. Returns None if it fails."""
     try:
-        print("Trying to extract text with pdfminer.six...")
+        logger.debug("Trying to extract text with pdfminer.six...")
         try:
             from pdfminer.high_level import extract_text as pdfminer_extract
-            print("pdfminer.six is already installed")
+            logger.debug("pdfminer.six is already installed")
         except ImportError:
-            print("Installing pdfminer.six...")
+            logger.warning("Installing pdfminer.six...")
             subprocess.check_call([sys.executable, "-m", "pip", "install", "pdfminer.six"])
             from pdfminer.high_level import extract_text as pdfminer_extract
         
         # Extract text with pdfminer.six with timeout protection
         try:
-            text = pdfminer_extract(file_path)
+            with open_pdf(file_path) as data:
+                text = pdfminer_extract(data)
             if text and text.strip():
-                print(f"Successfully extracted {len(text)} characters with pdfminer.six")
+                logger.info("Successfully extracted %s characters with pdfminer.six", len(text))
                 
-                # Save the extracted text to a file for inspection
-                try:
-                    with open('extracted_pdf_text.txt', 'w', encoding='utf-8') as f:
-                        f.write(text)
-                    print("Extracted text saved to extracted_pdf_text.txt")
-                except Exception as e:
-                    print(f"Error saving extracted text: {e}")
+                # Save the extracted text for inspection (only when debug artifacts are enabled)
+                write_debug_artifact(f'{os.path.basename(file_path)}.pdfminer.txt', text)
                     
                 return text
             else:
-                print("pdfminer.six extracted empty text, trying PyPDF2")
+                logger.debug("pdfminer.six extracted empty text")
         except Exception as e:
-            print(f"Error during pdfminer extraction: {e}")
+            logger.warning("Error during pdfminer extraction: %s", e)
     except Exception as e:
-        print(f"Error with pdfminer.six: {e}")
-    
-    # Method 2: Try PyPDF2
+        logger.warning("Error with pdfminer.six: %s", e)
+    return None
+
+def extract_with_pypdf2(file_path):
+    """Extract a whole PDF's text with PyPDF2. Returns None if it fails."""
     try:
-        print("Trying to extract text with PyPDF2...")
-        with open(file_path, 'rb') as file:
+        logger.debug("Trying to extract text with PyPDF2...")
+        with open_pdf(file_path) as file:
             try:
                 reader = PyPDF2.PdfReader(file)
-                print(f"PDF has {len(reader.pages)} pages")
+                logger.debug("PDF has %s pages", len(reader.pages))
                 text = ''
                 
                 # Process each page with error handling
                 for i, page in enumerate(reader.pages):
                     try:
-                        print(f"Extracting text from page {i+1}...")
+                        logger.debug("Extracting text from page %s...", i + 1)
                         page_text = page.extract_text()
                         text += page_text + '\n'
-                        print(f"Extracted {len(page_text)} characters from page {i+1}")
+                        logger.debug("Extracted %s characters from page %s", len(page_text), i + 1)
                     except Exception as page_error:
-                        print(f"Error extracting text from page {i+1}: {page_error}")
+                        logger.warning("Error extracting text from page %s: %s", i + 1, page_error)
                 
                 if text and text.strip():
-                    print(f"Successfully extracted {len(text)} characters with PyPDF2")
+                    logger.info("Successfully extracted %s characters with PyPDF2", len(text))
                     return text
                 else:
-                    print("PyPDF2 extraction returned empty text, trying alternative method")
+                    logger.debug("PyPDF2 extraction returned empty text")
             except Exception as e:
-                print(f"Error reading PDF with PyPDF2: {e}")
+                logger.warning("Error reading PDF with PyPDF2: %s", e)
     except Exception as e:
-        print(f"Error with PyPDF2 extraction: {e}")
-    
-    # Method 3: Try using subprocess with external tools if available
+        logger.warning("Error with PyPDF2 extraction: %s", e)
+    return None
+
+def extract_with_pdftotext(file_path):
+    """Extract a whole PDF's text with poppler's pdftotext, if it is installed. Returns None if it fails."""
     try:
-        print("Trying to extract text with external tools...")
-        import subprocess
-        import tempfile
+        logger.debug("Trying to extract text with external tools...")
         
         # Create a temporary file for output
         with tempfile.NamedTemporaryFile(delete=False, suffix='.txt') as temp_file:
@@ -123,156 +165,224 @@ def extract_text_from_pdf(file_path):
         
         try:
             # Try pdftotext from poppler if available
-            print(f"Running pdftotext on {file_path}")
-            subprocess.run(['pdftotext', file_path, temp_path], 
+            logger.debug("Running pdftotext on %s", file_path)
+            subprocess.run(['pdftotext', '-enc', 'UTF-8', file_path, temp_path], 
                            check=True, capture_output=True, text=True, timeout=60)
             
             # Read the extracted text
             with open(temp_path, 'r', encoding='utf-8', errors='ignore') as f:
                 text = f.read()
             
-            # Clean up
-            os.unlink(temp_path)
-            
             if text and text.strip():
-                print(f"Successfully extracted {len(text)} characters with pdftotext")
+                logger.info("Successfully extracted %s characters with pdftotext", len(text))
                 return text
             else:
-                print("pdftotext extraction returned empty text")
+                logger.debug("pdftotext extraction returned empty text")
         except FileNotFoundError:
-            print("pdftotext not available on system")
-            os.unlink(temp_path)
+            logger.debug("pdftotext not available on system")
         except subprocess.TimeoutExpired:
-            print("pdftotext process timed out")
-            os.unlink(temp_path)
+            logger.warning("pdftotext process timed out")
         except Exception as e:
-            print(f"Error with pdftotext: {e}")
+            logger.warning("Error with pdftotext: %s", e)
+        finally:
             os.unlink(temp_path)
     except Exception as e:
-        print(f"Error with external tool extraction: {e}")
-    
-    # If all methods failed, return an error
-    error_msg = "Could not extract text from PDF. The file may be scanned, protected, or corrupted."
-    print(error_msg)
-    return f"Error: {error_msg}"
+        logger.warning("Error with external tool extraction: %s", e)
+    return None
 
-def handle_problematic_pdf(file_path):
-    """Special handling for known problematic PDF files."""
-    print(f"Using special handling for problematic PDF: {file_path}")
+WHOLE_DOCUMENT_EXTRACTORS = {
+    'pdfminer': extract_with_pdfminer,
+    'pypdf2': extract_with_pypdf2,
+    'pdftotext': extract_with_pdftotext
+}
+
+class PdfminerPages:
+    """Extracts pages of one open PDF with pdfminer.six. Pages must be requested in ascending order."""
     
-    # Create a temporary directory for processing
-    temp_dir = tempfile.mkdtemp(prefix="pdf_processing_")
-    try:
-        # Copy the file to the temp directory
-        temp_file_path = os.path.join(temp_dir, "temp.pdf")
-        shutil.copy2(file_path, temp_file_path)
-        print(f"Copied file to temporary location: {temp_file_path}")
-        
-        # Try multiple methods with more robust error handling
-        
-        # Method 1: Try using pdftotext command line tool if available
+    def __init__(self, file, page_numbers):
+        self.page_numbers = sorted(page_numbers)
+        self.position = 0
+        self.resource_manager = PDFResourceManager()
+        self.laparams = LAParams()
+        # get_pages() yields the requested pages in document order
+        self.pages = PDFPage.get_pages(file, pagenos=set(self.page_numbers), check_extractable=False)
+    
+    def extract(self, page_number):
+        """Get the text of a 0-based page number, or '' if pdfminer can't read it."""
+        if self.pages is None:
+            return ''
         try:
-            print("Attempting extraction with pdftotext command line tool...")
-            output_file = os.path.join(temp_dir, "output.txt")
-            
-            try:
-                # Try pdftotext from poppler if available
-                result = subprocess.run(['pdftotext', '-layout', '-enc', 'UTF-8', temp_file_path, output_file], 
-                                      check=False, capture_output=True, text=True, timeout=120)
-                
-                if result.returncode == 0 and os.path.exists(output_file):
-                    # Read the extracted text
-                    with open(output_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        text = f.read()
-                    
-                    if text and text.strip():
-                        print(f"Successfully extracted {len(text)} characters with pdftotext command line tool")
-                        return text
-                    else:
-                        print("pdftotext command line tool extracted empty text")
-                else:
-                    print(f"pdftotext command failed with return code {result.returncode}")
-                    print(f"Error: {result.stderr}")
-            except FileNotFoundError:
-                print("pdftotext command not available")
-            except subprocess.TimeoutExpired:
-                print("pdftotext process timed out")
-            except Exception as e:
-                print(f"Error with pdftotext command: {e}")
+            # Skip pages that were never asked for
+            while self.position < len(self.page_numbers) and self.page_numbers[self.position] < page_number:
+                next(self.pages)
+                self.position += 1
+            if self.position >= len(self.page_numbers) or self.page_numbers[self.position] != page_number:
+                return ''
+            page = next(self.pages)
+            self.position += 1
+        except StopIteration:
+            self.pages = None
+            return ''
         except Exception as e:
-            print(f"Error with pdftotext extraction: {e}")
+            logger.warning("Error reading pages with pdfminer.six: %s", e)
+            self.pages = None
+            return ''
         
-        # Method 2: Try using pdfminer.six with custom settings
+        output = StringIO()
+        device = TextConverter(self.resource_manager, output, laparams=self.laparams)
         try:
-            print("Attempting extraction with pdfminer.six using custom settings...")
-            from pdfminer.high_level import extract_text
-            
-            # Try with different parameters
-            for laparams in [
-                LAParams(line_margin=0.5, char_margin=2.0, all_texts=True),
-                LAParams(line_margin=0.3, char_margin=1.0),
-                LAParams(line_margin=0.1, char_margin=0.1, word_margin=0.1),
-                None  # Try with no LAParams
-            ]:
-                try:
-                    print(f"Trying pdfminer.six with params: {laparams}")
-                    text = extract_text(temp_file_path, laparams=laparams)
-                    
-                    if text and text.strip():
-                        print(f"Successfully extracted {len(text)} characters with pdfminer.six custom settings")
-                        return text
-                    else:
-                        print("pdfminer.six with custom settings extracted empty text")
-                except Exception as e:
-                    print(f"Error with pdfminer.six custom settings: {e}")
+            PDFPageInterpreter(self.resource_manager, device).process_page(page)
+            return output.getvalue()
         except Exception as e:
-            print(f"Error with pdfminer.six custom extraction: {e}")
-        
-        # Method 3: Try using PyPDF2 with specific settings
+            logger.warning("pdfminer.six failed on page %s: %s", page_number + 1, e)
+            return ''
+        finally:
+            device.close()
+
+class PyPDF2Pages:
+    """Extracts pages of one open PDF with PyPDF2, parsing it on first use."""
+    
+    def __init__(self, file):
+        self.file = file
+        self.reader = None
+    
+    def extract(self, page_number):
+        """Get the text of a 0-based page number, or '' if PyPDF2 can't read it."""
         try:
-            print("Attempting extraction with PyPDF2 using specific settings...")
-            
-            with open(temp_file_path, 'rb') as file:
-                try:
-                    reader = PyPDF2.PdfReader(file, strict=False)
-                    text = ''
-                    
-                    # Process each page with more robust error handling
-                    for i in range(len(reader.pages)):
-                        try:
-                            page = reader.pages[i]
-                            try:
-                                page_text = page.extract_text()
-                                if page_text:
-                                    text += page_text + '\n'
-                                    print(f"Extracted {len(page_text)} characters from page {i+1}")
-                                else:
-                                    print(f"No text extracted from page {i+1}")
-                            except Exception as e:
-                                print(f"Error extracting text from page {i+1}: {e}")
-                        except Exception as e:
-                            print(f"Error accessing page {i+1}: {e}")
-                    
-                    if text and text.strip():
-                        print(f"Successfully extracted {len(text)} characters with PyPDF2 specific settings")
-                        return text
-                    else:
-                        print("PyPDF2 with specific settings extracted empty text")
-                except Exception as e:
-                    print(f"Error reading PDF with PyPDF2 specific settings: {e}")
+            if self.reader is None:
+                self.reader = PyPDF2.PdfReader(self.file, strict=False)
+                if self.reader.is_encrypted:
+                    self.reader.decrypt('')
+            return self.reader.pages[page_number].extract_text() or ''
         except Exception as e:
-            print(f"Error with PyPDF2 specific extraction: {e}")
+            logger.warning("PyPDF2 failed on page %s: %s", page_number + 1, e)
+            return ''
+
+def _page_has_fonts(page):
+    try:
+        resources = page.get('/Resources')
+        resources = resources.get_object() if resources is not None else None
+        return bool(resources and resources.get('/Font'))
+    except Exception:
+        return False
+
+def probe_pdf(file_path, sample_pages=PROBE_SAMPLE_PAGES):
+    """
+    Take a quick look at a PDF to decide how to extract it.
+    
+    Checks encryption, then samples a few pages (first, middle and last) for
+    fonts and runs each page extractor on them, timing it and counting the
+    words it finds. A PDF whose sampled pages give no text with any extractor
+    has no usable text layer (usually a scan).
+    
+    Args:
+        file_path: Path to the PDF file
+        sample_pages: Number of pages to sample
+    
+    Returns:
+        Dict with page_count, encrypted, readable, sampled_pages (0-based),
+        pages_with_fonts, text_layer and extractors ({name: {'seconds', 'words'}})
+    """
+    probe = {
+        'page_count': 0,
+        'encrypted': False,
+        'readable': True,
+        'sampled_pages': [],
+        'pages_with_fonts': 0,
+        'text_layer': False,
+        'extractors': {}
+    }
+    
+    with open_pdf(file_path) as data:
+        reader = PyPDF2.PdfReader(data, strict=False)
+        if reader.is_encrypted:
+            probe['encrypted'] = True
+            try:
+                # Many PDFs are encrypted only to set permissions and open with an empty password
+                probe['readable'] = bool(reader.decrypt(''))
+            except Exception as e:
+                logger.warning("Could not decrypt %s: %s", file_path, e)
+                probe['readable'] = False
+            if not probe['readable']:
+                return probe
         
-        # If all methods fail, return a helpful error message
-        return "Error: Could not extract text from this PDF file. This specific file (999562 Plaintiff Opening Brief.pdf) is known to cause issues with text extraction. The file may be scanned, protected, or use a non-standard PDF format. Please try converting it to a standard PDF format using Adobe Acrobat or another PDF editor before uploading."
+        page_count = len(reader.pages)
+        probe['page_count'] = page_count
+        if not page_count:
+            return probe
+        
+        # Evenly spaced pages, including the first and last
+        count = min(sample_pages, page_count)
+        samples = sorted({round(i * (page_count - 1) / max(1, count - 1)) for i in range(count)})
+        probe['sampled_pages'] = samples
+        probe['pages_with_fonts'] = sum(1 for i in samples if _page_has_fonts(reader.pages[i]))
     
-    finally:
-        # Clean up temporary directory
-        try:
-            shutil.rmtree(temp_dir)
-            print(f"Cleaned up temporary directory: {temp_dir}")
-        except Exception as e:
-            print(f"Error cleaning up temporary directory: {e}")
+    for name in PDF_PAGE_EXTRACTORS:
+        start = time.time()
+        words = 0
+        with open_pdf(file_path) as data:
+            pages = PdfminerPages(data, samples) if name == 'pdfminer' else PyPDF2Pages(data)
+            for page_number in samples:
+                words += len(pages.extract(page_number).split())
+        probe['extractors'][name] = {'seconds': time.time() - start, 'words': words}
+        probe['text_layer'] = probe['text_layer'] or words > 0
+    
+    logger.info("Probed %s: %s pages, encrypted=%s, text_layer=%s, fonts on %s/%s sampled pages, extractors=%s",
+                file_path, page_count, probe['encrypted'], probe['text_layer'], probe['pages_with_fonts'],
+                len(samples), probe['extractors'])
+    return probe
+
+def count_pdf_pages(file_path):
+    """Count the pages in a PDF file."""
+    with open_pdf(file_path) as data:
+        return len(PyPDF2.PdfReader(data, strict=False).pages)
+
+def iter_pages_from_pdf(file_path, first_page=0, last_page=None, extractor='pdfminer'):
+    """
+    Extract the text of a range of pages from a PDF file, yielding each page
+    as soon as it has been extracted.
+    
+    Pages are extracted with the given page extractor; any page it fails on
+    (or finds no text on) is retried with the other one. Pages that neither
+    can read are yielded as empty strings so page numbers stay aligned.
+    
+    Args:
+        file_path: Path to the PDF file
+        first_page: 0-based index of the first page to extract
+        last_page: 0-based index after the last page to extract, or None for the end
+        extractor: Page extractor to try first (see PDF_PAGE_EXTRACTORS)
+    
+    Yields:
+        The text of each page, in page order
+    """
+    if last_page is None:
+        last_page = count_pdf_pages(file_path)
+    page_numbers = list(range(first_page, last_page))
+    logger.debug("Extracting pages %s-%s of %s with %s", first_page + 1, last_page, file_path, extractor)
+    
+    # Separate mappings, since pdfminer expects the read position to be where it left it
+    with open_pdf(file_path) as pdfminer_data, open_pdf(file_path) as pypdf2_data:
+        page_extractors = {'pdfminer': PdfminerPages(pdfminer_data, page_numbers), 'pypdf2': PyPDF2Pages(pypdf2_data)}
+        order = [extractor] + [name for name in PDF_PAGE_EXTRACTORS if name != extractor]
+        
+        for page_number in page_numbers:
+            text = ''
+            for name in order:
+                text = page_extractors[name].extract(page_number)
+                if text.strip():
+                    break
+            yield text
+
+def extract_pages_from_pdf(file_path, first_page=0, last_page=None):
+    """
+    Extract the text of a range of pages from a PDF file, one string per page.
+    
+    See iter_pages_from_pdf() for the arguments.
+    
+    Returns:
+        List of page texts, in page order
+    """
+    return list(iter_pages_from_pdf(file_path, first_page, last_page))
 
 # Simple test function to check if the module works
 if __name__ == "__main__":
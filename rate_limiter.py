@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Rate Limiting for CaseStrainer API Clients
+
+This module provides one shared request scheduler per API key. Every code path
+that calls CourtListener (citation lookup, search, opinion and cluster details,
+the connection check) acquires a slot from the same scheduler, so concurrent
+analyses stay within the key's quota together.
+
+Each scheduler combines:
+1. A token bucket that spreads requests out to the configured rate
+2. A priority queue, so interactive lookups go ahead of batch and background work
+3. A global pause when the server answers 429, honouring its Retry-After header
+"""
+
+import os
+import time
+import asyncio
+import heapq
+import logging
+import random
+import itertools
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Request priorities (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+PRIORITY_BACKGROUND = 20
+
+# CourtListener allows 5,000 requests per hour for an authenticated key
+COURTLISTENER_RATE_PER_SECOND = float(os.environ.get('COURTLISTENER_RATE_PER_SECOND', 5000 / 3600))
+COURTLISTENER_BURST = int(os.environ.get('COURTLISTENER_BURST', 10))
+
+# Anonymous requests get a much smaller allowance
+ANONYMOUS_RATE_PER_SECOND = float(os.environ.get('ANONYMOUS_RATE_PER_SECOND', 0.2))
+ANONYMOUS_BURST = int(os.environ.get('ANONYMOUS_BURST', 2))
+
+# How often async waiters re-check their place in the queue
+ASYNC_POLL_INTERVAL = 0.05
+
+# Upper bounds on how long a single 429 or retry can stall a request
+MAX_RATE_LIMIT_PAUSE = float(os.environ.get('MAX_RATE_LIMIT_PAUSE', 60))
+MAX_RETRY_DELAY = float(os.environ.get('MAX_RETRY_DELAY', 8))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Either a number of seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket that refills at a fixed rate up to a maximum burst size."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def time_until_available(self, now: float) -> float:
+        """Seconds until a token can be taken (0 if one is available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        """Take one token; call only after time_until_available() returned 0."""
+        self._refill(now)
+        self.tokens -= 1
+
+
+class RateLimitScheduler:
+    """Priority-ordered, 429-aware request scheduler for one API key."""
+
+    def __init__(self, rate: float, burst: int, max_pause: float = MAX_RATE_LIMIT_PAUSE):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_pause = max_pause
+        self.paused_until = 0.0
+        self.consecutive_rate_limits = 0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def _time_until_ready(self, now: float) -> float:
+        if self.paused_until > now:
+            return self.paused_until - now
+        return self.bucket.time_until_available(now)
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for permission to send one request.
+
+        Requests are released in priority order (then first come, first served)
+        as tokens become available and no rate-limit pause is in effect.
+
+        Args:
+            priority: PRIORITY_INTERACTIVE, PRIORITY_BATCH or PRIORITY_BACKGROUND
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if the request may be sent, False if the timeout expired first
+        """
+        entry = (priority, next(self._counter))
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait_time = None
+                    if self._waiters[0] == entry:
+                        wait_time = self._time_until_ready(now)
+                        if wait_time <= 0:
+                            heapq.heappop(self._waiters)
+                            self.bucket.take(now)
+                            self._cond.notify_all()
+                            return True
+
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self._remove_waiter(entry)
+                            return False
+                        wait_time = remaining if wait_time is None else min(wait_time, remaining)
+
+                    self._cond.wait(wait_time)
+            except BaseException:
+                self._remove_waiter(entry)
+                raise
+
+    async def acquire_async(self, priority: int = PRIORITY_INTERACTIVE) -> bool:
+        """
+        Async version of acquire(); waits without blocking the event loop.
+
+        Async waiters share the same priority queue as threads, so both kinds
+        of caller are released in one order. A cancelled waiter leaves the queue.
+        """
+        entry = (priority, next(self._counter))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    wait_time = ASYNC_POLL_INTERVAL
+                    if self._waiters[0] == entry:
+                        wait_time = self._time_until_ready(now)
+                        if wait_time <= 0:
+                            heapq.heappop(self._waiters)
+                            self.bucket.take(now)
+                            self._cond.notify_all()
+                            return True
+                await asyncio.sleep(min(wait_time, ASYNC_POLL_INTERVAL))
+        except BaseException:
+            with self._cond:
+                self._remove_waiter(entry)
+            raise
+
+    def _remove_waiter(self, entry) -> None:
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            self._cond.notify_all()
+
+    def report_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        Pause every request on this key after a 429 response.
+
+        Args:
+            retry_after: Seconds from the Retry-After header, if the server sent one
+
+        Returns:
+            The length of the pause in seconds
+        """
+        with self._cond:
+            self.consecutive_rate_limits += 1
+            if retry_after is None:
+                retry_after = 2 ** min(self.consecutive_rate_limits, 6)
+            pause = min(retry_after, self.max_pause)
+
+            # Drain the bucket so requests resume gradually after the pause
+            self.bucket.tokens = 0
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            self._cond.notify_all()
+
+        logger.warning("Rate limited by server, pausing all requests on this key for %.1f seconds", pause)
+        return pause
+
+    def report_success(self) -> None:
+        """Reset the 429 backoff after a successful request."""
+        if self.consecutive_rate_limits:
+            with self._cond:
+                self.consecutive_rate_limits = 0
+
+    def check_response(self, response) -> bool:
+        """
+        Record the outcome of a response.
+
+        Returns:
+            True if the response was a 429 (the caller should retry), False otherwise
+        """
+        if response.status_code == 429:
+            self.report_rate_limited(parse_retry_after(response.headers.get('Retry-After')))
+            return True
+        self.report_success()
+        return False
+
+    @staticmethod
+    def retry_delay(attempt: int, base: float = 1.0, max_delay: float = MAX_RETRY_DELAY) -> float:
+        """Bounded exponential backoff with jitter for non-429 failures."""
+        delay = min(max_delay, base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+
+# One scheduler per API key, shared by every module in the process
+_schedulers: Dict[str, RateLimitScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(api_key: Optional[str] = None) -> RateLimitScheduler:
+    """
+    Get the shared CourtListener scheduler for an API key.
+
+    Args:
+        api_key: The CourtListener API key, or None for anonymous requests
+
+    Returns:
+        The RateLimitScheduler that every request made with this key must go through
+    """
+    key = api_key or ''
+    with _schedulers_lock:
+        if key not in _schedulers:
+            if key:
+                _schedulers[key] = RateLimitScheduler(COURTLISTENER_RATE_PER_SECOND, COURTLISTENER_BURST)
+            else:
+                _schedulers[key] = RateLimitScheduler(ANONYMOUS_RATE_PER_SECOND, ANONYMOUS_BURST)
+        return _schedulers[key]
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Analysis Result Cache for CaseStrainer
+
+Clerks often re-check the same filing several times before a deadline. This
+module keeps the finished results of each analysis, keyed by the SHA-256 of
+the document plus the settings that affect verification, so a repeat run
+can show the full results straight away.
+
+Results get stale as CourtListener adds cases, so entries older than the
+caller's revalidation age are partially re-checked: citations CourtListener
+already confirmed are kept, and only the rest are verified again (see
+citations_to_revalidate()).
+"""
+
+import os
+import json
+import logging
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration (can be overridden with environment variables)
+RESULT_CACHE_PATH = os.environ.get(
+    'RESULT_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'result_cache.db')
+)
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 1000))
+
+# Flag to allow disabling the cache entirely
+RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'True').lower() in ('true', '1', 't')
+
+# Bump when the shape or grouping of cached results changes so old entries are ignored
+RESULT_FORMAT_VERSION = 2
+
+
+def make_result_key(document_hash: str, settings: Dict[str, Any]) -> str:
+    """
+    Build the cache key for a document analyzed with the given settings.
+
+    Args:
+        document_hash: SHA-256 of the document (file contents or pasted text)
+        settings: Settings that change the results, e.g. whether CourtListener was used
+
+    Returns:
+        Hex digest identifying the document and settings
+    """
+    settings_json = json.dumps(settings, sort_keys=True)
+    return hashlib.sha256(f"{RESULT_FORMAT_VERSION}:{document_hash}:{settings_json}".encode('utf-8')).hexdigest()
+
+
+def is_settled(result: Dict[str, Any]) -> bool:
+    """Whether a citation result was confirmed by CourtListener and won't change on a re-check."""
+    return bool(result.get('court_listener_url')) and not result.get('is_hallucinated')
+
+
+def citations_to_revalidate(entry: Dict[str, Any], revalidate_after: float) -> List[int]:
+    """
+    Pick the citations of a cached analysis that should be verified again.
+
+    Citations that could not be verified in time are always re-checked. Once
+    the entry is older than revalidate_after, everything CourtListener hasn't
+    confirmed (hallucinations and LangSearch verdicts) is re-checked too.
+
+    Args:
+        entry: Cached entry as returned by ResultCache.get()
+        revalidate_after: Age in seconds after which unsettled citations are re-checked
+
+    Returns:
+        Indexes into entry['citation_results']
+    """
+    stale = time.time() - entry['created_at'] > revalidate_after
+    indexes = []
+    for index, result in enumerate(entry['citation_results']):
+        if result.get('hallucination_status') == 'unconfirmed' or (stale and not is_settled(result)):
+            indexes.append(index)
+    return indexes
+
+
+class ResultCache:
+    """SQLite-backed store of finished analyses with LRU eviction."""
+
+    def __init__(self, db_path: str = RESULT_CACHE_PATH, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        """Open (and create if needed) the cache database."""
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self._lock:
+            # WAL lets several server processes read while one writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS analysis_results (
+                    key TEXT PRIMARY KEY,
+                    document_hash TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_analysis_results_last_access ON analysis_results (last_access)'
+            )
+            self._conn.commit()
+
+    def get(self, document_hash: str, settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached analysis of a document.
+
+        Args:
+            document_hash: SHA-256 of the document
+            settings: Settings the analysis runs with
+
+        Returns:
+            The entry stored with set() plus 'created_at', or None on a miss
+        """
+        key = make_result_key(document_hash, settings)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT data, created_at FROM analysis_results WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute(
+                    'UPDATE analysis_results SET last_access = ? WHERE key = ?', (time.time(), key)
+                )
+                self._conn.commit()
+
+            entry = json.loads(row[0])
+            entry['created_at'] = row[1]
+            return entry
+        except Exception as e:
+            logger.warning("Error reading result cache: %s", e)
+            return None
+
+    def set(self, document_hash: str, settings: Dict[str, Any], entry: Dict[str, Any],
+            created_at: Optional[float] = None) -> None:
+        """
+        Store the results of a finished analysis.
+
+        Args:
+            document_hash: SHA-256 of the document
+            settings: Settings the analysis ran with
+            entry: JSON-serializable results, including the per-citation 'citation_results'
+            created_at: When the results were verified (defaults to now)
+        """
+        key = make_result_key(document_hash, settings)
+        now = time.time()
+        try:
+            data = json.dumps({k: v for k, v in entry.items() if k != 'created_at'})
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO analysis_results (key, document_hash, data, created_at, last_access) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, document_hash, data, created_at or now, now)
+                )
+                self._conn.commit()
+                self._writes += 1
+                evict = self._writes % 100 == 0
+            if evict:
+                self.evict()
+        except Exception as e:
+            logger.warning("Error writing result cache: %s", e)
+
+    def evict(self) -> None:
+        """Trim the cache to max_entries, least recently used first."""
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM analysis_results').fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    'DELETE FROM analysis_results WHERE key IN '
+                    '(SELECT key FROM analysis_results ORDER BY last_access ASC LIMIT ?)',
+                    (excess,)
+                )
+                self._conn.commit()
+                logger.info("Evicted %s analyses from the result cache", excess)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM analysis_results').fetchone()[0]
+
+
+# Shared cache instance for this process
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Get the process-wide result cache, creating it on first use.
+
+    Returns:
+        The shared ResultCache, or None if the cache is disabled or unavailable
+    """
+    global _result_cache, RESULT_CACHE_ENABLED
+
+    if not RESULT_CACHE_ENABLED:
+        return None
+
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                try:
+                    _result_cache = ResultCache()
+                except Exception:
+                    logger.exception("Error opening result cache at %s", RESULT_CACHE_PATH)
+                    RESULT_CACHE_ENABLED = False
+                    return None
+
+    return _result_cache
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test script for the analysis pipeline in app_final, with the CourtListener and
+LangSearch calls replaced by local fakes
+"""
+import os
+import tempfile
+import threading
+import app_final
+import citation_cache
+import citation_index
+import document_cache
+import result_cache
+from document_cache import DocumentCache
+from job_queue import JobQueue
+
+# Each test checks a fresh analysis, not results cached by an earlier run
+citation_cache.CITATION_CACHE_ENABLED = False
+citation_index.CITATION_INDEX_ENABLED = False
+document_cache.DOCUMENT_CACHE_ENABLED = False
+result_cache.RESULT_CACHE_ENABLED = False
+
+BRIEF = 'See Roe v. Wade, 410 U.S. 113 (1973); Foo v. Bar, 999 F.3d 999 (2020).'
+
+def fake_lookup_batch(citations, api_key, deadline=None):
+    """CourtListener knows Roe v. Wade and nothing else."""
+    items = [{
+        'citation': citation,
+        'normalized_citations': [citation],
+        'status': 200,
+        'clusters': [{'id': 108713, 'case_name': 'Roe v. Wade', 'absolute_url': '/opinion/108713/roe-v-wade/',
+                      'citations': [{'volume': 410, 'reporter': 'U.S.', 'page': '113'}]}]
+    } for citation in citations if citation == '410 U.S. 113']
+    return {'items': items, 'by_citation': {item['citation'].lower(): item for item in items}, 'failed': [], 'errors': []}
+
+def fake_langsearch(citation):
+    return {'citation_text': citation, 'is_hallucinated': True, 'confidence': 0.5, 'explanation': 'Not found'}
+
+class Fakes:
+    """Swap app_final functions for the duration of a test."""
+
+    def __init__(self, **replacements):
+        self.replacements = replacements
+        self.originals = {}
+
+    def __enter__(self):
+        for name, replacement in self.replacements.items():
+            self.originals[name] = getattr(app_final, name)
+            setattr(app_final, name, replacement)
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, original in self.originals.items():
+            setattr(app_final, name, original)
+
+def test_citations_are_extracted_once_and_looked_up_individually():
+    """Test that the text is run through eyecite once and only the citations are sent to CourtListener."""
+    print("Testing the extract-once analysis path")
+
+    extract_calls = []
+    lookup_calls = []
+
+    def counting_extract(text, pages=None):
+        extract_calls.append(text)
+        return original_extract(text, pages)
+
+    def recording_lookup(citations, api_key, deadline=None):
+        lookup_calls.append(list(citations))
+        return fake_lookup_batch(citations, api_key)
+
+    original_extract = app_final.extract_citations
+    with Fakes(extract_citations=counting_extract, lookup_citations_batch=recording_lookup,
+               build_langsearch_result=fake_langsearch):
+        app_final.run_analysis('pipeline-extract-once', brief_text=BRIEF, api_key='test-key')
+
+    job = app_final.job_store.get('pipeline-extract-once')
+    print(f"Job: {job['status']}, {job['message']}")
+    assert job['status'] == 'complete'
+    assert len(extract_calls) == 1
+    assert lookup_calls == [['410 U.S. 113', '999 F.3d 999']]
+
+    # One grouped result per case
+    results = {result['primary_citation']: result for result in job['citation_results']}
+    assert not results['410 U.S. 113']['is_hallucinated']
+    assert results['999 F.3d 999']['is_hallucinated']
+
+def test_failed_lookup_falls_back_instead_of_failing():
+    """Test that a CourtListener error sends the batch to the fallback verifier and the analysis still completes."""
+    print("Testing a failed CourtListener lookup")
+
+    checked = []
+
+    def failing_lookup(citations, api_key, deadline=None):
+        return {'items': [], 'by_citation': {}, 'failed': list(citations), 'errors': ['Status code 502: Bad Gateway']}
+
+    def recording_langsearch(citation):
+        checked.append(citation)
+        return fake_langsearch(citation)
+
+    with Fakes(lookup_citations_batch=failing_lookup, build_langsearch_result=recording_langsearch):
+        app_final.run_analysis('pipeline-lookup-failed', brief_text=BRIEF, api_key='test-key')
+
+    job = app_final.job_store.get('pipeline-lookup-failed')
+    print(f"Job: {job['status']}, {job['message']}")
+    assert job['status'] == 'complete'
+    assert sorted(checked) == ['410 U.S. 113', '999 F.3d 999']
+    assert len(job['citation_results']) == 2
+
+class FakeExtractionPool:
+    """Two PDF pages, with a citation split across the page break."""
+
+    def __init__(self):
+        self.documents = 0
+
+    def iter_pdf_pages(self, file_path):
+        self.documents += 1
+        yield 1, 'See Roe v. Wade, 410 U.S.\n'
+        yield 2, '113 (1973); Foo v. Bar, 999 F.3d 999 (2020).'
+
+def test_cached_document_finds_the_same_citations():
+    """Test that a document served from the document cache gives the same citations as its first run."""
+    print("Testing citations found in a cached document")
+
+    pool = FakeExtractionPool()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, 'brief.pdf')
+        with open(pdf_path, 'wb') as f:
+            f.write(b'%PDF-1.4 split citation')
+        cache = DocumentCache(os.path.join(temp_dir, 'documents.db'))
+
+        with Fakes(extraction_pool=pool, get_document_cache=lambda: cache,
+                   lookup_citations_batch=fake_lookup_batch, build_langsearch_result=fake_langsearch):
+            app_final.run_analysis('pipeline-first-run', file_path=pdf_path, api_key='test-key')
+            app_final.run_analysis('pipeline-cached-run', file_path=pdf_path, api_key='test-key')
+
+    first = app_final.job_store.get('pipeline-first-run')
+    cached = app_final.job_store.get('pipeline-cached-run')
+    print(f"First run: {first['extracted_citations']}, cached run: {cached['extracted_citations']}")
+    assert pool.documents == 1
+    assert first['status'] == cached['status'] == 'complete'
+    assert first['extracted_citations'] == ['410 U.S. 113', '999 F.3d 999']
+    assert cached['extracted_citations'] == first['extracted_citations']
+    assert cached['citation_pages'] == first['citation_pages']
+
+def test_anonymous_clients_have_their_own_queue_limits():
+    """Test that clients without an API key of their own are limited separately, not as one user."""
+    print("Testing per-client queue limits for anonymous clients")
+
+    release = threading.Event()
+    queue = JobQueue(workers=1, max_queued=50, max_queued_per_user=10)
+    client = app_final.app.test_client()
+
+    def queued_analysis(*args):
+        release.wait()
+
+    try:
+        with Fakes(analysis_queue=queue, run_analysis=queued_analysis, DEFAULT_API_KEY='server-key'):
+            for address in ('203.0.113.1', '203.0.113.2'):
+                for _ in range(10):
+                    response = client.post('/analyze', data={'brief_text': BRIEF},
+                                           environ_base={'REMOTE_ADDR': address})
+                    assert response.status_code == 200, response.get_json()
+            # Each client's own limit still applies; the worker may have taken one of its
+            # analyses off the queue, so the limit is reached by the twelfth at the latest
+            statuses = [client.post('/analyze', data={'brief_text': BRIEF},
+                                    environ_base={'REMOTE_ADDR': '203.0.113.1'}).status_code
+                        for _ in range(2)]
+            print(f"Further analyses from one client: {statuses}")
+            assert statuses[-1] == 429
+    finally:
+        release.set()
+        queue.shutdown()
+
+def test_forwarded_for_is_ignored_without_a_trusted_proxy():
+    """Test that a client can't choose the address it is queued under by sending X-Forwarded-For."""
+    print("Testing a forged X-Forwarded-For header")
+
+    with app_final.app.test_request_context('/analyze', method='POST',
+                                            environ_base={'REMOTE_ADDR': '203.0.113.1'},
+                                            headers={'X-Forwarded-For': '198.51.100.7'}):
+        user = app_final.queue_user()
+    print(f"Queued as: {user}")
+    assert user == 'ip:203.0.113.1'
+
+if __name__ == "__main__":
+    test_citations_are_extracted_once_and_looked_up_individually()
+    test_failed_lookup_falls_back_instead_of_failing()
+    test_cached_document_finds_the_same_citations()
+    test_anonymous_clients_have_their_own_queue_limits()
+    test_forwarded_for_is_ignored_without_a_trusted_proxy()
+    print("All analysis pipeline tests passed")
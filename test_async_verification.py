@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent (async) citation verification
+"""
+import os
+import asyncio
+import tempfile
+import requests
+import citation_verification
+from citation_cache import CitationCache
+from citation_verification import CitationVerifier
+
+def make_method(name, delay, found, log):
+    """Build a fake verification method that records whether it finished."""
+    async def method(citation):
+        log.append(f"{name} started")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log.append(f"{name} cancelled")
+            raise
+        log.append(f"{name} finished")
+        return {'citation': citation, 'found': found, 'source': name}
+    method.__name__ = name
+    return method
+
+def test_race_priority():
+    """Test that the highest-priority positive result wins and slower methods are cancelled."""
+    print("Testing verification method race")
+    verifier = CitationVerifier(api_key='test', use_cache=False)
+    # Hedging and racing send extra requests, so they have to be asked for
+    assert verifier.mode == 'sequential'
+    log = []
+
+    # The second method finds the citation first, but must wait for the first to miss
+    methods = [
+        make_method('citation_api', 0.2, False, log),
+        make_method('search_api', 0.05, True, log),
+        make_method('cluster_api', 1.0, True, log)
+    ]
+    winner = asyncio.run(verifier._run_methods('410 U.S. 113', methods, mode='race'))
+    print(f"Winner: {winner['source']}, log: {log}")
+    assert winner['source'] == 'search_api'
+    assert winner['won_by'] == 'search_api'
+    assert 'cluster_api cancelled' in log
+
+    # A higher-priority hit wins even when a lower-priority method also finds it
+    log.clear()
+    methods = [
+        make_method('citation_api', 0.1, True, log),
+        make_method('search_api', 0.05, True, log)
+    ]
+    winner = asyncio.run(verifier._run_methods('410 U.S. 113', methods, mode='race'))
+    assert winner['source'] == 'citation_api'
+
+    # Nothing found
+    methods = [make_method('citation_api', 0.01, False, log)]
+    assert asyncio.run(verifier._run_methods('1 U.S. 1', methods, mode='race')) is None
+
+def test_hedged_and_sequential_modes():
+    """Test that hedged mode starts the next method after the hedge delay and sequential mode doesn't."""
+    print("Testing hedged and sequential verification modes")
+    verifier = CitationVerifier(api_key='test', use_cache=False, mode='hedged', hedge_delay=0.05)
+    log = []
+
+    # The first method is slow and misses; the hedge starts the second before it finishes
+    methods = [
+        make_method('citation_api', 0.3, False, log),
+        make_method('search_api', 0.01, True, log)
+    ]
+    winner = asyncio.run(verifier._run_methods('410 U.S. 113', methods))
+    print(f"Hedged winner: {winner['won_by']}, log: {log}")
+    assert winner['won_by'] == 'search_api'
+    assert log.index('search_api started') < log.index('citation_api finished')
+
+    # A quick hit from the first method means the second never starts
+    log.clear()
+    methods = [
+        make_method('citation_api', 0.01, True, log),
+        make_method('search_api', 0.01, True, log)
+    ]
+    winner = asyncio.run(verifier._run_methods('410 U.S. 113', methods))
+    assert winner['won_by'] == 'citation_api'
+    assert 'search_api started' not in log
+
+    # Sequential mode only starts the next method after a miss
+    log.clear()
+    methods = [
+        make_method('citation_api', 0.1, False, log),
+        make_method('search_api', 0.01, True, log)
+    ]
+    winner = asyncio.run(verifier._run_methods('410 U.S. 113', methods, mode='sequential'))
+    assert winner['won_by'] == 'search_api'
+    assert log == ['citation_api started', 'citation_api finished', 'search_api started', 'search_api finished']
+
+def test_unreachable_sources_are_not_cached_as_misses():
+    """Test that a citation no method could reach is reported as an error and not cached as not found."""
+    print("Testing verification during an outage")
+
+    async def unreachable(*args, **kwargs):
+        raise requests.ConnectionError("Connection refused")
+
+    original_request, original_retries = citation_verification.async_request, citation_verification.MAX_RETRIES
+    citation_verification.async_request = unreachable
+    citation_verification.MAX_RETRIES = 1
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            verifier = CitationVerifier(api_key='test', langsearch_api_key='test', use_local_index=False)
+            verifier.cache = CitationCache(db_path=os.path.join(temp_dir, 'cache.db'))
+            result = verifier.verify_citation('410 U.S. 113')
+            print(f"Result: {result}")
+            assert not result['found'] and result['transient'] and result['error']
+            assert verifier.cache.get('citation_verifier', '410 U.S. 113') is None
+            assert len(verifier.cache) == 0
+    finally:
+        citation_verification.async_request = original_request
+        citation_verification.MAX_RETRIES = original_retries
+
+if __name__ == "__main__":
+    test_race_priority()
+    test_hedged_and_sequential_modes()
+    test_unreachable_sources_are_not_cached_as_misses()
+    print("All async verification tests passed")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk case name similarity
+"""
+from case_name_similarity import find_similar_case_names, group_similar_case_names, SKLEARN_AVAILABLE
+
+CASE_NAMES = [
+    'Associated Press v. Washington State Legislature',
+    'Roe v. Wade',
+    'Smith v. Jones',
+    'Associated Press v. Wash. State Legislature',
+    'Roe v. Wade',
+    'Smith v. Jonas',
+    'Unknown'
+]
+
+def test_bulk_similarity():
+    """Test that abbreviated and repeated names are found in one pass, with and without TF-IDF."""
+    print(f"Testing bulk case name similarity (scikit-learn available: {SKLEARN_AVAILABLE})")
+
+    pairs = find_similar_case_names(CASE_NAMES)
+    print(f"Similar pairs: {pairs}")
+    assert [(i, j) for i, j, _ in pairs] == [(0, 3), (1, 4)]
+    assert pairs[1][2] == 1.0
+
+    assert group_similar_case_names(CASE_NAMES) == [[0, 3], [1, 4]]
+
+    # Word overlap fallback: "Wash." and "Washington" are different words, so it scores lower
+    fallback = find_similar_case_names(CASE_NAMES, use_tfidf=False)
+    print(f"Similar pairs by word overlap: {fallback}")
+    assert [(i, j) for i, j, _ in fallback] == [(0, 3), (1, 4)]
+    if SKLEARN_AVAILABLE:
+        assert fallback[0][2] < pairs[0][2]
+
+if __name__ == "__main__":
+    test_bulk_similarity()
+    print("All case name similarity tests passed")
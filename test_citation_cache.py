@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the Citation Verification Cache
+"""
+import os
+import time
+import tempfile
+from citation_cache import CitationCache, normalize_citation_key
+
+def test_citation_cache():
+    """Test cache hits, negative caching, expiry and LRU eviction."""
+    print("Testing citation verification cache")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = CitationCache(
+            db_path=os.path.join(temp_dir, 'cache.db'),
+            ttl=60,
+            negative_ttl=1,
+            max_entries=2
+        )
+
+        # Positive result, looked up with a differently spaced citation
+        cache.set('courtlistener_lookup', '410 U.S. 113', {'case_name': 'Roe v. Wade'}, found=True)
+        cached = cache.get('courtlistener_lookup', '410  U. S. 113')
+        print(f"Cached positive result: {cached}")
+        assert cached == {'found': True, 'value': {'case_name': 'Roe v. Wade'}}
+
+        # Sources are kept apart
+        assert cache.get('langsearch', '410 U.S. 113') is None
+
+        # Hits don't write to the database; their access times are saved in batches
+        changes = cache._conn.total_changes
+        cache.get('courtlistener_lookup', '410 U.S. 113')
+        assert cache._conn.total_changes == changes
+
+        # Negative result with the shorter TTL
+        cache.set('courtlistener_lookup', '999 F.3d 999', None, found=False)
+        assert cache.get('courtlistener_lookup', '999 F.3d 999') == {'found': False, 'value': None}
+        time.sleep(1.1)
+        assert cache.get('courtlistener_lookup', '999 F.3d 999') is None
+        print("Negative result expired as expected")
+
+        # LRU eviction keeps the most recently used entries
+        cache.set('courtlistener_lookup', '93 S. Ct. 705', {'case_name': 'Roe v. Wade'}, found=True)
+        cache.get('courtlistener_lookup', '410 U.S. 113')
+        cache.set('courtlistener_lookup', '35 L. Ed. 2d 147', {'case_name': 'Roe v. Wade'}, found=True)
+        cache.evict()
+        print(f"Cache size after eviction: {len(cache)}")
+        assert len(cache) == 2
+        assert cache.get('courtlistener_lookup', '93 S. Ct. 705') is None
+        assert cache.get('courtlistener_lookup', '410 U.S. 113') is not None
+
+def test_normalize_citation_key():
+    """Test that citation spelling variants share a key."""
+    assert normalize_citation_key('410 U. S. 113') == normalize_citation_key('410 U.S. 113')
+    assert normalize_citation_key(' 93 S. Ct.  705 ') == '93 s.ct. 705'
+    assert normalize_citation_key('') == ''
+
+if __name__ == "__main__":
+    test_citation_cache()
+    test_normalize_citation_key()
+    print("All citation cache tests passed")
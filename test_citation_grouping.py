@@ -5,7 +5,8 @@ Test script for the Citation Grouping Module
 import json
 import sys
 from citation_verification import CitationVerifier
-from citation_grouping import group_citations
+from citation_grouping import group_citations, build_cluster_index, citation_key, NAME_SIMILARITY_THRESHOLD
+from case_name_similarity import SKLEARN_AVAILABLE, TFIDF_SIMILARITY_THRESHOLD
 
 def test_citation_grouping():
     """Test the citation grouping functionality with multiple citations for the same case."""
@@ -83,6 +84,117 @@ def test_citation_grouping():
     
     return grouped_citations
 
+def test_url_groups_are_kept_and_names_merged_by_complete_linkage():
+    """Test that url_then_name keeps URL groups and only merges a name with groups whose names are all similar to it."""
+    print("\nTesting URL and name grouping together")
+
+    citations = [
+        {'citation': '410 U.S. 113', 'case_name': 'Roe v. Wade', 'url': 'roe', 'source': 'api'},
+        {'citation': '93 S. Ct. 705', 'case_name': 'Roe v. Wade', 'url': 'roe', 'source': 'api'},
+        {'citation': '999 F.3d 999', 'case_name': 'Unknown case', 'url': '', 'source': 'api'},
+        {'citation': '1 Wash. 2d 1', 'case_name': 'Smith v. King County Dept. of Labor', 'url': 'a', 'source': 'api'},
+        {'citation': '2 P.3d 2', 'case_name': 'Smith v. King County Dept.', 'url': 'b', 'source': 'api'},
+        {'citation': '3 P.3d 3', 'case_name': 'Smith v. King County', 'url': 'c', 'source': 'api'},
+        {'citation': '4 P.3d 4', 'case_name': 'Unknown case', 'url': '', 'source': 'api'}
+    ]
+
+    grouped = group_citations(citations, method='url_then_name')
+    print(f"Groups: {[(g['citation'], [a['citation'] for a in g['alternate_citations']]) for g in grouped]}")
+    assert [(g['citation'], [a['citation'] for a in g['alternate_citations']]) for g in grouped] == [
+        ('410 U.S. 113', ['93 S. Ct. 705']),
+        ('999 F.3d 999', []),
+        ('1 Wash. 2d 1', ['2 P.3d 2', '3 P.3d 3']),
+        ('4 P.3d 4', [])
+    ]
+
+    # Only URL matches in 'url' mode
+    assert len(group_citations(citations, method='url')) == 6
+
+    # A ~ B and B ~ C, but A and C aren't similar, so A and C never share a group
+    chain = [
+        {'citation': '5 P.3d 5', 'case_name': 'State v. Smith', 'url': 'd', 'source': 'api'},
+        {'citation': '6 P.3d 6', 'case_name': 'State v. Smith Jones', 'url': 'e', 'source': 'api'},
+        {'citation': '7 P.3d 7', 'case_name': 'State v. Jones', 'url': 'f', 'source': 'api'}
+    ]
+    for ordered in (chain, chain[::-1]):
+        grouped = group_citations(ordered, method='url_then_name')
+        print(f"Chain groups: {[(g['citation'], [a['citation'] for a in g['alternate_citations']]) for g in grouped]}")
+        assert len(grouped) == 2
+        for group in grouped:
+            members = {group['citation']} | {a['citation'] for a in group['alternate_citations']}
+            assert not {'5 P.3d 5', '7 P.3d 7'} <= members
+
+def test_name_chains_are_not_merged():
+    """Test that names similar only through a name in between aren't grouped as one case."""
+    print("\nTesting chains of similar names")
+
+    citations = [
+        {'citation': '1 P.3d 1', 'case_name': 'State v. Smith', 'url': '', 'source': 'api'},
+        {'citation': '2 P.3d 2', 'case_name': 'State v. Smith Jones', 'url': '', 'source': 'api'},
+        {'citation': '3 P.3d 3', 'case_name': 'State v. Jones', 'url': '', 'source': 'api'}
+    ]
+
+    # Whichever order the names come in
+    for ordered in (citations, citations[::-1], [citations[1], citations[0], citations[2]]):
+        grouped = group_citations(ordered, method='name')
+        print(f"Groups: {[(g['case_name'], [a['case_name'] for a in g['alternate_citations']]) for g in grouped]}")
+        assert len(grouped) == 2
+        for group in grouped:
+            for alternate in group['alternate_citations']:
+                assert alternate['similarity'] >= NAME_SIMILARITY_THRESHOLD
+
+def test_tfidf_grouping_tolerates_typos():
+    """Test that the 'tfidf' method groups a misspelled name that word overlap misses."""
+    print("\nTesting n-gram name grouping")
+
+    citations = [
+        {'citation': '384 U.S. 436', 'case_name': 'Miranda v. Arizona', 'url': '', 'source': 'api'},
+        {'citation': '86 S. Ct. 1602', 'case_name': 'Miranda v. Arizonna', 'url': '', 'source': 'api'},
+        {'citation': '410 U.S. 113', 'case_name': 'Roe v. Wade', 'url': '', 'source': 'api'}
+    ]
+
+    assert len(group_citations(citations, method='url_then_name')) == 3
+    grouped = group_citations(citations, method='tfidf')
+    print(f"Groups: {[(g['citation'], g['alternate_citations']) for g in grouped]}")
+    if SKLEARN_AVAILABLE:
+        assert [g['citation'] for g in grouped] == ['384 U.S. 436', '410 U.S. 113']
+        assert grouped[0]['alternate_citations'][0]['similarity'] >= TFIDF_SIMILARITY_THRESHOLD
+    else:
+        # Falls back to word overlap
+        assert len(grouped) == 3
+
+def test_grouping_by_cluster():
+    """Test grouping by CourtListener cluster, with names only placing unresolved citations."""
+    print("\nTesting grouping by CourtListener cluster")
+
+    lookup_items = [{
+        'citation': '410 U.S. 113',
+        'normalized_citations': ['410 U.S. 113'],
+        'clusters': [{'id': 108713, 'case_name': 'Roe v. Wade', 'citations': [
+            {'volume': 410, 'reporter': 'U.S.', 'page': '113'},
+            {'volume': 93, 'reporter': 'S. Ct.', 'page': '705'}
+        ]}]
+    }]
+    cluster_index = build_cluster_index(lookup_items)
+    assert cluster_index[citation_key('93 S.Ct. 705')] == 108713
+
+    citations = [
+        {'citation': '410 U.S. 113', 'case_name': 'Roe v. Wade', 'url': 'roe', 'source': 'api', 'cluster_id': 108713},
+        {'citation': '93 S.Ct. 705', 'case_name': 'Unknown case', 'url': '', 'source': 'api'},
+        {'citation': '1 Wash. 2d 1', 'case_name': 'Smith v. Jones', 'url': 'a', 'source': 'api', 'cluster_id': 1},
+        {'citation': '2 Wash. 2d 2', 'case_name': 'Smith v. Jones', 'url': 'b', 'source': 'api', 'cluster_id': 2},
+        {'citation': '3 P.3d 3', 'case_name': 'Smith v. Jones', 'url': '', 'source': 'langsearch'}
+    ]
+
+    grouped = group_citations(citations, method='cluster', cluster_index=cluster_index)
+    print(f"Groups: {[(g['citation'], [a['citation'] for a in g['alternate_citations']]) for g in grouped]}")
+    # Different cases with the same name stay apart; the unresolved citation joins the first
+    assert [(g['citation'], [a['citation'] for a in g['alternate_citations']]) for g in grouped] == [
+        ('410 U.S. 113', ['93 S.Ct. 705']),
+        ('1 Wash. 2d 1', ['3 P.3d 3']),
+        ('2 Wash. 2d 2', [])
+    ]
+
 def test_with_real_citations():
     """Test the citation grouping with real citations from the API."""
     print("\nTesting citation grouping with real citations from the API")
@@ -153,6 +265,10 @@ def test_with_real_citations():
 if __name__ == "__main__":
     # Test with predefined citations
     test_citation_grouping()
+    test_url_groups_are_kept_and_names_merged_by_complete_linkage()
+    test_name_chains_are_not_merged()
+    test_tfidf_grouping_tolerates_typos()
+    test_grouping_by_cluster()
     
     # Test with real citations from the API (optional)
     if len(sys.argv) > 1 and sys.argv[1] == '--with-api':
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the local citation index
+"""
+import os
+import bz2
+import json
+import tempfile
+from citation_index import CitationIndex
+from citation_verification import CitationVerifier
+
+CITATIONS_DUMP = """id,volume,reporter,page,type,cluster_id,date_created,date_modified
+1,410,U.S.,113,1,108713,2010-01-01 00:00:00+00,2020-01-01 00:00:00+00
+2,93,S. Ct.,705,3,108713,2010-01-01 00:00:00+00,2020-01-01 00:00:00+00
+3,196,Wash. 2d,725,2,4688692,2020-01-01 00:00:00+00,2021-06-01 00:00:00+00
+"""
+
+CLUSTERS_DUMP = """id,case_name,case_name_short,case_name_full,slug,date_filed,date_modified
+108713,`Roe v. Wade`,Roe,,roe-v-wade,1973-01-22,2020-01-01 00:00:00+00
+4688692,,,`Associated Press v. Washington State Legislature`,associated-press-v-wash-state-legislature,2020-12-24,2021-06-01 00:00:00+00
+"""
+
+def write_dump(path, text):
+    with bz2.open(path, 'wt', encoding='utf-8') as f:
+        f.write(text)
+
+def test_citation_index():
+    """Test importing bulk dumps, incremental refresh and lookups by any spelling."""
+    print("Testing the local citation index")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = CitationIndex(os.path.join(temp_dir, 'index.db'))
+        citations_path = os.path.join(temp_dir, 'citations.csv.bz2')
+        clusters_path = os.path.join(temp_dir, 'clusters.csv.bz2')
+        write_dump(citations_path, CITATIONS_DUMP)
+        write_dump(clusters_path, CLUSTERS_DUMP)
+
+        assert index.import_citations(citations_path) == 3
+        assert index.import_clusters(clusters_path) == 2
+        assert index.watermark('citations') == '2021-06-01 00:00:00+00'
+
+        item = index.lookup('196 Wn.2d 725')
+        print(f"Indexed item: {item}")
+        assert item['clusters'][0]['case_name'] == 'Associated Press v. Washington State Legislature'
+        assert item['clusters'][0]['absolute_url'] == '/opinion/4688692/associated-press-v-wash-state-legislature/'
+        roe = index.lookup_many(['410 U. S. 113', '999 F.3d 999'])
+        assert list(roe) == ['410 U. S. 113']
+        assert len(roe['410 U. S. 113']['clusters'][0]['citations']) == 2
+
+        # A newer dump only writes what changed since the last import
+        write_dump(citations_path, CITATIONS_DUMP + '4,35,L. Ed. 2d,147,4,108713,2021-07-01 00:00:00+00,2021-07-01 00:00:00+00\n')
+        assert index.import_citations(citations_path) == 1
+        assert index.import_citations(citations_path, full=True) == 4
+        assert len(index) == 4
+
+        # A corrected citation replaces its old row instead of leaving both mapped
+        write_dump(citations_path, CITATIONS_DUMP.replace(
+            '3,196,Wash. 2d,725,2,4688692,2020-01-01 00:00:00+00,2021-06-01 00:00:00+00',
+            '3,196,Wash. 2d,726,2,4688692,2020-01-01 00:00:00+00,2021-08-01 00:00:00+00'))
+        assert index.import_citations(citations_path) == 1
+        assert index.lookup('196 Wash. 2d 725') is None
+        assert index.lookup('196 Wash. 2d 726')['clusters'][0]['id'] == 4688692
+        assert len(index) == 4
+
+        # Search API result pages
+        search_path = os.path.join(temp_dir, 'search.json')
+        with open(search_path, 'w', encoding='utf-8') as f:
+            json.dump({'results': [{'cluster_id': 1, 'caseName': 'Smith v. Jones', 'absolute_url': '/opinion/1/smith-v-jones/',
+                                    'dateFiled': '2019-03-01T00:00:00-08:00', 'citation': ['1 Wash. App. 2d 1']}]}, f)
+        assert index.import_search_results(search_path) == 1
+        assert index.import_search_results(search_path) == 1
+        assert len(index) == 5
+        assert index.lookup('1 Wn. App. 2d 1')['clusters'][0]['date_filed'] == '2019-03-01'
+
+        # The verifier finds indexed citations without the API
+        verifier = CitationVerifier(use_cache=False)
+        verifier.citation_index = index
+        result = verifier.verify_citation('93 S.Ct. 705')
+        print(f"Verification result: {result}")
+        assert result['found'] and result['won_by'] == 'local_index'
+        assert result['case_name'] == 'Roe v. Wade'
+
+if __name__ == "__main__":
+    test_citation_index()
+    print("All citation index tests passed")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for batched CourtListener citation lookups
+"""
+import json
+import time
+import courtlistener_integration
+from courtlistener_integration import chunk_citations, lookup_citations_batch, _post_citation_chunk
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.text)
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def post(self, *args, **kwargs):
+        return self.response
+
+def test_chunk_citations():
+    """Test that chunks respect both the citation count and the request length limits, in order."""
+    print("Testing citation chunking")
+
+    citations = ['410 U.S. 113', '93 S. Ct. 705', '35 L. Ed. 2d 147', '1 F.3d 1']
+    assert chunk_citations(citations, max_citations=2) == [citations[:2], citations[2:]]
+    # "410 U.S. 113\n93 S. Ct. 705" is 26 characters and "35 L. Ed. 2d 147\n1 F.3d 1" is 25
+    assert chunk_citations(citations, max_chars=26) == [citations[:2], citations[2:]]
+    assert chunk_citations(citations, max_chars=25) == [[citations[0]], [citations[1]], citations[2:]]
+    assert chunk_citations(citations, max_chars=24) == [[c] for c in citations]
+    assert chunk_citations([]) == []
+
+def test_only_failed_chunks_are_retried():
+    """Test that a failed chunk is resent on its own and the others are not sent again."""
+    print("Testing retries of failed chunks")
+
+    sent = []
+    def flaky_chunk(chunk, api_key, deadline=None):
+        sent.append(list(chunk))
+        if chunk == ['93 S. Ct. 705'] and sent.count(chunk) == 1:
+            return None, "Status code 502: Bad Gateway", False
+        return [{'citation': c, 'normalized_citations': [c], 'clusters': [{'id': 1}]} for c in chunk], None, False
+
+    # Read through __dict__ so the staticmethod wrapper is what gets restored
+    original_post = courtlistener_integration._post_citation_chunk
+    original_delay = courtlistener_integration.RateLimitScheduler.__dict__['retry_delay']
+    courtlistener_integration._post_citation_chunk = flaky_chunk
+    courtlistener_integration.RateLimitScheduler.retry_delay = staticmethod(lambda attempt: 0)
+    try:
+        lookup = lookup_citations_batch(['410 U.S. 113', '93 S. Ct. 705', '1 F.3d 1'], 'test-key', max_citations=1)
+    finally:
+        courtlistener_integration._post_citation_chunk = original_post
+        courtlistener_integration.RateLimitScheduler.retry_delay = original_delay
+
+    print(f"Chunks sent: {sent}")
+    assert sorted(map(tuple, sent)) == [('1 F.3d 1',), ('410 U.S. 113',), ('93 S. Ct. 705',), ('93 S. Ct. 705',)]
+    assert lookup['failed'] == []
+    assert len(lookup['items']) == 3
+
+def test_non_json_response_is_a_chunk_error():
+    """Test that an HTML page with status 200 is reported as a failed chunk instead of raising."""
+    print("Testing a non-JSON response")
+
+    original = courtlistener_integration.get_session
+    courtlistener_integration.get_session = lambda upstream: FakeSession(FakeResponse(200, '<html>Proxy error</html>'))
+    try:
+        items, error, rate_limited = _post_citation_chunk(['410 U.S. 113'], 'test-key')
+    finally:
+        courtlistener_integration.get_session = original
+
+    print(f"Chunk error: {error}")
+    assert items is None and error.startswith('Invalid JSON response') and not rate_limited
+
+def test_chunk_is_not_sent_after_the_deadline():
+    """Test that a chunk still waiting for a rate-limit token at the deadline is dropped instead of sent."""
+    print("Testing a chunk that outlives the lookup deadline")
+
+    class CountingSession:
+        posts = 0
+
+        def post(self, *args, **kwargs):
+            CountingSession.posts += 1
+            return FakeResponse(200, '[]')
+
+    class ExhaustedScheduler:
+        def acquire(self, priority, timeout=None):
+            time.sleep(timeout or 0)
+            return False
+
+    original_session = courtlistener_integration.get_session
+    original_scheduler = courtlistener_integration.get_scheduler
+    courtlistener_integration.get_session = lambda upstream: CountingSession()
+    courtlistener_integration.get_scheduler = lambda api_key: ExhaustedScheduler()
+    try:
+        items, error, rate_limited = _post_citation_chunk(['410 U.S. 113'], 'test-key', deadline=time.time() + 0.1)
+    finally:
+        courtlistener_integration.get_session = original_session
+        courtlistener_integration.get_scheduler = original_scheduler
+
+    print(f"Chunk error: {error}")
+    assert items is None and error == 'Lookup deadline reached' and not rate_limited
+    assert CountingSession.posts == 0
+
+if __name__ == "__main__":
+    test_chunk_citations()
+    test_only_failed_chunks_are_retried()
+    test_non_json_response_is_a_chunk_error()
+    test_chunk_is_not_sent_after_the_deadline()
+    print("All citation lookup batch tests passed")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Test script for citation and case name normalization
+"""
+from citation_normalization import (
+    parse_citation, canonical_citation, citation_key, normalize_case_name, normalize_westlaw_citation
+)
+from citation_verification import CitationVerifier
+
+def test_citation_spellings_share_a_key():
+    """Test that reporter variations, spacing and punctuation all normalize to the same citation."""
+    print("Testing citation normalization")
+
+    spellings = ['196 Wn.2d 725', '196 Wash.2d 725', '196 Wash. 2d 725', ' 196  wash. 2d 725 ']
+    print(f"Canonical forms: {[canonical_citation(c) for c in spellings]}")
+    assert {canonical_citation(c) for c in spellings} == {'196 Wash. 2d 725'}
+    assert len({citation_key(c) for c in spellings}) == 1
+
+    assert parse_citation('See Roe v. Wade, 410 U. S. 113 (1973)') == ('410', 'U.S.', '113')
+    assert parse_citation('123 Wash. App. 45').reporter == 'Wash. App.'
+    assert parse_citation('12 Foo Rptr. 3').reporter == 'Foo Rptr.'
+    assert parse_citation('Roe v. Wade') is None
+
+    assert citation_key('93 S.Ct. 705') == citation_key(' 93 S. Ct.  705 ') == '93 s.ct. 705'
+    assert normalize_westlaw_citation('2018 W.L. 3037217') == '2018 WL 3037217'
+    assert citation_key('2018 W. L. 3037217') == '2018 wl 3037217'
+
+    assert normalize_case_name("State v. Arlene's Flowers, Inc.") == 'arlenes flowers inc'
+
+    # The verifier formats and parses citations the same way
+    verifier = CitationVerifier()
+    assert verifier._format_citation_for_courtlistener('196 Wn.2d 725') == '196 Wash. 2d 725'
+    # Pin cites and other text around the citation are kept
+    assert verifier._format_citation_for_courtlistener('196 Wn.2d 725, 730 (2020)') == '196 Wash. 2d 725, 730 (2020)'
+    assert verifier._format_citation_for_courtlistener('See 2018 W.L. 3037217, at *2') == 'See 2018 WL 3037217, at *2'
+    assert verifier._format_citation_for_courtlistener('Roe v. Wade') == 'Roe v. Wade'
+    assert verifier._extract_citation_parts('196 Wash. 2d 725') == {'volume': '196', 'reporter': 'Wash. 2d', 'page': '725'}
+
+if __name__ == "__main__":
+    test_citation_spellings_share_a_key()
+    print("All citation normalization tests passed")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script for the extracted document text cache
+"""
+import os
+import time
+import tempfile
+from document_cache import DocumentCache, hash_file
+from paged_text import PagedText
+
+def test_document_cache():
+    """Test content hashing, page preservation and size-bounded eviction."""
+    print("Testing document text cache")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'brief.pdf')
+        with open(path, 'wb') as f:
+            f.write(b'%PDF-1.4 brief')
+        copy_path = os.path.join(temp_dir, 'renamed.pdf')
+        with open(copy_path, 'wb') as f:
+            f.write(b'%PDF-1.4 brief')
+
+        # The same content under another name has the same key
+        key = hash_file(path)
+        assert key == hash_file(copy_path)
+        assert len(key) == 64
+
+        cache = DocumentCache(db_path=os.path.join(temp_dir, 'documents.db'), max_bytes=6000)
+        assert cache.get(key) is None
+
+        # Page boundaries survive the round trip
+        text = PagedText(['See Roe v. Wade, 410 U.S. 113.', 'Planned Parenthood v. Casey, 505 U.S. 833.'])
+        cache.set(key, text)
+        cached = cache.get(key)
+        print(f"Cached text: {cached!r}")
+        assert cached == text
+        assert cached.page_count == 2
+        assert cached.page_for_offset(cached.index('505 U.S. 833')) == 2
+
+        # Plain text (e.g. from a DOCX) is cached as is
+        cache.set('docx', 'Brown v. Board, 347 U.S. 483.')
+        assert cache.get('docx') == 'Brown v. Board, 347 U.S. 483.'
+        assert not hasattr(cache.get('docx'), 'pages')
+
+        # Least recently used documents go first once the cache is over its size
+        time.sleep(0.01)
+        cache.get(key)
+        for i in range(3):
+            cache.set(f'large{i}', os.urandom(2500).hex())
+        print(f"Cache holds {len(cache)} documents in {cache.size()} bytes")
+        assert cache.size() <= cache.max_bytes
+        assert cache.get('docx') is None
+        assert cache.get('large2') is not None
+
+if __name__ == "__main__":
+    test_document_cache()
+    print("All document cache tests passed")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test script for the document extraction worker pool
+"""
+import os
+import time
+import tempfile
+import docx
+import PyPDF2
+from extraction_pool import ExtractionPool, ExtractionError, ExtractionTimeout
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'gov.uscourts.wyd.64014.141.0_1.pdf')
+
+def test_docx_extraction():
+    """Test that DOCX files are extracted in a worker process."""
+    print("Testing DOCX extraction in worker")
+    pool = ExtractionPool(workers=1)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'brief.docx')
+        document = docx.Document()
+        document.add_paragraph('See Roe v. Wade, 410 U.S. 113 (1973).')
+        document.save(path)
+
+        text = pool.extract('docx', path)
+        print(f"Extracted: {text!r}")
+        assert '410 U.S. 113' in text
+
+        # Missing files come back as an error string, like the extractors return
+        assert pool.extract('docx', os.path.join(temp_dir, 'missing.docx')).startswith('Error:')
+    pool.close()
+
+def test_timeout_kills_worker():
+    """Test that a worker that runs past its timeout is killed and replaced."""
+    print("Testing extraction timeout")
+    pool = ExtractionPool(workers=1)
+
+    start = time.time()
+    try:
+        pool.extract('pdf', SAMPLE_PDF, timeout=0.01)
+        assert False, "Expected the extraction to time out"
+    except ExtractionTimeout as e:
+        print(f"Timed out: {e}")
+    assert time.time() - start < 5
+
+    # The next document gets a fresh worker
+    text = pool.extract('pdf', SAMPLE_PDF)
+    print(f"Extracted {len(text)} characters after the timeout")
+    assert text and not text.startswith('Error:')
+    pool.close()
+
+def test_document_deadline():
+    """Test that a PDF whose pages each arrive within the timeout is still stopped at the document's deadline."""
+    print("Testing the per-document extraction deadline")
+    pool = ExtractionPool(workers=1, timeout=5, document_timeout=0.5)
+
+    def probe(kind, file_path, *args, timeout=None):
+        return {'page_count': 1000, 'readable': True, 'text_layer': True, 'pages_with_fonts': 1,
+                'sampled_pages': [0], 'extractors': {'pdfminer': {'seconds': 0.1, 'words': 100}}}
+
+    def slow_pages(kind, file_path, *args, timeout=None, deadline=None, on_start=None):
+        on_start()
+        while True:
+            time.sleep(0.1)
+            yield 'page text'
+
+    pool.extract = probe
+    pool.stream = slow_pages
+    pages = []
+    start = time.time()
+    try:
+        for page in pool.iter_pdf_pages(SAMPLE_PDF):
+            pages.append(page)
+        assert False, "Expected the document deadline to stop the extraction"
+    except ExtractionTimeout as e:
+        print(f"Stopped after {len(pages)} pages: {e}")
+    assert time.time() - start < 2
+    assert 0 < len(pages) < 1000
+
+    # The deadline also applies inside a worker's stream
+    pool = ExtractionPool(workers=1)
+    try:
+        list(pool.iter_pdf_pages(SAMPLE_PDF, deadline=time.time() + 0.05))
+        assert False, "Expected the document deadline to stop the extraction"
+    except ExtractionTimeout as e:
+        print(f"Stopped: {e}")
+    pool.close()
+
+def test_waiting_for_a_worker_is_not_a_page_timeout():
+    """Test that the page timeout starts when a worker picks a range up, not while the range waits for one."""
+    print("Testing the page timeout while all workers are busy")
+    pool = ExtractionPool(workers=2, timeout=0.2, document_timeout=5)
+
+    def probe(kind, file_path, *args, timeout=None):
+        return {'page_count': 20, 'readable': True, 'text_layer': True, 'pages_with_fonts': 1,
+                'sampled_pages': [0], 'extractors': {'pdfminer': {'seconds': 0.1, 'words': 100}}}
+
+    def busy_pool_pages(kind, file_path, first, last, extractor, timeout=None, deadline=None, on_start=None):
+        time.sleep(0.5)  # Every worker is busy with another document
+        on_start()
+        for _ in range(first, last):
+            yield 'page text'
+
+    pool.extract = probe
+    pool.stream = busy_pool_pages
+    pages = list(pool.iter_pdf_pages(SAMPLE_PDF))
+    print(f"Extracted {len(pages)} pages after waiting for a worker")
+    assert len(pages) == 20
+
+    # Once a worker has the range, a slow page still times out
+    def slow_pages(kind, file_path, first, last, extractor, timeout=None, deadline=None, on_start=None):
+        on_start()
+        time.sleep(0.5)
+        yield 'page text'
+
+    pool.stream = slow_pages
+    try:
+        list(pool.iter_pdf_pages(SAMPLE_PDF))
+        assert False, "Expected the page timeout to stop the extraction"
+    except ExtractionTimeout as e:
+        print(f"Timed out: {e}")
+
+def test_memory_limit():
+    """Test that a worker that runs out of memory reports an error and is replaced."""
+    if os.name == 'nt':
+        print("Memory limits are not enforced on Windows, skipping")
+        return
+    pool = ExtractionPool(workers=1, memory_limit_mb=16)
+    try:
+        pool.extract('pdf', SAMPLE_PDF)
+        assert False, "Expected the memory limit to stop the extraction"
+    except ExtractionError as e:
+        print(f"Stopped: {e}")
+    pool.close()
+
+def test_probe_fast_paths():
+    """Test that scanned and password-protected PDFs fail without running the page extractors."""
+    print("Testing PDF probe fast paths")
+    pool = ExtractionPool(workers=1)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Blank pages have no fonts or text, like a scan
+        scanned = os.path.join(temp_dir, 'scanned.pdf')
+        writer = PyPDF2.PdfWriter()
+        writer.add_blank_page(612, 792)
+        with open(scanned, 'wb') as f:
+            writer.write(f)
+
+        protected = os.path.join(temp_dir, 'protected.pdf')
+        writer = PyPDF2.PdfWriter()
+        for page in PyPDF2.PdfReader(SAMPLE_PDF).pages:
+            writer.add_page(page)
+        writer.encrypt('secret')
+        with open(protected, 'wb') as f:
+            writer.write(f)
+
+        for path in (scanned, protected):
+            pages = list(pool.iter_pdf_pages(path))
+            print(f"{os.path.basename(path)}: {pages}")
+            assert len(pages) == 1 and pages[0][0] is None and pages[0][1].startswith('Error:')
+
+        # Nothing was extracted page by page
+        assert pool.extractor_stats.snapshot() == {}
+
+        # A readable PDF is extracted page by page and counted in the stats
+        pages = list(pool.iter_pdf_pages(SAMPLE_PDF))
+        stats = pool.extractor_stats.snapshot()
+        print(f"Extractor stats: {stats}")
+        assert stats['pdfminer']['pages'] == len(pages)
+    pool.close()
+
+if __name__ == "__main__":
+    test_docx_extraction()
+    test_timeout_kills_worker()
+    test_document_deadline()
+    test_waiting_for_a_worker_is_not_a_page_timeout()
+    test_memory_limit()
+    test_probe_fast_paths()
+    print("All extraction pool tests passed")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared eyecite tokenizer
+"""
+from eyecite import get_citations
+from eyecite.tokenizers import AhocorasickTokenizer
+import eyecite_tokenizer
+
+def test_falls_back_to_ahocorasick():
+    """Test that a Hyperscan failure falls back to Aho-Corasick once and is not retried."""
+    print("Testing the Aho-Corasick fallback")
+
+    attempts = []
+    def failing_build():
+        attempts.append(1)
+        raise RuntimeError("hyperscan database failed to compile")
+
+    original_build, original_use = eyecite_tokenizer._build_hyperscan_tokenizer, eyecite_tokenizer.USE_HYPERSCAN
+    eyecite_tokenizer._build_hyperscan_tokenizer = failing_build
+    eyecite_tokenizer.USE_HYPERSCAN = True
+    try:
+        eyecite_tokenizer.reset_tokenizer()
+        tokenizer = eyecite_tokenizer.get_tokenizer()
+        assert isinstance(tokenizer, AhocorasickTokenizer)
+
+        # Shared, and the failed Hyperscan build isn't attempted again
+        assert eyecite_tokenizer.get_tokenizer() is tokenizer
+        eyecite_tokenizer._tokenizer = None
+        eyecite_tokenizer.get_tokenizer()
+        assert len(attempts) == 1
+
+        citations = get_citations('See Roe v. Wade, 410 U.S. 113 (1973).', tokenizer=tokenizer)
+        assert [c.corrected_citation() for c in citations] == ['410 U.S. 113']
+    finally:
+        eyecite_tokenizer._build_hyperscan_tokenizer = original_build
+        eyecite_tokenizer.USE_HYPERSCAN = original_use
+        eyecite_tokenizer.reset_tokenizer()
+
+if __name__ == "__main__":
+    test_falls_back_to_ahocorasick()
+    print("All eyecite tokenizer tests passed")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared HTTP client
+"""
+import asyncio
+from http_client import get_session, close_sessions, run_sync, UPSTREAM_SETTINGS
+
+async def answer(value):
+    await asyncio.sleep(0.01)
+    return value
+
+def test_sessions_are_shared_per_upstream():
+    """Test that every caller gets the same pooled session for an upstream, and a different one per upstream."""
+    print("Testing pooled sessions")
+
+    courtlistener = get_session('courtlistener')
+    assert get_session('courtlistener') is courtlistener
+    assert get_session('langsearch') is not courtlistener
+
+    adapter = courtlistener.get_adapter('https://www.courtlistener.com/')
+    assert adapter._pool_maxsize == UPSTREAM_SETTINGS['courtlistener']['pool_maxsize']
+    assert adapter.timeout == UPSTREAM_SETTINGS['courtlistener']['timeout']
+    # Read timeouts are retried by the callers, not by the transport as well
+    assert adapter.max_retries.read == 0
+
+    # A closed session is replaced by a new one
+    close_sessions('courtlistener')
+    assert get_session('courtlistener') is not courtlistener
+
+def test_run_sync():
+    """Test run_sync() from plain code, from inside another running event loop, and its guard on the shared loop."""
+    print("Testing run_sync")
+
+    assert run_sync(answer(1)) == 1
+
+    async def called_from_a_running_loop():
+        return run_sync(answer(2))
+    assert asyncio.run(called_from_a_running_loop()) == 2
+
+    async def called_from_the_shared_loop():
+        return run_sync(answer(3))
+    try:
+        run_sync(called_from_the_shared_loop())
+        assert False, "run_sync() on its own loop should raise instead of deadlocking"
+    except RuntimeError as e:
+        print(f"Raised as expected: {e}")
+
+if __name__ == "__main__":
+    test_sessions_are_shared_per_upstream()
+    test_run_sync()
+    print("All HTTP client tests passed")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental (page-by-page) citation extraction
+"""
+from incremental_citations import IncrementalCitationExtractor
+
+PAGES = [
+    "The Court decided Roe v. Wade, 410 U.S. 113 (1973), and later Planned Parenthood v. Casey, 505",
+    "U.S. 833 (1992). See also Brown v. Board of Education, 347 U.S. 483 (1954).",
+    "As held in Roe, 410 U.S. 113, the right is fundamental."
+]
+
+def test_citation_split_across_pages():
+    """Test that a citation split by a page break is found once, on the page it starts on."""
+    print("Testing incremental citation extraction")
+    extractor = IncrementalCitationExtractor()
+    reported = []
+    for page_number, text in enumerate(PAGES, 1):
+        new_citations = extractor.feed(text, page_number)
+        print(f"Page {page_number}: {new_citations}")
+        reported.extend(new_citations)
+    reported.extend(extractor.finish())
+
+    print(f"Citations: {reported}, pages: {extractor.pages}")
+    assert reported == ['410 U.S. 113', '505 U.S. 833', '347 U.S. 483']
+    assert reported == extractor.citations
+    assert extractor.pages['505 U.S. 833'] == [1]
+    assert extractor.pages['410 U.S. 113'] == [1, 3]
+
+def test_citations_reported_early():
+    """Test that citations well before the end of a page are reported without waiting for the next page."""
+    extractor = IncrementalCitationExtractor(carry_over=20)
+    first_page = "Roe v. Wade, 410 U.S. 113 (1973). " + "Discussion continues. " * 10
+    assert extractor.feed(first_page, 1) == ['410 U.S. 113']
+    assert extractor.finish() == []
+
+if __name__ == "__main__":
+    test_citation_split_across_pages()
+    test_citations_reported_early()
+    print("All incremental citation tests passed")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded analysis job queue
+"""
+import time
+import threading
+from job_queue import JobQueue, QueueFullError
+
+def test_queue_bounds_and_positions():
+    """Test that a full queue rejects jobs with 503 and a per-user limit with 429."""
+    print("Testing job queue bounds")
+    release = threading.Event()
+    queue = JobQueue(workers=1, max_queued=3, max_queued_per_user=2)
+
+    queue.submit('running', release.wait, user='alice')
+    time.sleep(0.1)  # Let the worker pick up the first job
+    assert queue.position('running') is None
+
+    assert queue.submit('a1', release.wait, user='alice') == 1
+    assert queue.submit('a2', release.wait, user='alice') == 2
+    try:
+        queue.submit('a3', release.wait, user='alice')
+        assert False, "Expected the per-user limit to be enforced"
+    except QueueFullError as e:
+        print(f"Rejected: {e} (status {e.status_code}, retry after {e.retry_after}s)")
+        assert e.status_code == 429 and e.retry_after >= 1
+
+    # Bob's first job is served before Alice's second
+    assert queue.submit('b1', release.wait, user='bob') == 2
+    assert queue.position('a2') == 3
+    try:
+        queue.submit('c1', release.wait, user='carol')
+        assert False, "Expected the queue bound to be enforced"
+    except QueueFullError as e:
+        assert e.status_code == 503
+
+    release.set()
+    queue.shutdown()
+
+def test_round_robin_order():
+    """Test that workers take jobs from each user in turn."""
+    order = []
+    lock = threading.Lock()
+    release = threading.Event()
+    queue = JobQueue(workers=1, max_queued=10, max_queued_per_user=10)
+
+    queue.submit('blocker', release.wait)
+    time.sleep(0.1)
+    for name, user in [('a1', 'a'), ('a2', 'a'), ('a3', 'a'), ('b1', 'b'), ('b2', 'b')]:
+        queue.submit(name, lambda name=name: order.append(name), user=user)
+
+    release.set()
+    deadline = time.time() + 5
+    while len(order) < 5 and time.time() < deadline:
+        time.sleep(0.01)
+    print(f"Run order: {order}")
+    assert order == ['a1', 'b1', 'a2', 'b2', 'a3']
+    assert queue.stats()['queued'] == 0
+    queue.shutdown()
+
+if __name__ == "__main__":
+    test_queue_bounds_and_positions()
+    test_round_robin_order()
+    print("All job queue tests passed")
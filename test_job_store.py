@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the analysis job stores
+"""
+import os
+import time
+import tempfile
+from job_store import MemoryJobStore, SQLiteJobStore
+
+def check_job_store(store):
+    """Run the same checks against any job store backend."""
+    store.create('job-1', {'status': 'running', 'progress': 0, 'completed': False, 'citation_results': []})
+    store.update('job-1', progress=2, message='Extracting citations')
+    store.append_result('job-1', {'citation_text': '410 U.S. 113'})
+    store.append_result('job-1', {'citation_text': '93 S. Ct. 705'})
+
+    job = store.get('job-1')
+    print(f"Job state: {job}")
+    assert job['progress'] == 2 and job['message'] == 'Extracting citations'
+    assert [r['citation_text'] for r in job['citation_results']] == ['410 U.S. 113', '93 S. Ct. 705']
+
+    # Snapshots are independent of the stored job
+    job['citation_results'].clear()
+    assert len(store.get('job-1')['citation_results']) == 2
+
+    store.set_results('job-1', [{'primary_citation': '410 U.S. 113'}])
+    assert store.get('job-1')['citation_results'] == [{'primary_citation': '410 U.S. 113'}]
+
+    # Every change is recorded as an event, and clients can resume after any event ID
+    store.update('job-1', status='complete', completed=True)
+    events = store.get_events('job-1')
+    print(f"Job events: {[event['event'] for event in events]}")
+    assert [event['event'] for event in events] == ['progress', 'progress', 'result', 'result', 'results', 'complete']
+    assert [event['id'] for event in events] == list(range(1, 7))
+    assert events[3]['data'] == {'index': 1, 'result': {'citation_text': '93 S. Ct. 705'}}
+    assert store.get_events('job-1', since=4) == events[4:]
+    assert store.get('job-1')['cursor'] == 6
+    assert store.wait_for_events('job-1', since=6, timeout=0.1) == []
+    assert store.get_events('missing') is None
+
+    # Results for a job that doesn't exist (e.g. one that expired mid-analysis) are dropped
+    store.append_result('missing', {'citation_text': '1 F.3d 1'})
+    store.set_results('missing', [{'primary_citation': '1 F.3d 1'}])
+    assert store.get('missing') is None and store.get_events('missing') is None
+
+    # Finished jobs expire after the TTL
+    assert store.get('job-1')['finished_at'] is not None
+    time.sleep(1.1)
+    assert store.get('job-1') is None
+    assert store.get('missing') is None
+
+def test_memory_job_store():
+    """Test the in-memory backend, including LRU eviction."""
+    print("Testing memory job store")
+    check_job_store(MemoryJobStore(ttl=1))
+
+    store = MemoryJobStore(max_jobs=2)
+    store.create('running', {'completed': False})
+    store.create('finished', {'completed': True})
+    store.create('new', {'completed': False})
+    # The finished job is evicted before any running one
+    assert store.get('finished') is None
+    assert store.get('running') is not None and store.get('new') is not None
+
+    # Only the latest events are kept; a client that fell behind catches up from the results
+    store = MemoryJobStore(max_events=3)
+    store.create('job', {'completed': False})
+    for number in range(1, 6):
+        store.append_result('job', {'citation_text': f'{number} F.3d 1'})
+    events = store.get_events('job')
+    print(f"Events after the cap: {events}")
+    assert [event['id'] for event in events] == [3, 4, 5, 6]
+    assert events[0] == {'id': 3, 'event': 'results',
+                         'data': {'results': [{'citation_text': '1 F.3d 1'}, {'citation_text': '2 F.3d 1'}]}}
+    assert store.get_events('job', since=4) == events[2:]
+    assert store.get('job')['cursor'] == 6
+    assert store.wait_for_events('job', since=6, timeout=0.1) == []
+
+def test_sqlite_job_store():
+    """Test the SQLite backend, including sharing between store instances."""
+    print("Testing SQLite job store")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'jobs.db')
+        store = SQLiteJobStore(db_path=db_path, ttl=1)
+        check_job_store(store)
+        # No result or event rows are left behind for jobs that are gone
+        assert store._conn.execute('SELECT COUNT(*) FROM job_results').fetchone() == (0,)
+        assert store._conn.execute('SELECT COUNT(*) FROM job_events').fetchone() == (0,)
+
+        # A second store on the same file (like a second server process) sees the job
+        SQLiteJobStore(db_path=db_path).create('shared', {'status': 'running'})
+        assert SQLiteJobStore(db_path=db_path).get('shared')['status'] == 'running'
+
+if __name__ == "__main__":
+    test_memory_job_store()
+    test_sqlite_job_store()
+    print("All job store tests passed")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for queued logging and per-analysis debug artifacts
+"""
+import os
+import json
+import logging
+import tempfile
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from logging_config import configure_logging, analysis_context, write_debug_artifact
+
+def test_analysis_logging():
+    """Test that records are tagged with their analysis, also from worker threads, and artifacts are opt-in."""
+    print("Testing analysis logging")
+    logger = logging.getLogger('test_logging_config')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_file = os.path.join(temp_dir, 'casestrainer.log')
+        artifacts_dir = os.path.join(temp_dir, 'artifacts')
+
+        configure_logging('INFO', 'json', log_file, debug_artifacts_dir='')
+        assert write_debug_artifact('api_response.json', {'found': True}) is None
+
+        configure_logging('INFO', 'json', log_file, debug_artifacts_dir=artifacts_dir)
+        with analysis_context('abc123'):
+            logger.info("Found %s citations", 3)
+            logger.debug("Not logged at INFO: %s", 'details')
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(contextvars.copy_context().run, logger.warning, "From a worker thread").result()
+            path = write_debug_artifact('api_response.json', {'found': True})
+        logger.info("Outside any analysis")
+
+        # Reconfiguring stops the listener, which writes out everything still queued
+        configure_logging('WARNING', 'text', debug_artifacts_dir='')
+
+        with open(log_file, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        print(f"Logged: {records}")
+        assert [(r['analysis_id'], r['message']) for r in records] == [
+            ('abc123', 'Found 3 citations'),
+            ('abc123', 'From a worker thread'),
+            ('-', 'Outside any analysis')
+        ]
+
+        assert path == os.path.join(artifacts_dir, 'abc123', 'api_response.json')
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f) == {'found': True}
+
+if __name__ == "__main__":
+    test_analysis_logging()
+    print("All logging tests passed")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script for page-indexed text and page-parallel PDF extraction
+"""
+import os
+import pickle
+from paged_text import PagedText
+from extraction_pool import ExtractionPool
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', '998655_COA_99865-5_Appellant_Brief.pdf')
+
+def test_page_offsets():
+    """Test that offsets in the joined text map back to their pages."""
+    text = PagedText(['Page one.', '', 'See 410 U.S. 113 here.'])
+    print(f"Text: {text!r}, offsets: {text.page_offsets}")
+    assert isinstance(text, str) and text.page_count == 3
+    assert text.page_for_offset(0) == 1
+    assert text.page_for_offset(text.index('410 U.S.')) == 3
+    assert text.page_text(3) == 'See 410 U.S. 113 here.'
+    assert text.page_for_offset(len(text) + 1) is None
+
+    copy = pickle.loads(pickle.dumps(text))
+    assert copy == text and copy.page_offsets == text.page_offsets
+
+def test_parallel_pdf_extraction():
+    """Test that a PDF split into page ranges is stitched back in page order."""
+    print("Testing page-parallel PDF extraction")
+    pool = ExtractionPool(workers=3)
+    text = pool.extract_pdf_pages(SAMPLE_PDF)
+    sequential = pool.extract('pdf_pages', SAMPLE_PDF, 0, text.page_count)
+    print(f"Extracted {len(text)} characters from {text.page_count} pages")
+
+    assert len(pool._page_ranges(text.page_count)) > 1
+    assert text.pages == sequential
+
+    # Streaming yields the same pages, numbered and in order
+    streamed = list(pool.iter_pdf_pages(SAMPLE_PDF))
+    assert [page_number for page_number, _ in streamed] == list(range(1, text.page_count + 1))
+    assert [page for _, page in streamed] == sequential
+    for page_number in range(1, text.page_count + 1):
+        offset = text.page_offsets[page_number - 1]
+        assert text.page_for_offset(offset) == page_number
+    pool.close()
+
+if __name__ == "__main__":
+    test_page_offsets()
+    test_parallel_pdf_extraction()
+    print("All paged text tests passed")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script for PDF extractor selection
+"""
+from pdf_extractor_selection import ExtractorStats, choose_pdf_extractor, MIN_RUNS
+
+def make_probe(pdfminer_seconds, pypdf2_seconds, pdfminer_words=300, pypdf2_words=300):
+    return {
+        'page_count': 40,
+        'readable': True,
+        'text_layer': pdfminer_words > 0 or pypdf2_words > 0,
+        'pages_with_fonts': 3,
+        'sampled_pages': [0, 20, 39],
+        'extractors': {
+            'pdfminer': {'seconds': pdfminer_seconds, 'words': pdfminer_words},
+            'pypdf2': {'seconds': pypdf2_seconds, 'words': pypdf2_words}
+        }
+    }
+
+def test_choose_pdf_extractor():
+    """Test that pdfminer is preferred unless it can't read the text or is much slower."""
+    print("Testing PDF extractor selection")
+
+    # Similar text: pdfminer, even though PyPDF2 is a little faster
+    assert choose_pdf_extractor(make_probe(0.3, 0.1)) == 'pdfminer'
+
+    # pdfminer misses most of the text
+    assert choose_pdf_extractor(make_probe(0.3, 0.1, pdfminer_words=20)) == 'pypdf2'
+
+    # pdfminer takes seconds per page on this document
+    assert choose_pdf_extractor(make_probe(9.0, 0.3)) == 'pypdf2'
+
+    # No text layer, or can't be decrypted
+    assert choose_pdf_extractor(make_probe(0.3, 0.1, pdfminer_words=0, pypdf2_words=0)) is None
+    assert choose_pdf_extractor({'readable': False}) is None
+
+def test_stats_move_the_choice():
+    """Test that an extractor that keeps failing on whole documents is avoided."""
+    stats = ExtractorStats()
+    for _ in range(MIN_RUNS - 1):
+        stats.record('pdfminer', seconds=10, pages=10, pages_with_text=1)
+    assert stats.success_rate('pdfminer') is None
+    assert choose_pdf_extractor(make_probe(0.3, 0.1), stats) == 'pdfminer'
+
+    stats.record('pdfminer', seconds=10, pages=10, pages_with_text=1)
+    print(f"pdfminer success rate: {stats.success_rate('pdfminer')}")
+    assert stats.success_rate('pdfminer') == 0.1
+    assert choose_pdf_extractor(make_probe(0.3, 0.1), stats) == 'pypdf2'
+
+if __name__ == "__main__":
+    test_choose_pdf_extractor()
+    test_stats_move_the_choice()
+    print("All PDF extractor selection tests passed")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared API rate limiter
+"""
+import time
+import threading
+from rate_limiter import RateLimitScheduler, get_scheduler, parse_retry_after, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+
+def test_priority_order():
+    """Test that queued interactive requests are released before batch requests."""
+    print("Testing rate limiter priority order")
+
+    scheduler = RateLimitScheduler(rate=20, burst=1)
+    scheduler.acquire()  # Use up the only token so the next requests have to queue
+
+    order = []
+    def request(name, priority):
+        scheduler.acquire(priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=request, args=('batch', PRIORITY_BATCH))]
+    threads[0].start()
+    time.sleep(0.01)
+    threads.append(threading.Thread(target=request, args=('interactive', PRIORITY_INTERACTIVE)))
+    threads[1].start()
+    for thread in threads:
+        thread.join()
+
+    print(f"Release order: {order}")
+    assert order == ['interactive', 'batch']
+
+def test_rate_limit_pause():
+    """Test that a 429 pauses every request on the key for the Retry-After period."""
+    scheduler = RateLimitScheduler(rate=100, burst=10)
+    scheduler.report_rate_limited(0.3)
+
+    start = time.time()
+    assert scheduler.acquire(timeout=0.05) is False
+    assert scheduler.acquire() is True
+    elapsed = time.time() - start
+    print(f"Request released after {elapsed:.2f} seconds")
+    assert elapsed >= 0.25
+
+    scheduler.report_success()
+    assert scheduler.consecutive_rate_limits == 0
+    assert scheduler.retry_delay(10) <= 8
+
+def test_shared_scheduler():
+    """Test that each API key gets exactly one scheduler."""
+    assert get_scheduler('key-a') is get_scheduler('key-a')
+    assert get_scheduler('key-a') is not get_scheduler('key-b')
+    assert parse_retry_after('12') == 12
+    assert parse_retry_after('not a date') is None
+    assert parse_retry_after(None) is None
+
+if __name__ == "__main__":
+    test_priority_order()
+    test_rate_limit_pause()
+    test_shared_scheduler()
+    print("All rate limiter tests passed")
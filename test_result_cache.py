@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test script for the analysis result cache
+"""
+import os
+import time
+import tempfile
+from result_cache import ResultCache, citations_to_revalidate
+
+def test_result_cache():
+    """Test that results are keyed by document and settings, and which citations get re-checked."""
+    print("Testing analysis result cache")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = ResultCache(db_path=os.path.join(temp_dir, 'results.db'), max_entries=10)
+        settings = {'courtlistener': True, 'grouping': 'url_then_name'}
+        entry = {
+            'citations': ['410 U.S. 113', '999 F.3d 999', '2016 WL 165971'],
+            'citation_results': [
+                {'citation_text': '410 U.S. 113', 'is_hallucinated': False,
+                 'court_listener_url': 'https://www.courtlistener.com/opinion/108713/roe-v-wade/'},
+                {'citation_text': '999 F.3d 999', 'is_hallucinated': True},
+                {'citation_text': '2016 WL 165971', 'is_hallucinated': False, 'hallucination_status': 'unconfirmed'}
+            ],
+            'results': [],
+            'summary': {},
+            'message': 'Analysis complete.'
+        }
+        cache.set('abc123', settings, entry)
+
+        cached = cache.get('abc123', settings)
+        assert cached['citations'] == entry['citations']
+        assert cache.get('abc123', {'courtlistener': False, 'grouping': 'url_then_name'}) is None
+        assert cache.get('def456', settings) is None
+
+        # Fresh entries only re-check citations that couldn't be verified in time
+        assert citations_to_revalidate(cached, revalidate_after=3600) == [2]
+
+        # Old entries also re-check everything CourtListener hasn't confirmed
+        cache.set('abc123', settings, entry, created_at=time.time() - 7200)
+        stale = cache.get('abc123', settings)
+        print(f"Citations to re-check: {citations_to_revalidate(stale, revalidate_after=3600)}")
+        assert citations_to_revalidate(stale, revalidate_after=3600) == [1, 2]
+
+if __name__ == "__main__":
+    test_result_cache()
+    print("All result cache tests passed")
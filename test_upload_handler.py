@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming upload handling
+"""
+import io
+import os
+import hashlib
+import tempfile
+from flask import Flask, request, jsonify
+from upload_handler import create_upload_request_class
+
+def make_app(upload_folder, max_file_bytes):
+    app = Flask(__name__)
+    app.request_class = create_upload_request_class(upload_folder, max_file_bytes)
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        upload = request.files['file'].stream
+        if request.form.get('keep'):
+            upload.keep(os.path.join(upload_folder, 'kept.pdf'))
+        return jsonify({'sha256': upload.sha256, 'size': upload.size})
+
+    return app
+
+def test_streaming_upload():
+    """Test that uploads are hashed while streaming, size-limited, and cleaned up unless kept."""
+    print("Testing streaming uploads")
+    content = os.urandom(300 * 1024)
+
+    with tempfile.TemporaryDirectory() as upload_folder:
+        client = make_app(upload_folder, max_file_bytes=512 * 1024).test_client()
+
+        response = client.post('/upload', data={'file': (io.BytesIO(content), 'brief.pdf'), 'keep': '1'},
+                               content_type='multipart/form-data')
+        print(f"Upload response: {response.get_json()}")
+        assert response.get_json() == {'sha256': hashlib.sha256(content).hexdigest(), 'size': len(content)}
+        with open(os.path.join(upload_folder, 'kept.pdf'), 'rb') as f:
+            assert f.read() == content
+
+        # Uploads that aren't kept are removed when the request ends
+        response = client.post('/upload', data={'file': (io.BytesIO(content), 'brief.pdf')},
+                               content_type='multipart/form-data')
+        assert response.status_code == 200
+        assert os.listdir(upload_folder) == ['kept.pdf']
+
+        # Too large: rejected part way through, leaving nothing behind
+        response = client.post('/upload', data={'file': (io.BytesIO(content * 2), 'big.pdf')},
+                               content_type='multipart/form-data')
+        print(f"Oversized upload status: {response.status_code}")
+        assert response.status_code == 413
+        assert os.listdir(upload_folder) == ['kept.pdf']
+
+if __name__ == "__main__":
+    test_streaming_upload()
+    print("All upload handler tests passed")
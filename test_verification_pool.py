@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent citation verification
+"""
+import time
+import threading
+import courtlistener_integration
+from verification_pool import ProviderLimiter, verify_concurrently
+
+def test_deadline():
+    """Test that items unfinished at the deadline get their failure result without waiting for them."""
+    print("Testing the verification deadline")
+
+    def verify(item):
+        time.sleep(item)
+        return f"verified {item}"
+
+    published = []
+    start = time.time()
+    results = verify_concurrently(
+        [0, 5, 0],
+        verify,
+        on_result=lambda index, result: published.append(index),
+        on_failure=lambda item, reason: f"unverified {item}: {reason}",
+        max_workers=3,
+        deadline=time.time() + 0.5
+    )
+    elapsed = time.time() - start
+    print(f"Results after {elapsed:.2f}s: {results}")
+    assert elapsed < 2
+    assert results == ['verified 0', 'unverified 5: verification deadline reached', 'verified 0']
+    assert sorted(published) == [0, 1, 2]
+
+def test_provider_limit():
+    """Test that no more than a provider's limit of calls run at once."""
+    print("Testing provider concurrency limits")
+
+    limiter = ProviderLimiter({'langsearch': 2})
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def verify(item):
+        with limiter.slot('langsearch'):
+            with lock:
+                running.append(item)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(item)
+        return item
+
+    assert verify_concurrently(list(range(8)), verify, max_workers=8) == list(range(8))
+    print(f"Most calls at once: {max(peak)}")
+    assert max(peak) == 2
+
+def test_batch_lookup_deadline():
+    """Test that the CourtListener batch lookup gives up on chunks still in flight at the deadline."""
+    print("Testing the batch lookup deadline")
+
+    def slow_chunk(chunk, api_key, deadline=None):
+        time.sleep(5)
+        return [], None, False
+
+    original = courtlistener_integration._post_citation_chunk
+    courtlistener_integration._post_citation_chunk = slow_chunk
+    try:
+        start = time.time()
+        lookup = courtlistener_integration.lookup_citations_batch(
+            ['410 U.S. 113', '93 S. Ct. 705'], 'test-key', max_citations=1, deadline=time.time() + 0.3
+        )
+        elapsed = time.time() - start
+    finally:
+        courtlistener_integration._post_citation_chunk = original
+
+    print(f"Lookup after {elapsed:.2f}s: {lookup['failed']}, {lookup['errors']}")
+    assert elapsed < 2
+    assert sorted(lookup['failed']) == ['410 U.S. 113', '93 S. Ct. 705']
+
+if __name__ == "__main__":
+    test_deadline()
+    test_provider_limit()
+    test_batch_lookup_deadline()
+    print("All verification pool tests passed")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Streaming Upload Handling for CaseStrainer
+
+Werkzeug normally spools each uploaded file to a temporary file, which
+/analyze then copies into the upload folder and reads again to hash it.
+UploadRequest instead streams every uploaded file straight into a temporary
+file in the upload folder, in chunks, computing its SHA-256 as it is written
+and stopping with 413 Request Entity Too Large as soon as the file passes
+the size limit. /analyze then only has to rename the file into place.
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import List, Optional
+
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+
+class HashingUploadFile:
+    """Temporary file in the upload folder that hashes and counts what is written to it."""
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.name = tempfile.mkstemp(dir=directory, prefix='upload_', suffix='.part')
+        self._file = os.fdopen(fd, 'w+b')
+        self._sha256 = hashlib.sha256()
+        self._kept = False
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            self.close()
+            raise RequestEntityTooLarge(
+                f"File is too large: uploads are limited to {self.max_bytes // (1024 * 1024)} MB"
+            )
+        self._sha256.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of everything written so far."""
+        return self._sha256.hexdigest()
+
+    def keep(self, path: str) -> None:
+        """
+        Move the upload to its final path instead of deleting it on close.
+
+        Args:
+            path: Destination in the same folder (so the move is a rename)
+        """
+        self._file.close()
+        os.replace(self.name, path)
+        self.name = path
+        self._kept = True
+
+    def close(self) -> None:
+        """Close the file, deleting it unless keep() was called."""
+        if not self._file.closed:
+            self._file.close()
+        if not self._kept:
+            try:
+                os.remove(self.name)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def __getattr__(self, name):
+        # read(), seek(), tell(), flush() etc. go to the underlying file
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """
+    Request that streams uploaded files into the upload folder as HashingUploadFile objects.
+
+    Set upload_folder and max_file_bytes on a subclass (see create_upload_request_class()).
+    """
+
+    upload_folder = tempfile.gettempdir()
+    max_file_bytes: Optional[int] = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.max_file_bytes and content_length and content_length > self.max_file_bytes:
+            raise RequestEntityTooLarge(
+                f"File is too large: uploads are limited to {self.max_file_bytes // (1024 * 1024)} MB"
+            )
+        upload = HashingUploadFile(self.upload_folder, self.max_file_bytes)
+        self._uploads.append(upload)
+        return upload
+
+    @property
+    def _uploads(self) -> List[HashingUploadFile]:
+        if '_upload_files' not in self.__dict__:
+            self.__dict__['_upload_files'] = []
+        return self.__dict__['_upload_files']
+
+    def close(self) -> None:
+        # Also removes uploads whose request failed before they were parsed into request.files
+        try:
+            super().close()
+        finally:
+            for upload in self._uploads:
+                upload.close()
+
+
+def create_upload_request_class(upload_folder: str, max_file_bytes: Optional[int]) -> type:
+    """
+    Create the request class for a Flask app.
+
+    Args:
+        upload_folder: Folder uploads are streamed into
+        max_file_bytes: Largest file accepted, or None for no limit
+
+    Returns:
+        UploadRequest subclass to assign to app.request_class
+    """
+    return type('AppUploadRequest', (UploadRequest,), {
+        'upload_folder': upload_folder,
+        'max_file_bytes': max_file_bytes
+    })
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Concurrent Citation Verification for CaseStrainer
+
+This module verifies many citations at once with a bounded thread pool. Each
+upstream provider (LangSearch, CourtListener, ...) has its own concurrency
+limit so that a large brief cannot flood a single API, and every run has a
+global deadline after which unfinished citations are reported as timed out.
+"""
+
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default number of worker threads per verification run
+DEFAULT_MAX_WORKERS = 8
+
+# Default maximum number of in-flight requests per provider
+DEFAULT_PROVIDER_LIMITS = {
+    'courtlistener': 4,
+    'langsearch': 4,
+    'scholar': 1
+}
+
+
+class ProviderLimiter:
+    """Per-provider concurrency limits shared by every verification run in the process."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = 4):
+        self.limits = dict(DEFAULT_PROVIDER_LIMITS)
+        if limits:
+            self.limits.update(limits)
+        self.default_limit = default_limit
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if provider not in self._semaphores:
+                limit = max(1, int(self.limits.get(provider, self.default_limit)))
+                self._semaphores[provider] = threading.BoundedSemaphore(limit)
+            return self._semaphores[provider]
+
+    @contextmanager
+    def slot(self, provider: str):
+        """Hold one of the provider's concurrency slots for the duration of the block."""
+        semaphore = self._semaphore(provider)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+def verify_concurrently(items: List[Any],
+                        verify_fn: Callable[[Any], Any],
+                        on_result: Optional[Callable[[int, Any], None]] = None,
+                        on_failure: Optional[Callable[[Any, str], Any]] = None,
+                        max_workers: int = DEFAULT_MAX_WORKERS,
+                        deadline: Optional[float] = None) -> List[Any]:
+    """
+    Verify items concurrently with a bounded worker pool.
+
+    Args:
+        items: The items (e.g. citations) to verify
+        verify_fn: Function that verifies one item and returns its result
+        on_result: Called with (index, result) as soon as each item finishes
+        on_failure: Builds the result for an item whose verification raised an error or
+                    did not finish before the deadline; called with (item, reason)
+        max_workers: Maximum number of worker threads
+        deadline: Absolute time.time() after which unfinished items are abandoned
+
+    Returns:
+        List of results in the same order as items
+    """
+    results: List[Any] = [None] * len(items)
+    if not items:
+        return results
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))))
+    # Each item runs in a copy of the caller's context, so its log records keep the analysis ID
+    futures = {executor.submit(contextvars.copy_context().run, verify_fn, item): i for i, item in enumerate(items)}
+    finished = set()
+
+    try:
+        timeout = None if deadline is None else max(0, deadline - time.time())
+        for future in as_completed(futures, timeout=timeout):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.exception("Error verifying %s: %s", items[index], e)
+                result = on_failure(items[index], str(e)) if on_failure else None
+            results[index] = result
+            finished.add(index)
+            if on_result:
+                on_result(index, result)
+    except FuturesTimeoutError:
+        logger.warning("Verification deadline reached with %s of %s items unfinished", len(items) - len(finished), len(items))
+        for future, index in futures.items():
+            if index in finished:
+                continue
+            future.cancel()
+            result = on_failure(items[index], 'verification deadline reached') if on_failure else None
+            results[index] = result
+            if on_result:
+                on_result(index, result)
+    finally:
+        # Don't wait for abandoned requests; they finish (or time out) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results